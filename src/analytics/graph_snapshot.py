@@ -0,0 +1,376 @@
+import json
+import os
+from datetime import date
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from database_driver.neo4j_driver import Neo4jDriver
+from utils.constants import NEO4J_DEFAULT_FETCH_SIZE
+from utils.enums import Label, RelationshipType
+
+Column = Union[np.ndarray, pd.Categorical]
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_KEY = "__manifest__"
+
+
+def encode_column(values: np.ndarray) -> Column:
+    """
+    Store a property column in a memory-mappable form.
+    Numeric and boolean columns are kept as they are, date columns become
+    datetime64[D] (NaT when missing) and every other column is categorical.
+    """
+    if values.dtype != object:
+        return values
+    present = [value for value in values if value is not None]
+    if present and all(type(value) is date for value in present):
+        return np.array(
+            [np.datetime64(value, "D") if value is not None else np.datetime64("NaT") for value in values],
+            dtype="datetime64[D]",
+        )
+    codes, categories = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    return pd.Categorical.from_codes(codes.astype(np.int32), categories)
+
+
+def lookup(sorted_keys: np.ndarray, order: np.ndarray, values: Any) -> np.ndarray:
+    """Map `values` to positions through a sorted key array; -1 when missing."""
+    values = np.asarray(values)
+    if len(sorted_keys) == 0:
+        return np.full(values.shape, -1, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(sorted_keys, values), len(sorted_keys) - 1)
+    return np.where(sorted_keys[positions] == values, order[positions], -1)
+
+
+class GraphSnapshot:
+    """
+    Compact in-memory copy of part of the graph for analytics.
+
+    Nodes are numbered 0..n-1 and grouped by label, so the nodes of one label
+    occupy a contiguous index range. Node properties are kept per label as
+    column arrays, relationships as parallel arrays of endpoint indexes, type
+    codes and property columns. Adjacency and bipartite matrices (for example
+    Customer x Product over HOLDS) are built from those arrays as SciPy CSR
+    matrices.
+
+    Snapshots are saved either as a directory of .npy files, which are
+    memory-mapped on load, or as a single .npz file.
+    """
+
+    def __init__(
+        self,
+        labels: List[str],
+        label_offsets: np.ndarray,
+        node_ids: np.ndarray,
+        node_properties: Dict[str, Dict[str, Column]],
+        types: List[str],
+        edge_start: np.ndarray,
+        edge_end: np.ndarray,
+        edge_types: np.ndarray,
+        edge_properties: Dict[str, Column],
+    ):
+        self.labels = list(labels)
+        self.label_offsets = label_offsets
+        self.node_ids = node_ids
+        self.node_properties = node_properties
+        self.types = list(types)
+        self.edge_start = edge_start
+        self.edge_end = edge_end
+        self.edge_types = edge_types
+        self.edge_properties = edge_properties
+        self._id_order = np.argsort(node_ids, kind="stable")
+        self._sorted_ids = node_ids[self._id_order]
+        self._key_indexes: Dict[tuple, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_start)
+
+    def __repr__(self):
+        return (
+            f"GraphSnapshot(nodes={len(self)}, edges={self.num_edges}, "
+            f"labels={self.labels}, types={self.types})"
+        )
+
+    # ===========================
+    # BUILD
+    # ===========================
+    @classmethod
+    def from_driver(
+        cls,
+        driver: Neo4jDriver,
+        labels: List[Label],
+        types: List[RelationshipType] = None,
+        fetch_size: int = NEO4J_DEFAULT_FETCH_SIZE,
+    ) -> "GraphSnapshot":
+        """
+        Stream the nodes of `labels` and the relationships of `types` into a snapshot.
+        Args:
+            driver (Neo4jDriver): Connected driver.
+            labels (List[Label]): Node labels to include, in index order. A node
+                with several of them is stored under the first one.
+            types (List[RelationshipType]): Relationship types to include; None
+                for every type. Relationships to nodes outside `labels` are dropped.
+            fetch_size (int): Records fetched per round trip.
+        """
+        ids, offsets, node_properties = [], [0], {}
+        seen = np.empty(0, dtype=np.int64)
+        for label in labels:
+            frame = driver.get_nodes_columnar(
+                [label], limit=None, fetch_size=fetch_size
+            ).to_dataframe()
+            label_ids = frame.index.to_numpy(dtype=np.int64)
+            keep = ~np.isin(label_ids, seen)
+            frame, label_ids = frame[keep], label_ids[keep]
+            seen = np.concatenate([seen, label_ids])
+            ids.append(label_ids)
+            offsets.append(offsets[-1] + len(label_ids))
+            node_properties[label.value] = {
+                column: encode_column(frame[column].to_numpy())
+                for column in frame.columns
+                if column != "labels"
+            }
+
+        node_ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+        order = np.argsort(node_ids, kind="stable")
+        sorted_ids = node_ids[order]
+
+        edges = driver.get_relationships_columnar(
+            types, limit=None, fetch_size=fetch_size
+        ).to_dataframe()
+        start = lookup(sorted_ids, order, edges["start_id"].to_numpy())
+        end = lookup(sorted_ids, order, edges["end_id"].to_numpy())
+        keep = (start >= 0) & (end >= 0)
+        edges = edges[keep]
+        index_dtype = np.int32 if len(node_ids) < np.iinfo(np.int32).max else np.int64
+
+        return cls(
+            labels=[label.value for label in labels],
+            label_offsets=np.array(offsets, dtype=np.int64),
+            node_ids=node_ids,
+            node_properties=node_properties,
+            types=list(edges["type"].cat.categories),
+            edge_start=start[keep].astype(index_dtype),
+            edge_end=end[keep].astype(index_dtype),
+            edge_types=edges["type"].cat.codes.to_numpy().astype(np.int16),
+            edge_properties={
+                column: encode_column(edges[column].to_numpy())
+                for column in edges.columns
+                if column not in ("start_id", "end_id", "type")
+            },
+        )
+
+    # ===========================
+    # LOOKUPS
+    # ===========================
+    def label_slice(self, label: Union[Label, str]) -> slice:
+        """Return the index range of the nodes of `label`."""
+        name = label.value if isinstance(label, Label) else label
+        position = self.labels.index(name)
+        return slice(int(self.label_offsets[position]), int(self.label_offsets[position + 1]))
+
+    def index_of(self, node_ids: Any) -> np.ndarray:
+        """Map Neo4j node ids to snapshot indexes; -1 for unknown ids."""
+        return lookup(self._sorted_ids, self._id_order, node_ids)
+
+    def index_by(self, label: Union[Label, str], property: str, values: Any) -> np.ndarray:
+        """
+        Map property values (for example customer_code) of `label` nodes to
+        snapshot indexes; -1 for unknown values. The sorted key array is built
+        on first use and reused.
+        """
+        name = label.value if isinstance(label, Label) else label
+        key = (name, property)
+        if key not in self._key_indexes:
+            column = self.node_properties[name][property]
+            uniques = None
+            if isinstance(column, pd.Categorical) or np.asarray(column).dtype == object:
+                # Text mixed with NaN cannot be sorted: sort on factorized
+                # codes instead, where missing values are -1.
+                column, uniques = pd.factorize(pd.Series(column, dtype=object))
+                uniques = pd.Index(uniques)
+            column = np.asarray(column)
+            order = np.argsort(column, kind="stable")
+            self._key_indexes[key] = (column[order], order, uniques)
+        sorted_keys, order, uniques = self._key_indexes[key]
+        if uniques is not None:
+            values = np.asarray(values, dtype=object)
+            codes = uniques.get_indexer(values.ravel()).reshape(values.shape)
+            # Unknown and missing values must not match the -1 of missing keys.
+            values = np.where(codes >= 0, codes, -2)
+        positions = lookup(sorted_keys, order, values)
+        return np.where(positions >= 0, positions + self.label_slice(name).start, -1)
+
+    def properties(self, label: Union[Label, str]) -> pd.DataFrame:
+        """Return the property columns of `label` nodes, indexed by node id."""
+        name = label.value if isinstance(label, Label) else label
+        return pd.DataFrame(
+            dict(self.node_properties[name]),
+            index=pd.Index(self.node_ids[self.label_slice(name)], name="id"),
+        )
+
+    # ===========================
+    # MATRICES
+    # ===========================
+    def _edge_mask(self, types: List[RelationshipType] = None, mask: np.ndarray = None):
+        selected = np.ones(self.num_edges, dtype=bool) if mask is None else np.asarray(mask)
+        if types:
+            codes = [self.types.index(t.value) for t in types if t.value in self.types]
+            selected = selected & np.isin(self.edge_types, codes)
+        return selected
+
+    def adjacency(
+        self,
+        types: List[RelationshipType] = None,
+        binary: bool = False,
+        mask: np.ndarray = None,
+    ) -> sparse.csr_matrix:
+        """
+        Return the n x n CSR adjacency matrix of the selected relationships.
+        Parallel relationships are summed unless `binary` is set. `mask` is a
+        boolean array over relationships, e.g. built from `edge_properties`.
+        """
+        selected = self._edge_mask(types, mask)
+        return self._matrix(
+            self.edge_start[selected], self.edge_end[selected], (len(self), len(self)), binary
+        )
+
+    def bipartite(
+        self,
+        row_label: Union[Label, str],
+        column_label: Union[Label, str],
+        types: List[RelationshipType] = None,
+        binary: bool = True,
+        mask: np.ndarray = None,
+    ) -> sparse.csr_matrix:
+        """
+        Return the CSR matrix of relationships from `row_label` to
+        `column_label` nodes, e.g. Customer x Product over HOLDS. Row i is the
+        i-th `row_label` node, i.e. snapshot index label_slice(row_label).start + i.
+        """
+        rows, columns = self.label_slice(row_label), self.label_slice(column_label)
+        selected = self._edge_mask(types, mask)
+        start, end = self.edge_start[selected], self.edge_end[selected]
+        inside = (
+            (start >= rows.start) & (start < rows.stop)
+            & (end >= columns.start) & (end < columns.stop)
+        )
+        return self._matrix(
+            start[inside] - rows.start,
+            end[inside] - columns.start,
+            (rows.stop - rows.start, columns.stop - columns.start),
+            binary,
+        )
+
+    @staticmethod
+    def _matrix(rows: np.ndarray, columns: np.ndarray, shape, binary: bool) -> sparse.csr_matrix:
+        data = np.ones(len(rows), dtype=np.float32)
+        matrix = sparse.csr_matrix((data, (rows, columns)), shape=shape)
+        matrix.sum_duplicates()
+        if binary:
+            matrix.data[:] = 1
+        return matrix
+
+    # ===========================
+    # PERSISTENCE
+    # ===========================
+    def _arrays(self) -> tuple:
+        arrays = {
+            "label_offsets": self.label_offsets,
+            "node_ids": self.node_ids,
+            "edge_start": self.edge_start,
+            "edge_end": self.edge_end,
+            "edge_types": self.edge_types,
+        }
+        manifest = {
+            "labels": self.labels,
+            "types": self.types,
+            "node_properties": {},
+            "edge_properties": {},
+        }
+
+        def add(prefix: str, columns: Dict[str, Column]) -> Dict[str, str]:
+            kinds = {}
+            for name, column in columns.items():
+                if isinstance(column, pd.Categorical):
+                    arrays[f"{prefix}.{name}.codes"] = column.codes
+                    arrays[f"{prefix}.{name}.categories"] = column.categories.to_numpy(dtype=object)
+                    kinds[name] = "category"
+                else:
+                    arrays[f"{prefix}.{name}"] = np.asarray(column)
+                    kinds[name] = "array"
+            return kinds
+
+        for label, columns in self.node_properties.items():
+            manifest["node_properties"][label] = add(f"node.{label}", columns)
+        manifest["edge_properties"] = add("edge", self.edge_properties)
+        return manifest, arrays
+
+    def save(self, path: str) -> None:
+        """Save to a .npz file, or to a directory of .npy files for memory-mapping."""
+        manifest, arrays = self._arrays()
+        if path.endswith(".npz"):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            np.savez(path, **{MANIFEST_KEY: np.array(json.dumps(manifest))}, **arrays)
+            return
+
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array, allow_pickle=array.dtype == object)
+        with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "GraphSnapshot":
+        """
+        Load a snapshot written by `save`. Arrays in a directory are
+        memory-mapped read-only unless `mmap` is False; object arrays (the
+        categories of text columns) are always read into memory.
+        """
+        if path.endswith(".npz"):
+            archive = np.load(path, allow_pickle=True)
+            manifest = json.loads(str(archive[MANIFEST_KEY]))
+            get = archive.__getitem__
+        else:
+            with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+
+            def get(name: str) -> np.ndarray:
+                file_name = os.path.join(path, f"{name}.npy")
+                try:
+                    return np.load(file_name, mmap_mode="r" if mmap else None)
+                except ValueError:
+                    return np.load(file_name, allow_pickle=True)
+
+        def columns(prefix: str, kinds: Dict[str, str]) -> Dict[str, Column]:
+            loaded = {}
+            for name, kind in kinds.items():
+                if kind == "category":
+                    loaded[name] = pd.Categorical.from_codes(
+                        get(f"{prefix}.{name}.codes"), get(f"{prefix}.{name}.categories")
+                    )
+                else:
+                    loaded[name] = get(f"{prefix}.{name}")
+            return loaded
+
+        return cls(
+            labels=manifest["labels"],
+            label_offsets=get("label_offsets"),
+            node_ids=get("node_ids"),
+            node_properties={
+                label: columns(f"node.{label}", kinds)
+                for label, kinds in manifest["node_properties"].items()
+            },
+            types=manifest["types"],
+            edge_start=get("edge_start"),
+            edge_end=get("edge_end"),
+            edge_types=get("edge_types"),
+            edge_properties=columns("edge", manifest["edge_properties"]),
+        )
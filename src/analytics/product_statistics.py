@@ -0,0 +1,237 @@
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from database_driver import query_builder
+from database_driver.neo4j_driver import Neo4jDriver
+from logger.logger import Logger
+from recommender.model_based import Holdings, as_dense
+from utils.constants import SANTANDER_PRODUCT_COLUMNS
+from utils.enums import Label
+
+CURRENT = "current"
+
+
+@dataclass
+class ProductStatistics:
+    """
+    Product popularity and co-ownership of one month.
+
+    `holders[i]` is the number of customers holding products[i] and
+    `co_ownership[i, j]` the number holding both products[i] and products[j]
+    (the diagonal equals `holders`).
+    """
+
+    month: str
+    products: List[str]
+    customers: int
+    holders: np.ndarray
+    co_ownership: np.ndarray
+
+    @property
+    def popularity(self) -> np.ndarray:
+        """Share of customers holding each product, as in `popularity_based()`."""
+        return self.holders / max(self.customers, 1)
+
+    def top(self, n: int = None, exclude: Sequence[str] = ()) -> List[str]:
+        """Return the most held products, skipping `exclude`."""
+        order = np.argsort(-self.holders, kind="stable")
+        ranked = [self.products[i] for i in order if self.products[i] not in exclude]
+        return ranked[:n] if n is not None else ranked
+
+    def co_owned(self, product: str, n: int = None) -> List[str]:
+        """Return the products most often held together with `product`."""
+        i = self.products.index(product)
+        counts = self.co_ownership[i].copy()
+        counts[i] = -1
+        order = np.argsort(-counts, kind="stable")
+        ranked = [self.products[j] for j in order if j != i and counts[j] > 0]
+        return ranked[:n] if n is not None else ranked
+
+
+def month_key(month) -> str:
+    return month.isoformat() if isinstance(month, date) else (month or CURRENT)
+
+
+def from_holdings(month, holdings: Holdings, products: List[str]) -> ProductStatistics:
+    """Compute the statistics of a customers x products 0/1 matrix."""
+    matrix = as_dense(holdings).astype(np.int64)
+    co_ownership = matrix.T @ matrix
+    return ProductStatistics(
+        month=month_key(month),
+        products=list(products),
+        customers=matrix.shape[0],
+        holders=np.diag(co_ownership).copy(),
+        co_ownership=co_ownership,
+    )
+
+
+def from_graph(
+    driver: Neo4jDriver, month=None, products: List[str] = None
+) -> ProductStatistics:
+    """
+    Compute the statistics with aggregate Cypher queries.
+    Args:
+        driver (Neo4jDriver): Connected driver.
+        month: Only count HOLDS relationships dated `month` (a date). Pass it
+            for graphs with one HOLDS per customer and month, as built by
+            SantanderIngestion. None counts the customers that hold a product
+            in any month, which suits graphs kept by the delta loader (one
+            relationship per current holding). With a month, `customers`
+            counts the customers with a HOLDS dated that month.
+        products (List[str]): Product codes, in matrix order.
+    """
+    products = list(products or SANTANDER_PRODUCT_COLUMNS)
+    position = {code: i for i, code in enumerate(products)}
+    if isinstance(month, str):
+        month = date.fromisoformat(month)
+
+    co_ownership = np.zeros((len(products), len(products)), dtype=np.int64)
+    for row in driver.execute_query(*query_builder.product_holders(month)):
+        if row["code"] in position:
+            i = position[row["code"]]
+            co_ownership[i, i] = row["holders"]
+    for row in driver.execute_query(*query_builder.product_co_ownership(month)):
+        if row["code_1"] in position and row["code_2"] in position:
+            i, j = position[row["code_1"]], position[row["code_2"]]
+            co_ownership[i, j] = co_ownership[j, i] = row["customers"]
+
+    customers = driver.execute_query(*query_builder.count_customers(month))
+    return ProductStatistics(
+        month=month_key(month),
+        products=products,
+        customers=customers[0]["count"] if customers else 0,
+        holders=np.diag(co_ownership).copy(),
+        co_ownership=co_ownership,
+    )
+
+
+class ProductStatisticsStore:
+    """
+    Summary table of ProductStatistics, one .npz file per month plus an
+    index of the months it holds.
+    """
+
+    INDEX_FILE = "months.json"
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def months(self) -> List[str]:
+        path = os.path.join(self._directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def put(self, statistics: ProductStatistics) -> None:
+        np.savez(
+            os.path.join(self._directory, f"{statistics.month}.npz"),
+            products=np.array(statistics.products),
+            customers=np.array(statistics.customers),
+            co_ownership=statistics.co_ownership,
+        )
+        months = sorted(set(self.months()) | {statistics.month})
+        path = os.path.join(self._directory, self.INDEX_FILE)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(months, file)
+        os.replace(f"{path}.tmp", path)
+
+    def get(self, month) -> ProductStatistics:
+        key = month_key(month)
+        with np.load(os.path.join(self._directory, f"{key}.npz")) as archive:
+            co_ownership = archive["co_ownership"]
+            return ProductStatistics(
+                month=key,
+                products=archive["products"].tolist(),
+                customers=int(archive["customers"]),
+                holders=np.diag(co_ownership).copy(),
+                co_ownership=co_ownership,
+            )
+
+    def latest(self) -> ProductStatistics:
+        months = self.months()
+        return self.get(months[-1]) if months else None
+
+    def frame(self) -> pd.DataFrame:
+        """Return the popularity of every product per month (months x products)."""
+        rows = {month: self.get(month) for month in self.months()}
+        return pd.DataFrame(
+            {month: s.popularity for month, s in rows.items()},
+            index=rows[next(iter(rows))].products if rows else [],
+        ).T
+
+
+class ProductStatisticsJob:
+    """
+    Keep product statistics materialized.
+
+    Each month's statistics go to a ProductStatisticsStore. The latest month
+    is also written onto the Product nodes (`holders`, `popularity`,
+    `statistics_month`, and the co-owned products with their counts), so
+    popularity and fallback recommendations are a lookup over the products.
+    """
+
+    def __init__(self, driver: Neo4jDriver, logger: Logger, store: ProductStatisticsStore):
+        self._driver = driver
+        self._logger = logger
+        self._store = store
+
+    def refresh(self, months: Sequence = ()) -> List[ProductStatistics]:
+        """
+        Compute the statistics of the `months` that are not stored yet with
+        aggregate Cypher, then materialize the latest month.
+        """
+        known = set(self._store.months())
+        computed = []
+        for month in months:
+            if month_key(month) not in known:
+                statistics = from_graph(self._driver, month)
+                self._store.put(statistics)
+                computed.append(statistics)
+        if computed:
+            self.materialize(self._store.latest())
+        return computed
+
+    def on_month_loaded(self, month: str, rows: pd.DataFrame) -> None:
+        """
+        Callback for SantanderDeltaLoader: compute the month's statistics
+        from the customers present that month, without querying the graph.
+        """
+        flags = rows[SANTANDER_PRODUCT_COLUMNS].to_numpy(dtype=np.float32) == 1
+        self._store.put(from_holdings(month, flags, SANTANDER_PRODUCT_COLUMNS))
+        self.materialize(self._store.latest())
+
+    def materialize(self, statistics: ProductStatistics) -> int:
+        """Write `statistics` onto the Product nodes; return how many were updated."""
+        position = {code: i for i, code in enumerate(statistics.products)}
+        updates = []
+        for i, code in enumerate(statistics.products):
+            co_owned = statistics.co_owned(code)
+            updates.append(
+                {
+                    "match_criteria": {"code": code},
+                    "new_properties": {
+                        "holders": int(statistics.holders[i]),
+                        "popularity": float(statistics.popularity[i]),
+                        "statistics_month": statistics.month,
+                        "co_owned_codes": co_owned,
+                        "co_owned_counts": [
+                            int(statistics.co_ownership[i, position[c]]) for c in co_owned
+                        ],
+                    },
+                }
+            )
+        updated = self._driver.update_nodes_batch(
+            [Label.PRODUCT], updates, return_nodes=False
+        )
+        self._logger.log_info(
+            "Materialized product statistics of %s on %d product(s)", statistics.month, updated
+        )
+        return updated
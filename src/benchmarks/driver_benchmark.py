@@ -0,0 +1,381 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence
+
+from dotenv import load_dotenv
+
+from benchmarks.fake_backend import FakeNeo4jDriver
+from database_driver import result_converter
+from database_driver.neo4j_driver import Neo4jDriver
+from database_driver.query_metrics import QueryMetrics
+from logger.logger import Logger, LogType
+from models.benchmark_models.benchmark_models import BenchmarkResult
+from models.neo4j_driver_models.connection_model import ConnectionModel
+from utils.constants import (
+    BENCHMARK_REGRESSION_TOLERANCE,
+    BENCHMARK_SCALES,
+    BENCHMARK_SINGLE_CALLS,
+    LOG_DIR,
+    NEO4J_DEFAULT_BATCH_SIZE,
+)
+from utils.enums import Label, RelationshipType
+
+LABELS = [Label.BENCHMARK]
+TYPE = RelationshipType.BENCHMARK_LINK
+
+
+class DriverBenchmark:
+    """
+    Throughput and latency of every Neo4jDriver operation, single-call and
+    batched, plus result casting, at several scales.
+
+    Every scale starts from an empty Benchmark label: `scale` nodes and
+    `scale` relationships (a ring over the nodes) are written, read, updated
+    and deleted. Single-call operations are timed on at most `single_calls`
+    calls, since one round trip per item does not finish at 1M items on a
+    real server. Per-query latencies come from the QueryMetrics of the driver.
+    """
+
+    def __init__(
+        self,
+        driver: Neo4jDriver,
+        metrics: QueryMetrics,
+        logger: Logger,
+        single_calls: int = BENCHMARK_SINGLE_CALLS,
+        batch_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+    ):
+        self._driver = driver
+        self._metrics = metrics
+        self._logger = logger
+        self._single_calls = single_calls
+        self._batch_size = batch_size
+
+    def _measure(
+        self, operation: str, mode: str, scale: int, items: int, run: Callable[[], Any]
+    ) -> BenchmarkResult:
+        self._metrics.reset()
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+
+        stats = self._metrics.snapshot()
+        samples = sorted(sample for s in stats for sample in s.samples)
+        quantiles = {
+            q: samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+            for q in (0.5, 0.95, 0.99)
+        }
+        result = BenchmarkResult(
+            operation=operation,
+            mode=mode,
+            scale=scale,
+            items=items,
+            queries=sum(s.count for s in stats),
+            seconds=seconds,
+            p50=quantiles[0.5],
+            p95=quantiles[0.95],
+            p99=quantiles[0.99],
+        )
+        self._logger.log_info(
+            "Benchmark %s: %d item(s) in %.3fs (%.0f/s)",
+            result.key,
+            items,
+            seconds,
+            result.throughput,
+        )
+        return result
+
+    def _clear(self) -> None:
+        self._driver.delete_nodes(labels=LABELS)
+
+    def run(
+        self, scales: Sequence[int] = BENCHMARK_SCALES, repeat: int = 1
+    ) -> List[BenchmarkResult]:
+        """Run every scale `repeat` times and keep the fastest run of each operation."""
+        results = []
+        for scale in scales:
+            best: Dict[str, BenchmarkResult] = {}
+            for _ in range(repeat):
+                for result in self.run_scale(scale) + self.run_casting(scale):
+                    if result.key not in best or result.seconds < best[result.key].seconds:
+                        best[result.key] = result
+            results.extend(best.values())
+        return results
+
+    def run_scale(self, scale: int) -> List[BenchmarkResult]:
+        """Time every driver operation on `scale` nodes and relationships."""
+        d, size = self._driver, self._batch_size
+        calls = min(scale, self._single_calls)
+        nodes = [{"uid": i, "value": i} for i in range(scale)]
+        links = [
+            {
+                "start_node_properties": {"uid": i},
+                "end_node_properties": {"uid": (i + 1) % scale},
+                "properties": {"weight": i},
+            }
+            for i in range(scale)
+        ]
+        node_updates = [
+            {"match_criteria": {"uid": i}, "new_properties": {"value": -i}}
+            for i in range(scale)
+        ]
+        extra = range(scale, scale + calls)
+
+        self._clear()
+        results = [
+            self._measure(
+                "create_nodes_batch", "batch", scale, scale,
+                lambda: d.create_nodes_batch(LABELS, nodes, size, return_nodes=False),
+            ),
+            self._measure(
+                "create_node", "single", scale, calls,
+                lambda: [d.create_node(LABELS, {"uid": i, "value": i}) for i in extra],
+            ),
+            self._measure(
+                "get_nodes", "read", scale, scale + calls,
+                lambda: d.get_nodes(LABELS, limit=None),
+            ),
+            self._measure(
+                "get_nodes_stream", "read", scale, scale + calls,
+                lambda: sum(1 for _ in d.get_nodes(LABELS, limit=None, stream=True)),
+            ),
+            self._measure(
+                "get_nodes_columnar", "read", scale, scale + calls,
+                lambda: d.get_nodes_columnar(LABELS),
+            ),
+            self._measure(
+                "update_nodes", "single", scale, calls,
+                lambda: [
+                    d.update_nodes(LABELS, {"uid": i}, {"value": -i}) for i in range(calls)
+                ],
+            ),
+            self._measure(
+                "update_nodes_batch", "batch", scale, scale,
+                lambda: d.update_nodes_batch(LABELS, node_updates, size, return_nodes=False),
+            ),
+            self._measure(
+                "merge_nodes_batch", "batch", scale, scale,
+                lambda: d.merge_nodes_batch(LABELS, node_updates, None, size, return_nodes=False),
+            ),
+            self._measure(
+                "create_relationships_batch", "batch", scale, scale,
+                lambda: d.create_relationships_batch(
+                    LABELS, LABELS, TYPE, links, size, return_relationships=False
+                ),
+            ),
+            self._measure(
+                "create_relationship", "single", scale, calls,
+                lambda: [
+                    d.create_relationship(LABELS, {"uid": i}, LABELS, {"uid": i - scale}, TYPE)
+                    for i in extra
+                ],
+            ),
+            self._measure(
+                "get_relationships", "read", scale, scale + calls,
+                lambda: d.get_relationships([TYPE], limit=None),
+            ),
+            self._measure(
+                "update_relationships", "single", scale, calls,
+                lambda: [
+                    d.update_relationships(
+                        LABELS, {"uid": i}, LABELS, {"uid": (i + 1) % scale}, TYPE, {"weight": 0}
+                    )
+                    for i in range(calls)
+                ],
+            ),
+            self._measure(
+                "merge_relationships_batch", "batch", scale, scale,
+                lambda: d.merge_relationships_batch(
+                    LABELS, LABELS, TYPE, links, chunk_size=size, return_relationships=False
+                ),
+            ),
+            self._measure(
+                "delete_relationships", "single", scale, calls,
+                lambda: [
+                    d.delete_relationships(LABELS, {"uid": i}, LABELS, {"uid": i - scale}, TYPE)
+                    for i in extra
+                ],
+            ),
+            self._measure(
+                "delete_relationships_batch", "batch", scale, scale,
+                lambda: d.delete_relationships_batch(LABELS, LABELS, links, TYPE, size),
+            ),
+            self._measure(
+                "delete_nodes", "single", scale, calls,
+                lambda: [d.delete_nodes(LABELS, {"uid": i}) for i in extra],
+            ),
+        ]
+        self._clear()
+        return results
+
+    def run_casting(self, scale: int) -> List[BenchmarkResult]:
+        """Time result casting alone, on synthetic records."""
+        nodes = [
+            {"id": i, "labels": [Label.BENCHMARK.value], "properties": {"uid": i, "value": i}}
+            for i in range(scale)
+        ]
+        relationships = [
+            {
+                "id": i,
+                "start_id": i,
+                "end_id": (i + 1) % scale,
+                "type": TYPE.value,
+                "properties": {"weight": i},
+            }
+            for i in range(scale)
+        ]
+        return [
+            self._measure(
+                "to_nodes", "cast", scale, scale, lambda: result_converter.to_nodes(nodes)
+            ),
+            self._measure(
+                "to_relationships", "cast", scale, scale,
+                lambda: result_converter.to_relationships(relationships),
+            ),
+        ]
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results: List[BenchmarkResult], backend: str, **settings) -> Dict[str, Any]:
+    return {
+        "metadata": {
+            "backend": backend,
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            **settings,
+        },
+        "results": [
+            {**asdict(result), "throughput": result.throughput} for result in results
+        ],
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float = BENCHMARK_REGRESSION_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """
+    Return the operations of `current` whose throughput dropped by more than
+    `tolerance` (a fraction) against `baseline`, worst first.
+    """
+    before = {
+        BenchmarkResult(**_fields(r)).key: r["throughput"] for r in baseline["results"]
+    }
+    regressions = []
+    for entry in current["results"]:
+        key = BenchmarkResult(**_fields(entry)).key
+        if before.get(key):
+            change = entry["throughput"] / before[key] - 1
+            if change < -tolerance:
+                regressions.append(
+                    {"key": key, "baseline": before[key], "current": entry["throughput"], "change": change}
+                )
+    return sorted(regressions, key=lambda r: r["change"])
+
+
+def _fields(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in entry.items() if k != "throughput"}
+
+
+def _connect(backend: str, logger: Logger, metrics: QueryMetrics):
+    """Return (driver, backend name); "auto" uses Neo4j from .env when it answers."""
+    driver = Neo4jDriver(logger, metrics)
+    if backend in ("auto", "neo4j") and os.getenv("NEO4J_HOST"):
+        driver.connect(
+            ConnectionModel(
+                host=os.getenv("NEO4J_HOST"),
+                user=os.getenv("NEO4J_USER"),
+                password=os.getenv("NEO4J_PASSWORD"),
+            )
+        )
+        try:
+            driver.execute_query("RETURN 1")
+            return driver, "neo4j"
+        except RuntimeError:
+            pass
+    if backend == "neo4j":
+        logger.log_error("Neo4j is not reachable, check NEO4J_HOST in .env.")
+        raise RuntimeError("Neo4j is not reachable, check NEO4J_HOST in .env.")
+    driver.use_backend(FakeNeo4jDriver())
+    return driver, "fake"
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Benchmark the Neo4j driver.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--backend", choices=["auto", "neo4j", "fake"], default="auto")
+    run_parser.add_argument("--scales", type=int, nargs="+", default=list(BENCHMARK_SCALES))
+    run_parser.add_argument("--single-calls", type=int, default=BENCHMARK_SINGLE_CALLS)
+    run_parser.add_argument("--batch-size", type=int, default=NEO4J_DEFAULT_BATCH_SIZE)
+    run_parser.add_argument("--repeat", type=int, default=1, help="Keep the best of N runs")
+    run_parser.add_argument("--output", help="JSON file for the results (default: stdout)")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--tolerance", type=float, default=BENCHMARK_REGRESSION_TOLERANCE
+    )
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.current, "r", encoding="utf-8") as file:
+            current = json.load(file)
+        regressions = compare(baseline, current, args.tolerance)
+        print(json.dumps(regressions, indent=2))
+        raise SystemExit(1 if regressions else 0)
+
+    logger = Logger(file_name=f"{LOG_DIR}/benchmark")
+    # Logging every query would dominate the timings, so the driver only
+    # writes warnings.
+    driver_logger = Logger(
+        file_name=f"{LOG_DIR}/benchmark", level=LogType.WARNING, name="neo4j_driver"
+    )
+    metrics = QueryMetrics()
+    driver, backend = _connect(args.backend, driver_logger, metrics)
+    try:
+        benchmark = DriverBenchmark(
+            driver, metrics, logger, args.single_calls, args.batch_size
+        )
+        output = report(
+            benchmark.run(args.scales, args.repeat),
+            backend,
+            scales=args.scales,
+            single_calls=args.single_calls,
+            batch_size=args.batch_size,
+            repeat=args.repeat,
+        )
+    finally:
+        driver.disconnect()
+
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+NODE_LABELS = re.compile(r"\(n((?::\w+)*)")
+RELATIONSHIP_TYPE = re.compile(r"-\[r:(\w+)")
+
+
+@lru_cache(maxsize=256)
+def _classify(query: str) -> Tuple[str, str, bool, Tuple[str, ...], Optional[str]]:
+    """Return (entity, action, batch, labels, relationship type) of a driver query."""
+    relationship = "id(start)" in query or "count(r)" in query or "-[r" in query
+    if "DELETE" in query:
+        action = "delete"
+    elif "MERGE" in query:
+        action = "merge"
+    elif "CREATE (" in query:
+        action = "create"
+    elif " SET " in query:
+        action = "update"
+    elif "RETURN" in query and "MATCH" in query:
+        action = "read"
+    else:
+        action = "other"
+    labels = NODE_LABELS.search(query)
+    relationship_type = RELATIONSHIP_TYPE.search(query)
+    return (
+        "relationship" if relationship else "node",
+        action,
+        query.startswith("UNWIND"),
+        tuple(label for label in labels.group(1).split(":") if label) if labels else (),
+        relationship_type.group(1) if relationship_type else None,
+    )
+
+
+class FakeRecord:
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Dict[str, Any]):
+        self._values = values
+
+    def data(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+
+class FakeSummary:
+    result_available_after = 0
+    result_consumed_after = 0
+    plan = None
+
+
+class FakeResult:
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self._rows = rows
+
+    def __iter__(self) -> Iterator[FakeRecord]:
+        return (FakeRecord(row) for row in self._rows)
+
+    def consume(self) -> FakeSummary:
+        return FakeSummary()
+
+    async def data(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._rows]
+
+
+class FakeGraph:
+    """
+    In-memory nodes and relationships that answer the queries built by
+    query_builder.
+
+    It does not interpret Cypher. Each query is classified once by its shape
+    (node or relationship; create, read, update, merge or delete; single or
+    UNWIND batch) and applied to dictionaries, matching nodes on a single
+    `key` property through a hash index. That is enough for results to have
+    the right shape and size, so timings measure the client side of the
+    driver: query building, parameter handling, record copying and casting.
+    """
+
+    def __init__(self, key: str = "uid"):
+        self.key = key
+        self.nodes: Dict[int, Dict[str, Any]] = {}
+        self.relationships: Dict[int, Dict[str, Any]] = {}
+        self._index: Dict[Any, int] = {}
+        self._outgoing: Dict[int, List[int]] = {}
+        self._next_id = 0
+
+    # ===========================
+    # NODES
+    # ===========================
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _create_node(self, labels: Tuple[str, ...], properties: Dict[str, Any]) -> Dict[str, Any]:
+        node = {"id": self._new_id(), "labels": list(labels), "properties": dict(properties)}
+        self.nodes[node["id"]] = node
+        if self.key in properties:
+            self._index[properties[self.key]] = node["id"]
+        return node
+
+    def _node(self, value: Any) -> Optional[Dict[str, Any]]:
+        node_id = self._index.get(value)
+        return self.nodes.get(node_id) if node_id is not None else None
+
+    def _match_nodes(self, parameters: Dict[str, Any], prefix: str, labels) -> List[Dict[str, Any]]:
+        name = f"{prefix}_{self.key}"
+        if name in parameters:
+            node = self._node(parameters[name])
+            return [node] if node else []
+        return [n for n in self.nodes.values() if set(labels) <= set(n["labels"])]
+
+    def _delete_node(self, node: Dict[str, Any]) -> None:
+        del self.nodes[node["id"]]
+        self._index.pop(node["properties"].get(self.key), None)
+        for relationship_id in self._outgoing.pop(node["id"], []):
+            self.relationships.pop(relationship_id, None)
+
+    # ===========================
+    # RELATIONSHIPS
+    # ===========================
+    def _create_relationship(self, start, end, type: str, properties) -> Dict[str, Any]:
+        relationship = {
+            "id": self._new_id(),
+            "start_id": start["id"],
+            "end_id": end["id"],
+            "type": type,
+            "properties": dict(properties or {}),
+        }
+        self.relationships[relationship["id"]] = relationship
+        self._outgoing.setdefault(start["id"], []).append(relationship["id"])
+        return relationship
+
+    def _outgoing_of(self, start, end=None) -> List[Dict[str, Any]]:
+        found = (self.relationships.get(i) for i in self._outgoing.get(start["id"], []))
+        return [r for r in found if r and (end is None or r["end_id"] == end["id"])]
+
+    def _match_relationships(self, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        starts = self._match_nodes(parameters, "start", ())
+        if f"end_{self.key}" in parameters:
+            end = self._node(parameters[f"end_{self.key}"])
+            return [r for s in starts for r in self._outgoing_of(s, end)] if end else []
+        if f"start_{self.key}" in parameters:
+            return [r for s in starts for r in self._outgoing_of(s)]
+        return list(self.relationships.values())
+
+    def _delete_relationship(self, relationship: Dict[str, Any]) -> None:
+        del self.relationships[relationship["id"]]
+        self._outgoing[relationship["start_id"]].remove(relationship["id"])
+
+    def _endpoints(self, row: Dict[str, Any]):
+        return (
+            self._node(row["start_node_properties"].get(self.key)),
+            self._node(row["end_node_properties"].get(self.key)),
+        )
+
+    # ===========================
+    # QUERIES
+    # ===========================
+    def run(self, query: str, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        entity, action, batch, labels, type = _classify(query)
+        if action == "other":
+            return [{"value": 1}]
+        if entity == "node":
+            touched = self._run_nodes(action, batch, labels, parameters)
+        else:
+            touched = self._run_relationships(action, batch, type, parameters)
+
+        if action == "delete":
+            return [{"deleted_count": touched}]
+        if "AS count" in query:
+            return [{"count": len(touched)}]
+        if "page_size" in parameters:
+            return self._page(touched, parameters["cursor"], parameters["page_size"])
+        limit = parameters.get("limit")
+        return touched[:limit] if limit is not None else touched
+
+    @staticmethod
+    def _page(rows: List[Dict[str, Any]], cursor: Any, page_size: int) -> List[Dict[str, Any]]:
+        """Keyset page on the internal id, whatever cursor property was asked for."""
+        rows = sorted(
+            (r for r in rows if cursor is None or r["id"] > cursor), key=lambda r: r["id"]
+        )
+        return [{**r, "cursor": r["id"]} for r in rows[:page_size]]
+
+    def _run_nodes(self, action: str, batch: bool, labels, parameters: Dict[str, Any]):
+        if action == "create":
+            if batch:
+                return [self._create_node(labels, row) for row in parameters["rows"]]
+            return [self._create_node(labels, parameters["properties"])]
+        if action == "read":
+            return self._match_nodes(parameters, "match", labels)
+        if action == "delete":
+            matched = self._match_nodes(parameters, "match", labels)[: parameters.get("limit")]
+            for node in matched:
+                self._delete_node(node)
+            return len(matched)
+
+        if not batch:
+            matched = self._match_nodes(parameters, "match", labels)
+            for node in matched:
+                node["properties"].update(parameters["new_properties"])
+            return matched
+        touched = []
+        for row in parameters["rows"]:
+            node = self._node(row["match_criteria"].get(self.key))
+            if node is None and action == "merge":
+                node = self._create_node(labels, row["match_criteria"])
+            if node is not None:
+                node["properties"].update(row["new_properties"])
+                touched.append(node)
+        return touched
+
+    def _run_relationships(self, action: str, batch: bool, type: str, parameters: Dict[str, Any]):
+        if not batch:
+            if action == "create":
+                starts = self._match_nodes(parameters, "start", ())
+                ends = self._match_nodes(parameters, "end", ())
+                return [
+                    self._create_relationship(s, e, type, parameters["props"])
+                    for s in starts
+                    for e in ends
+                ]
+            matched = self._match_relationships(parameters)
+            if action == "delete":
+                matched = matched[: parameters.get("limit")]
+                for relationship in matched:
+                    self._delete_relationship(relationship)
+                return len(matched)
+            if action == "update":
+                for relationship in matched:
+                    relationship["properties"].update(parameters["new_properties"])
+            return matched
+
+        touched = []
+        for row in parameters["rows"]:
+            start, end = self._endpoints(row)
+            if start is None or end is None:
+                continue
+            if action == "create":
+                touched.append(self._create_relationship(start, end, type, row.get("properties")))
+            elif action == "merge":
+                existing = self._outgoing_of(start, end)
+                relationship = existing[0] if existing else self._create_relationship(
+                    start, end, type, {}
+                )
+                relationship["properties"].update(row.get("properties") or {})
+                touched.append(relationship)
+            else:
+                for relationship in self._outgoing_of(start, end):
+                    self._delete_relationship(relationship)
+                    touched.append(relationship)
+        return len(touched) if action == "delete" else touched
+
+
+class FakeSession:
+    """Session and transaction in one: every query runs straight on the graph."""
+
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    def __enter__(self) -> "FakeSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self, query: str, parameters: Dict[str, Any] = None, **kwargs) -> FakeResult:
+        return FakeResult(self._graph.run(query, {**(parameters or {}), **kwargs}))
+
+    def begin_transaction(self) -> "FakeSession":
+        return self
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FakeNeo4jDriver:
+    """
+    In-process stand-in for neo4j.Driver, for running the driver offline:
+
+        driver = Neo4jDriver(logger)
+        driver.use_backend(FakeNeo4jDriver())
+    """
+
+    def __init__(self, key: str = "uid"):
+        self.graph = FakeGraph(key)
+
+    def session(self, **config) -> FakeSession:
+        return FakeSession(self.graph)
+
+    def execute_query(self, query: str, parameters: Dict[str, Any] = None, **kwargs):
+        return list(FakeResult(self.graph.run(query, parameters or {})))
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncFakeSession:
+    """Async counterpart of FakeSession, for AsyncNeo4jDriver."""
+
+    def __init__(self, graph: FakeGraph):
+        self._graph = graph
+
+    async def __aenter__(self) -> "AsyncFakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def run(self, query: str, parameters: Dict[str, Any] = None, **kwargs) -> FakeResult:
+        return FakeResult(self._graph.run(query, {**(parameters or {}), **kwargs}))
+
+
+class AsyncFakeNeo4jDriver:
+    """
+    In-process stand-in for neo4j.AsyncDriver:
+
+        driver = AsyncNeo4jDriver(logger)
+        driver.use_backend(AsyncFakeNeo4jDriver())
+    """
+
+    def __init__(self, key: str = "uid"):
+        self.graph = FakeGraph(key)
+
+    def session(self, **config) -> AsyncFakeSession:
+        return AsyncFakeSession(self.graph)
+
+    async def execute_query(self, query: str, parameters: Dict[str, Any] = None, **kwargs):
+        return list(FakeResult(self.graph.run(query, parameters or {})))
+
+    async def close(self) -> None:
+        pass
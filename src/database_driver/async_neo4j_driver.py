@@ -0,0 +1,352 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+from neo4j import AsyncGraphDatabase
+
+from database_driver import query_builder, result_converter
+from database_driver.neo4j_driver import Neo4jDriver, _Names
+from logger.logger import Logger, LogType
+from models.neo4j_driver_models.connection_model import ConnectionModel
+from models.neo4j_driver_models.database_models import Node, Relationship
+from utils.constants import (
+    NEO4J_DEFAULT_MAX_CONCURRENCY,
+    NEO4J_DEFAULT_NUMBER_OF_NODES,
+    NEO4J_MAINTENANCE_BATCH_SIZE,
+)
+from utils.enums import Label, RelationshipType
+
+
+class AsyncNeo4jDriver:
+    """asyncio counterpart of Neo4jDriver built on the official async driver."""
+
+    def __init__(self, logger: Logger):
+        self._logger = logger
+        self._connection_model: ConnectionModel = None
+        self._driver = None
+
+    async def _test_connection(self) -> bool:
+        """Test the connection to the Neo4j database."""
+        try:
+            _ = await self._driver.execute_query("RETURN 1")
+            return True
+        except Exception as e:
+            return False
+
+    async def connect(self, connection_model: ConnectionModel) -> None:
+        """Establish a connection to the Neo4j database."""
+        try:
+            self._connection_model = connection_model
+            self._driver = AsyncGraphDatabase.driver(
+                connection_model.host,
+                auth=(connection_model.user, connection_model.password),
+                **connection_model.driver_config(),
+            )
+
+            if not await self._test_connection():
+                raise ValueError("Connection test failed.")
+
+            self._logger.log_info("Successfully connected to Neo4j database.")
+
+        except Exception as e:
+            self._logger.log_error("Failed to connect to Neo4j: %s", e)
+
+    def use_backend(self, backend) -> None:
+        """Run queries through `backend`, any object with the neo4j.AsyncDriver
+        session API, e.g. benchmarks.fake_backend.AsyncFakeNeo4jDriver."""
+        self._driver = backend
+        self._logger.log_info("Using backend: %s", type(backend).__name__)
+
+    async def disconnect(self):
+        await self._driver.close()
+        self._logger.log_info("Successfully disconnected to Neo4j database.")
+
+    def _session(self):
+        """Open a session on the configured database."""
+        if self._connection_model and self._connection_model.database:
+            return self._driver.session(database=self._connection_model.database)
+        return self._driver.session()
+
+    async def execute_query(self, query: str, parameters=None):
+        if not self._driver:
+            self._logger.log_error("Driver is not initialized. Please connect first.")
+            raise RuntimeError("Driver is not initialized. Please connect first.")
+
+        if self._logger.is_enabled(LogType.INFO):
+            self._logger.log_info(
+                'Executing query: "%s" with parameters: %s',
+                query,
+                Neo4jDriver._describe_parameters(parameters),
+            )
+
+        try:
+            async with self._session() as session:
+                response = await session.run(query, parameters or {})
+                result = await response.data()
+            self._logger.log_info(
+                "Query executed successfully. Retrieved %d records.", len(result)
+            )
+            return result
+        except Exception as e:
+            self._logger.log_error("Query execution failed: %s", e)
+            raise RuntimeError(f"Query execution failed: {e}")
+
+    async def gather(
+        self,
+        calls: Iterable[Awaitable[Any]],
+        max_concurrency: int = NEO4J_DEFAULT_MAX_CONCURRENCY,
+    ) -> List[Any]:
+        """Await many driver calls with at most `max_concurrency` in flight.
+
+        Results are returned in the order of `calls`, like asyncio.gather.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def limited(call: Awaitable[Any]) -> Any:
+            async with semaphore:
+                return await call
+
+        return await asyncio.gather(*(limited(call) for call in calls))
+
+    async def get_nodes(
+        self,
+        labels: List[Label] = None,
+        properties: Dict[str, any] = None,
+        limit: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
+    ) -> List[Node]:
+        """Retrieve nodes with a specific labels."""
+        query, parameters = query_builder.get_nodes(labels, properties, limit)
+        self._logger.log_info("Retrieving nodes with labels: %s", _Names(labels))
+        result = await self.execute_query(query, parameters)
+        return result_converter.to_nodes(result) if result else []
+
+    async def create_node(
+        self, labels: List[Label], properties: Dict[str, Any]
+    ) -> Node:
+        """Create a new node in the Neo4j database."""
+        query, parameters = query_builder.create_node(labels, properties)
+        result = await self.execute_query(query, parameters)
+        return result_converter.to_nodes(result)[0] if result else None
+
+    async def update_nodes(
+        self,
+        labels: List[Label] = None,
+        match_criteria: Dict[str, Any] = None,
+        new_properties: Dict[str, Any] = None,
+    ) -> List[Node]:
+        """Update an existing node in the Neo4j database."""
+        if not new_properties:
+            self._logger.log_error("New properties must be provided for update.")
+            raise ValueError("New properties must be provided for update.")
+
+        query, parameters = query_builder.update_nodes(
+            labels, match_criteria, new_properties
+        )
+
+        self._logger.log_info(
+            "Updating node with labels: %s and match_criteria: %s, new_properties: %s",
+            _Names(labels),
+            match_criteria or {},
+            new_properties,
+        )
+
+        result = await self.execute_query(query, parameters)
+        return result_converter.to_nodes(result)[0] if result else None
+
+    async def _run_in_batches(
+        self,
+        query: str,
+        parameters: Dict[str, Any],
+        progress_key: str,
+        on_progress: Callable[[str, int], None] = None,
+        cancel: asyncio.Event = None,
+    ) -> int:
+        """Run a delete that touches at most $limit entities until it touches fewer."""
+        total = 0
+        while True:
+            if cancel is not None and cancel.is_set():
+                self._logger.log_warning(
+                    "Cancelled after %d %s in batches of %d",
+                    total,
+                    progress_key,
+                    parameters["limit"],
+                )
+                break
+            result = await self.execute_query(query, parameters)
+            count = result[0]["deleted_count"] if result else 0
+            total += count
+            if on_progress is not None:
+                on_progress(progress_key, total)
+            if count < parameters["limit"]:
+                break
+        return total
+
+    async def delete_nodes(
+        self,
+        labels: List[Label] = None,
+        match_criteria: Dict[str, Any] = None,
+        force: bool = False,
+        batch_size: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+        on_progress: Callable[[str, int], None] = None,
+        cancel: asyncio.Event = None,
+    ) -> int:
+        """Delete nodes and their relationships in batches, as Neo4jDriver.delete_nodes."""
+        delete_all = not labels and not match_criteria
+        if delete_all and not force:
+            self._logger.log_warning(
+                "No labels or match criteria provided. If you want to delete all nodes, set force=True."
+            )
+            return None
+
+        self._logger.log_info(
+            "Deleting nodes with labels: %s and match criteria: %s in batches of %d",
+            _Names(labels),
+            match_criteria or {},
+            batch_size,
+        )
+
+        if not match_criteria:
+            query, parameters = query_builder.delete_node_relationships(labels, batch_size)
+            await self._run_in_batches(query, parameters, "relationships", on_progress, cancel)
+        query, parameters = query_builder.delete_nodes(labels, match_criteria, batch_size)
+        deleted_count = await self._run_in_batches(
+            query, parameters, "nodes", on_progress, cancel
+        )
+        if delete_all:
+            self._logger.log_warning(
+                "Deleted all (%d) nodes in the database (force=True).", deleted_count
+            )
+        else:
+            self._logger.log_info("Deleted %d node(s) from the database.", deleted_count)
+        return deleted_count
+
+    async def get_relationships(
+        self,
+        types: List[RelationshipType] = None,
+        start_node_labels: List[Label] = None,
+        start_node_properties: Dict[str, Any] = None,
+        end_node_labels: List[Label] = None,
+        end_node_properties: Dict[str, Any] = None,
+        limit: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
+    ) -> List[Relationship]:
+        """Retrieve relationships between nodes."""
+        query, parameters = query_builder.get_relationships(
+            types,
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            limit,
+        )
+        result = await self.execute_query(query, parameters)
+        return result_converter.to_relationships(result) if result else None
+
+    async def create_relationship(
+        self,
+        start_node_labels: List[Label],
+        start_node_properties: Dict[str, Any],
+        end_node_labels: List[Label],
+        end_node_properties: Dict[str, Any],
+        type: RelationshipType,
+        properties: Dict[str, Any] = None,
+    ) -> Relationship:
+        """Create a relationship between two nodes."""
+        query, parameters = query_builder.create_relationship(
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            type,
+            properties,
+        )
+        result = await self.execute_query(query, parameters)
+        return result_converter.to_relationships(result)[0] if result else None
+
+    async def update_relationships(
+        self,
+        start_node_labels: List[Label] = None,
+        start_node_properties: Dict[str, Any] = None,
+        end_node_labels: List[Label] = None,
+        end_node_properties: Dict[str, Any] = None,
+        relationship_type: RelationshipType = None,
+        new_properties: Dict[str, Any] = None,
+    ) -> List[Relationship]:
+        """Update an existing relationship with new properties."""
+        if not relationship_type:
+            self._logger.log_error("Relationship type must be provided.")
+            raise ValueError("Relationship type must be provided.")
+
+        if not new_properties:
+            self._logger.log_error("New properties must be provided for update.")
+            raise ValueError("New properties must be provided for update.")
+
+        query, parameters = query_builder.update_relationships(
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            relationship_type,
+            new_properties,
+        )
+
+        self._logger.log_info(
+            "Updating relationship of type '%s' with new properties: %s",
+            relationship_type.value,
+            new_properties,
+        )
+
+        result = await self.execute_query(query, parameters)
+        return result_converter.to_relationships(result) if result else None
+
+    async def delete_relationships(
+        self,
+        start_node_labels: List[Label] = None,
+        start_node_properties: Dict[str, Any] = None,
+        end_node_labels: List[Label] = None,
+        end_node_properties: Dict[str, Any] = None,
+        relationship_type: RelationshipType = None,
+        force: bool = False,
+        batch_size: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+        on_progress: Callable[[str, int], None] = None,
+        cancel: asyncio.Event = None,
+    ) -> int:
+        """Delete relationships in batches, as Neo4jDriver.delete_relationships."""
+        delete_all = (
+            not start_node_labels
+            and not start_node_properties
+            and not end_node_labels
+            and not end_node_properties
+            and not relationship_type
+        )
+        if delete_all and not force:
+            self._logger.log_warning(
+                "No specific labels or match criteria provided. If you want to delete all relationships, set force=True."
+            )
+            return None
+
+        query, parameters = query_builder.delete_relationships(
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            relationship_type,
+            batch_size,
+        )
+
+        self._logger.log_info(
+            "Deleting relationships of type: %s, start_node_labels: %s, end_node_labels: %s "
+            "in batches of %d",
+            relationship_type.value if relationship_type else "*",
+            _Names(start_node_labels),
+            _Names(end_node_labels),
+            batch_size,
+        )
+
+        deleted_count = await self._run_in_batches(
+            query, parameters, "relationships", on_progress, cancel
+        )
+        if delete_all:
+            self._logger.log_warning(
+                "Deleted all (%d) relationships in the database (force=True).", deleted_count
+            )
+        else:
+            self._logger.log_info("Deleted %d relationship(s).", deleted_count)
+        return deleted_count
@@ -1,20 +1,63 @@
-from typing import Any, Dict, List
+import copy
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union
 from neo4j import GraphDatabase
-from datetime import date, datetime
-from neo4j.time import Date as Neo4jDate, DateTime as Neo4jDateTime
 
-from logger.logger import Logger
+from database_driver import query_builder, result_converter
+from database_driver.query_cache import QueryCache, label_tags, type_tags
+from database_driver.query_metrics import QueryMetrics, server_time
+from database_driver.schema_manager import SchemaManager
+from logger.logger import Logger, LogType
+from models.neo4j_driver_models.columnar_models import NodeTable, RelationshipTable
 from models.neo4j_driver_models.connection_model import ConnectionModel
-from models.neo4j_driver_models.database_models import Node, Relationship
-from utils.constants import NEO4J_DEFAULT_NUMBER_OF_NODES
+from models.neo4j_driver_models.database_models import Node, Page, Relationship
+from utils.constants import (
+    NEO4J_DEFAULT_BATCH_SIZE,
+    NEO4J_DEFAULT_FETCH_SIZE,
+    NEO4J_DEFAULT_NUMBER_OF_NODES,
+    NEO4J_MAINTENANCE_BATCH_SIZE,
+)
 from utils.enums import Label, RelationshipType
+from utils.utils import chunked
+
+
+class _Names:
+    """Log argument showing the values of labels or types, or "*" when there
+    are none, rendered only if the message is written."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items):
+        self._items = items
+
+    def __str__(self) -> str:
+        return str([item.value for item in self._items]) if self._items else "*"
 
 
 class Neo4jDriver:
-    def __init__(self, logger: Logger):
+    """Synchronous Neo4j client for the graph of this project.
+
+    With a QueryCache, get_nodes and get_relationships list reads are cached
+    and the write methods of this class invalidate the labels and types they
+    touch. Writes sent as raw Cypher through execute_query (or stream_query)
+    are not inspected and never invalidate the cache; call
+    `cache.invalidate(...)` after them, or clear it.
+    """
+
+    def __init__(
+        self, logger: Logger, metrics: QueryMetrics = None, cache: QueryCache = None
+    ):
         self._logger = logger
+        self._metrics = metrics
+        self._cache = cache
         self._connection_model: ConnectionModel = None
         self._driver = None
+        self._transaction = None
+        # Cache tags written inside a transaction, invalidated once it commits.
+        self._pending_tags: List[str] = None
 
     def _test_connection(self) -> bool:
         """Test the connection to the Neo4j database."""
@@ -24,13 +67,20 @@ class Neo4jDriver:
         except Exception as e:
             return False
 
-    def connect(self, connection_model: ConnectionModel) -> None:
-        """Establish a connection to the Neo4j database."""
+    def connect(
+        self, connection_model: ConnectionModel, apply_schema: bool = True
+    ) -> None:
+        """Establish a connection to the Neo4j database.
+
+        With `apply_schema`, the indexes and constraints declared in
+        schema_manager are created if they do not exist yet.
+        """
         try:
             self._connection_model = connection_model
             self._driver = GraphDatabase.driver(
                 connection_model.host,
                 auth=(connection_model.user, connection_model.password),
+                **connection_model.driver_config(),
             )
 
             if not self._test_connection():
@@ -38,133 +88,449 @@ class Neo4jDriver:
 
             self._logger.log_info("Successfully connected to Neo4j database.")
 
+            if apply_schema:
+                SchemaManager(self, self._logger).apply()
+
         except Exception as e:
-            self._logger.log_error(f"Failed to connect to Neo4j: {e}")
+            self._logger.log_error("Failed to connect to Neo4j: %s", e)
+
+    def use_backend(self, backend) -> None:
+        """Run queries through `backend`, any object with the neo4j.Driver
+        session API, e.g. the in-process stand-in of benchmarks.fake_backend."""
+        self._driver = backend
+        self._logger.log_info("Using backend: %s", type(backend).__name__)
 
     def disconnect(self):
         self._driver.close()
         self._logger.log_info("Successfully disconnected to Neo4j database.")
 
-    def execute_query(self, query: str, parameters=None):
+    def _session(self, **config):
+        """Open a session on the configured database."""
+        if self._connection_model and self._connection_model.database:
+            config.setdefault("database", self._connection_model.database)
+        return self._driver.session(**config)
+
+    def _bind(self, transaction) -> "Neo4jDriver":
+        """Return a copy of this driver that runs every query in `transaction`."""
+        bound = copy.copy(self)
+        bound._transaction = transaction
+        bound._pending_tags = []
+        return bound
+
+    @contextmanager
+    def transaction(self) -> Iterator["Neo4jDriver"]:
+        """Yield a driver bound to one session and one explicit transaction.
+
+        The transaction is committed when the block exits normally and rolled
+        back if it raises. Nested calls join the outer transaction. Cached
+        reads touched by its writes are invalidated after the commit.
+        """
         if not self._driver:
             self._logger.log_error("Driver is not initialized. Please connect first.")
             raise RuntimeError("Driver is not initialized. Please connect first.")
 
-        self._logger.log_info(
-            f'Executing query: "{query}" with parameters: {parameters}'
-        )
+        if self._transaction is not None:
+            yield self
+            return
+
+        with self._session() as session:
+            transaction = session.begin_transaction()
+            try:
+                bound = self._bind(transaction)
+                yield bound
+                transaction.commit()
+                self._invalidate(bound._pending_tags)
+            except Exception as e:
+                self._logger.log_error("Transaction rolled back: %s", e)
+                transaction.rollback()
+                raise
+            finally:
+                transaction.close()
+
+    def execute_read(self, work: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `work(driver, *args, **kwargs)` in a managed read transaction.
+
+        The transaction is retried on transient errors, so `work` must be idempotent.
+        """
+        return self._execute_managed("execute_read", work, *args, **kwargs)
+
+    def execute_write(self, work: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `work(driver, *args, **kwargs)` in a managed write transaction.
+
+        The transaction is retried on transient errors, so `work` must be idempotent.
+        """
+        return self._execute_managed("execute_write", work, *args, **kwargs)
+
+    def _execute_managed(
+        self, access_mode: str, work: Callable[..., Any], *args, **kwargs
+    ) -> Any:
+        if not self._driver:
+            self._logger.log_error("Driver is not initialized. Please connect first.")
+            raise RuntimeError("Driver is not initialized. Please connect first.")
+
+        if self._transaction is not None:
+            return work(self, *args, **kwargs)
+
+        attempts = []
+
+        def run(transaction):
+            bound = self._bind(transaction)
+            attempts.append(bound)
+            return work(bound, *args, **kwargs)
+
+        with self._session() as session:
+            result = getattr(session, access_mode)(run)
+        # Only the attempt that committed counts; retried ones were rolled back.
+        self._invalidate(attempts[-1]._pending_tags)
+        return result
+
+    def execute_query(self, query: str, parameters=None, operation: str = None):
+        """Run `query` and return its records as dicts.
+
+        With QueryMetrics, the query is recorded under `operation`, by
+        default the name of the calling method.
+        """
+        if not self._driver:
+            self._logger.log_error("Driver is not initialized. Please connect first.")
+            raise RuntimeError("Driver is not initialized. Please connect first.")
 
+        if self._logger.is_enabled(LogType.INFO):
+            self._logger.log_info(
+                'Executing query: "%s" with parameters: %s',
+                query,
+                self._describe_parameters(parameters),
+            )
+
+        if self._metrics and operation is None:
+            operation = sys._getframe(1).f_code.co_name
+        start = time.perf_counter()
         try:
-            with self._driver.session() as session:
-                response = session.run(query, parameters or {})
+            if self._transaction is not None:
+                response = self._transaction.run(query, parameters or {})
                 result = [element.data() for element in response]
-                self._logger.log_info(
-                    f"Query executed successfully. Retrieved {len(result)} records."
-                )
-                return result
+                summary = response.consume() if self._metrics else None
+            else:
+                with self._session() as session:
+                    response = session.run(query, parameters or {})
+                    result = [element.data() for element in response]
+                    summary = response.consume() if self._metrics else None
+            self._record_metrics(
+                operation, query, parameters, start, len(result), summary
+            )
+            self._logger.log_info(
+                "Query executed successfully. Retrieved %d records.", len(result)
+            )
+            return result
         except Exception as e:
-            self._logger.log_error(f"Query execution failed: {e}")
+            self._record_metrics(operation, query, parameters, start, error=True)
+            self._logger.log_error("Query execution failed: %s", e)
+            if self._transaction is not None:
+                # Keep the original error so managed transactions can retry transient ones.
+                raise
             raise RuntimeError(f"Query execution failed: {e}")
 
-    def _cast_to_nodes(self, result: List[Dict[str, Any]]) -> List[Node]:
-        def convert_value(value):
-            if isinstance(value, Neo4jDate):
-                # Convert Neo4j Date to Python date
-                return date(value.year, value.month, value.day)
-            elif isinstance(value, Neo4jDateTime):
-                # Convert Neo4j DateTime to Python datetime
-                return datetime(
-                    value.year,
-                    value.month,
-                    value.day,
-                    value.hour,
-                    value.minute,
-                    value.second,
-                    value.microsecond,
-                )
-            return value  # Leave other types unchanged
+    def explain(self, query: str, parameters=None) -> Dict[str, Any]:
+        """Return the plan Neo4j would use for `query`, without running it."""
+        if not self._driver:
+            self._logger.log_error("Driver is not initialized. Please connect first.")
+            raise RuntimeError("Driver is not initialized. Please connect first.")
+
+        with self._session() as session:
+            summary = session.run(f"EXPLAIN {query}", parameters or {}).consume()
+        return summary.plan
+
+    def stream_query(
+        self,
+        query: str,
+        parameters=None,
+        fetch_size: int = NEO4J_DEFAULT_FETCH_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield records one by one as they arrive from the server.
+
+        Only `fetch_size` records are buffered at a time. The session stays
+        open until the generator is exhausted or closed.
+        """
+        if not self._driver:
+            self._logger.log_error("Driver is not initialized. Please connect first.")
+            raise RuntimeError("Driver is not initialized. Please connect first.")
 
-        def convert_props(props):
-            return {k: convert_value(v) for k, v in props.items()}
+        operation = sys._getframe(1).f_code.co_name if self._metrics else None
+        return self._stream_records(query, parameters, fetch_size, operation)
 
-        return [
-            Node(
-                id=entry["id"],
-                labels=entry["labels"],
-                properties=convert_props(entry["properties"]),
+    def _stream_records(
+        self, query: str, parameters, fetch_size: int, operation: str
+    ) -> Iterator[Dict[str, Any]]:
+        if self._logger.is_enabled(LogType.INFO):
+            self._logger.log_info(
+                'Streaming query: "%s" with parameters: %s',
+                query,
+                self._describe_parameters(parameters),
             )
-            for entry in result
-        ]
 
+        count = 0
+        start = time.perf_counter()
+        try:
+            if self._transaction is not None:
+                response = self._transaction.run(query, parameters or {})
+                for element in response:
+                    count += 1
+                    yield element.data()
+                summary = response.consume() if self._metrics else None
+            else:
+                with self._session(fetch_size=fetch_size) as session:
+                    response = session.run(query, parameters or {})
+                    for element in response:
+                        count += 1
+                        yield element.data()
+                    summary = response.consume() if self._metrics else None
+            self._record_metrics(operation, query, parameters, start, count, summary)
+            self._logger.log_info(
+                "Query streamed successfully. Retrieved %d records.", count
+            )
+        except GeneratorExit:
+            self._record_metrics(operation, query, parameters, start, count)
+            self._logger.log_info("Stream closed after %d records.", count)
+            raise
+        except Exception as e:
+            self._record_metrics(operation, query, parameters, start, count, error=True)
+            self._logger.log_error("Query execution failed: %s", e)
+            if self._transaction is not None:
+                raise
+            raise RuntimeError(f"Query execution failed: {e}")
+
+    def _record_metrics(
+        self,
+        operation: str,
+        query: str,
+        parameters: Dict[str, Any],
+        start: float,
+        records: int = 0,
+        summary=None,
+        error: bool = False,
+    ) -> None:
+        if not self._metrics:
+            return
+        self._metrics.record(
+            operation=operation,
+            query=query,
+            wall_time=time.perf_counter() - start,
+            records=records,
+            parameter_bytes=len(repr(parameters)) if parameters else 0,
+            server_time=server_time(summary),
+            error=error,
+        )
+
+    def _from_cache(self, query: str, parameters: Dict[str, Any]):
+        """Return (True, result) if the read is cached. Reads inside a
+        transaction never use the cache, as they may see uncommitted data."""
+        if self._cache is None or self._transaction is not None:
+            return False, None
+        key = self._cache.key(query, parameters)
+        if key is None:
+            return False, None
+        hit, result = self._cache.get(key)
+        return hit, self._copy_rows(result) if hit else None
+
+    def _to_cache(
+        self, query: str, parameters: Dict[str, Any], result, tags: List[str]
+    ) -> None:
+        if self._cache is None or self._transaction is not None:
+            return
+        key = self._cache.key(query, parameters)
+        if key is not None:
+            self._cache.put(key, self._copy_rows(result), tags)
+
+    @staticmethod
+    def _copy_rows(value: Any) -> Any:
+        """Copy the dicts and lists of result rows, so that callers modifying
+        the properties of their nodes do not modify a cached result."""
+        if isinstance(value, dict):
+            return {k: Neo4jDriver._copy_rows(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [Neo4jDriver._copy_rows(v) for v in value]
+        return value
+
+    def _invalidate(self, tags: List[str]) -> None:
+        """Drop cached reads that a write to `tags` may have changed.
+
+        Inside a transaction the tags are kept until it commits: dropping
+        entries earlier would let reads made meanwhile outside of it cache
+        pre-commit data again, and a rollback would drop them for nothing.
+        """
+        if self._pending_tags is not None:
+            self._pending_tags.extend(tags)
+        elif self._cache is not None and tags:
+            self._cache.invalidate(tags)
+
+    @staticmethod
+    def _describe_parameters(parameters: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Shorten list parameters (e.g. UNWIND rows) so they do not flood the log."""
+        if not parameters:
+            return parameters
+        return {
+            key: (
+                f"<{len(value)} rows>"
+                if isinstance(value, list) and len(value) > 10
+                else value
+            )
+            for key, value in parameters.items()
+        }
+
+    @staticmethod
+    def _cast_to_nodes(
+        result: List[Dict[str, Any]], convert_values: bool = True
+    ) -> List[Node]:
+        return result_converter.to_nodes(result, convert_values)
+
+    @staticmethod
+    def _iter_nodes(
+        result: Iterable[Dict[str, Any]], convert_values: bool = True
+    ) -> Iterator[Node]:
+        return result_converter.iter_nodes(result, convert_values)
+
+    @staticmethod
     def _cast_to_relationships(
-        self, result: List[Dict[str, Any]]
+        result: List[Dict[str, Any]], convert_values: bool = True
     ) -> List[Relationship]:
-        def convert_value(value):
-            if isinstance(value, Neo4jDate):
-                return date(value.year, value.month, value.day)
-            elif isinstance(value, Neo4jDateTime):
-                return datetime(
-                    value.year,
-                    value.month,
-                    value.day,
-                    value.hour,
-                    value.minute,
-                    value.second,
-                    value.microsecond,
-                )
-            return value
-
-        def convert_props(props):
-            return {k: convert_value(v) for k, v in props.items()}
-
-        return [
-            Relationship(
-                id=entry["id"],
-                start_id=entry["start_id"],
-                end_id=entry["end_id"],
-                type=entry["type"],
-                properties=convert_props(entry["properties"]),
-            )
-            for entry in result
-        ]
+        return result_converter.to_relationships(result, convert_values)
+
+    @staticmethod
+    def _iter_relationships(
+        result: Iterable[Dict[str, Any]], convert_values: bool = True
+    ) -> Iterator[Relationship]:
+        return result_converter.iter_relationships(result, convert_values)
 
     def get_nodes(
         self,
         labels: List[Label] = None,
         properties: Dict[str, any] = None,
         limit: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
-    ) -> list[Node]:
-        """Retrieve nodes with a specific labels."""
-        if labels:
-            query = f"MATCH (n:{':'.join([label.value for label in labels])})"
-        else:
-            query = "MATCH (n)"
-        if properties:
-            query += " WHERE " + " AND ".join(
-                [
-                    (
-                        f"n.{key} = '{value}'"
-                        if isinstance(value, str)
-                        else f"n.{key} = {value}"
-                    )
-                    for key, value in properties.items()
-                ]
+        stream: bool = False,
+        fetch_size: int = NEO4J_DEFAULT_FETCH_SIZE,
+        convert_values: bool = True,
+    ) -> Union[List[Node], Iterator[Node]]:
+        """Retrieve nodes with a specific labels.
+
+        With `stream=True` a generator of nodes is returned instead of a list,
+        so memory stays constant. Pass `limit=None` to read every matching node,
+        and `convert_values=False` to keep Neo4j temporal types as they are.
+        If the driver has a QueryCache, list reads are served from it.
+        """
+        query, parameters = query_builder.get_nodes(labels, properties, limit)
+        self._logger.log_info("Retrieving nodes with labels: %s", _Names(labels))
+        if stream:
+            return self._iter_nodes(
+                self.stream_query(query, parameters, fetch_size=fetch_size),
+                convert_values,
             )
-        query += " RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties"
-        query += f" LIMIT {limit}"
+        cached, result = self._from_cache(query, parameters)
+        if not cached:
+            result = self.execute_query(query, parameters)
+            self._to_cache(query, parameters, result, label_tags(labels))
+        return self._cast_to_nodes(result, convert_values) if result else []
+
+    def get_nodes_columnar(
+        self,
+        labels: List[Label] = None,
+        properties: Dict[str, any] = None,
+        limit: int = None,
+        fetch_size: int = NEO4J_DEFAULT_FETCH_SIZE,
+        convert_values: bool = True,
+    ) -> NodeTable:
+        """Stream matching nodes into a columnar NodeTable.
+
+        No Node objects or per-row dicts are kept, so bulk reads take a
+        fraction of the memory of get_nodes and convert to pandas cheaply.
+        """
+        query, parameters = query_builder.get_nodes(labels, properties, limit)
+        self._logger.log_info("Retrieving nodes into a table with labels: %s", _Names(labels))
+        convert_props = result_converter.PropertyConverter(convert_values)
+        table = NodeTable()
+        for entry in self.stream_query(query, parameters, fetch_size=fetch_size):
+            table.append(entry["id"], entry["labels"], convert_props(entry["properties"]))
+        table.properties.compact()
+        return table
+
+    def get_nodes_page(
+        self,
+        labels: List[Label] = None,
+        properties: Dict[str, Any] = None,
+        page_size: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
+        cursor: Any = None,
+        cursor_property: str = None,
+    ) -> Page:
+        """Retrieve one page of nodes ordered by a cursor key.
+
+        The key is the internal id, or `cursor_property` if given (it must be
+        unique and indexed). Pass the returned `next_cursor` to get the next
+        page; it is None once the last page has been read.
+        """
+        query, parameters = query_builder.get_nodes_page(
+            labels, properties, page_size, cursor, cursor_property
+        )
         self._logger.log_info(
-            f"Retrieving nodes with labels: {[label.value for label in labels] if labels else '*'} "
+            "Retrieving page of nodes with labels: %s after cursor: %s", _Names(labels), cursor
         )
-        result = self.execute_query(query)
-        return self._cast_to_nodes(result) if result else []
+        result = self.execute_query(query, parameters)
+        next_cursor = result[-1]["cursor"] if len(result) == page_size else None
+        return Page(items=self._cast_to_nodes(result), next_cursor=next_cursor)
+
+    def iter_node_pages(
+        self,
+        labels: List[Label] = None,
+        properties: Dict[str, Any] = None,
+        page_size: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
+        cursor: Any = None,
+        cursor_property: str = None,
+    ) -> Iterator[Page]:
+        """Walk all matching nodes page by page, starting after `cursor`."""
+        while True:
+            page = self.get_nodes_page(
+                labels, properties, page_size, cursor, cursor_property
+            )
+            if page.items:
+                yield page
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
 
     def create_node(self, labels: List[Label], properties: Dict[str, Any]) -> Node:
         """Create a new node in the Neo4j database."""
-        query = f"CREATE (n:{':'.join([label.value for label in labels])}) SET n = $properties RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties"
-        parameters = {"properties": properties}
+        query, parameters = query_builder.create_node(labels, properties)
         result = self.execute_query(query, parameters)
+        self._invalidate(label_tags(labels))
         return self._cast_to_nodes(result)[0] if result else None
 
+    def create_nodes_batch(
+        self,
+        labels: List[Label],
+        properties_list: List[Dict[str, Any]],
+        chunk_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+        return_nodes: bool = True,
+    ) -> Union[List[Node], int]:
+        """Create many nodes with one UNWIND query per chunk.
+
+        Returns the created nodes, or only their count if `return_nodes` is False.
+        """
+        query = query_builder.create_nodes_batch(labels, return_nodes)
+
+        self._logger.log_info(
+            "Creating %d node(s) with labels: %s in chunks of %d",
+            len(properties_list),
+            _Names(labels),
+            chunk_size,
+        )
+
+        nodes, count = [], 0
+        for chunk in chunked(properties_list, chunk_size):
+            result = self.execute_query(query, {"rows": chunk})
+            if return_nodes:
+                nodes.extend(self._cast_to_nodes(result))
+            else:
+                count += result[0]["count"] if result else 0
+        self._invalidate(label_tags(labels))
+        return nodes if return_nodes else count
+
     def update_nodes(
         self,
         labels: List[Label] = None,
@@ -176,71 +542,249 @@ class Neo4jDriver:
             self._logger.log_error("New properties must be provided for update.")
             raise ValueError("New properties must be provided for update.")
 
-        match_clause = "MATCH (n"
-        if labels:
-            match_clause += f":{':'.join(label.value for label in labels)}"
-        match_clause += ")"
-
-        where_clause = ""
-        if match_criteria:
-            conditions = [f"n.{key} = ${key}" for key in match_criteria]
-            where_clause = "WHERE " + " AND ".join(conditions)
-
-        query = f"""
-        {match_clause}
-        {where_clause}
-        SET n += $new_properties
-        RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties
-        """
-
-        parameters = {**(match_criteria or {}), "new_properties": new_properties}
+        query, parameters = query_builder.update_nodes(
+            labels, match_criteria, new_properties
+        )
 
         self._logger.log_info(
-            f"Updating node with labels: {[label.value for label in labels] if labels else '*'} "
-            f"and match_criteria: {match_criteria or '{}'}, new_properties: {new_properties}"
+            "Updating node with labels: %s and match_criteria: %s, new_properties: %s",
+            _Names(labels),
+            match_criteria or {},
+            new_properties,
         )
 
         result = self.execute_query(query, parameters)
+        self._invalidate(label_tags(labels))
         return self._cast_to_nodes(result)[0] if result else None
 
+    def update_nodes_batch(
+        self,
+        labels: List[Label] = None,
+        updates: List[Dict[str, Dict[str, Any]]] = None,
+        chunk_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+        return_nodes: bool = True,
+    ) -> Union[List[Node], int]:
+        """Apply many updates with one UNWIND query per chunk.
+
+        Each update is a dict with "match_criteria" and "new_properties" entries.
+        All updates must use the same match_criteria keys.
+        Returns the updated nodes, or only their count if `return_nodes` is False.
+        """
+        if not updates:
+            self._logger.log_error("Updates must be provided for batch update.")
+            raise ValueError("Updates must be provided for batch update.")
+
+        match_keys = query_builder.shared_keys(updates, "match_criteria")
+        if not match_keys:
+            self._logger.log_error(
+                "All updates must share the same non-empty match_criteria keys."
+            )
+            raise ValueError(
+                "All updates must share the same non-empty match_criteria keys."
+            )
+
+        query = query_builder.update_nodes_batch(labels, match_keys, return_nodes)
+
+        self._logger.log_info(
+            "Updating nodes with labels: %s using %d update(s) matched on %s in chunks of %d",
+            _Names(labels),
+            len(updates),
+            match_keys,
+            chunk_size,
+        )
+
+        nodes, count = [], 0
+        for chunk in chunked(updates, chunk_size):
+            result = self.execute_query(query, {"rows": chunk})
+            if return_nodes:
+                nodes.extend(self._cast_to_nodes(result))
+            else:
+                count += result[0]["count"] if result else 0
+        self._invalidate(label_tags(labels))
+        return nodes if return_nodes else count
+
+    def merge_nodes_batch(
+        self,
+        labels: List[Label],
+        updates: List[Dict[str, Dict[str, Any]]],
+        version_key: str = None,
+        chunk_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+        return_nodes: bool = True,
+    ) -> Union[List[Node], int]:
+        """Create or update many nodes with one UNWIND ... MERGE query per chunk.
+
+        Each update is a dict with "match_criteria" and "new_properties" entries,
+        as for update_nodes_batch. Nodes that do not match are created.
+        If `version_key` is given, a node is only updated when its stored
+        `version_key` property is missing or not newer than the incoming one.
+        Returns the merged nodes, or only their count if `return_nodes` is False.
+        """
+        if not updates:
+            self._logger.log_error("Updates must be provided for batch merge.")
+            raise ValueError("Updates must be provided for batch merge.")
+
+        match_keys = query_builder.shared_keys(updates, "match_criteria")
+        if not match_keys:
+            self._logger.log_error(
+                "All updates must share the same non-empty match_criteria keys."
+            )
+            raise ValueError(
+                "All updates must share the same non-empty match_criteria keys."
+            )
+
+        query = query_builder.merge_nodes_batch(
+            labels, match_keys, version_key, return_nodes
+        )
+
+        self._logger.log_info(
+            "Merging %d node(s) with labels: %s on %s in chunks of %d",
+            len(updates),
+            _Names(labels),
+            match_keys,
+            chunk_size,
+        )
+
+        nodes, count = [], 0
+        for chunk in chunked(updates, chunk_size):
+            result = self.execute_query(query, {"rows": chunk})
+            if return_nodes:
+                nodes.extend(self._cast_to_nodes(result))
+            else:
+                count += result[0]["count"] if result else 0
+        self._invalidate(label_tags(labels))
+        return nodes if return_nodes else count
+
+    def _run_in_batches(
+        self,
+        query: str,
+        parameters: Dict[str, Any],
+        count_key: str,
+        progress_key: str,
+        operation: str,
+        on_progress: Callable[[str, int], None] = None,
+        cancel: threading.Event = None,
+    ) -> int:
+        """Run a query that touches at most $limit entities until it touches fewer.
+
+        Each run is a transaction of its own (unless the driver is bound to a
+        transaction), so server memory is bounded by the batch size rather than
+        by the number of entities. Returns the total touched.
+        """
+        total = 0
+        while True:
+            if cancel is not None and cancel.is_set():
+                self._logger.log_warning(
+                    "Cancelled after %d %s in batches of %d",
+                    total,
+                    progress_key,
+                    parameters["limit"],
+                )
+                break
+            result = self.execute_query(query, parameters, operation=operation)
+            count = result[0][count_key] if result else 0
+            total += count
+            if on_progress is not None:
+                on_progress(progress_key, total)
+            if count < parameters["limit"]:
+                break
+        return total
+
     def delete_nodes(
         self,
         labels: List[Label] = None,
         match_criteria: Dict[str, Any] = None,
         force: bool = False,
+        batch_size: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+        on_progress: Callable[[str, int], None] = None,
+        cancel: threading.Event = None,
     ) -> int:
-        """Delete a node from the Neo4j database."""
-        if not labels and not match_criteria:
-            if force:
-                self._logger.log_warning(
-                    "No labels or match criteria provided. If you want to delete all nodes, set force=True."
-                )
-                return None
-            else:
-                query = "MATCH (n) DETACH DELETE n RETURN count(n) AS deleted_count"
-                result = self.execute_query(query)
-                deleted_count = result[0]["deleted_count"] if result else 0
-                self._logger.log_warning(
-                    f"Deleted all ({deleted_count}) nodes in the database (force=True)."
-                )
-                return deleted_count
+        """Delete nodes and their relationships in batches of `batch_size`.
 
-        query = f"MATCH (n{':' + ':'.join(label.value for label in labels) if labels else ''})"
-        if match_criteria:
-            conditions = [f"n.{key} = ${key}" for key in match_criteria.keys()]
-            query += " WHERE " + " AND ".join(conditions)
-        query += " DETACH DELETE n RETURN count(n) AS deleted_count"
+        Deleting every node requires force=True. Without match_criteria the
+        relationships of the nodes are deleted first, in batches as well, so
+        detaching a node with millions of relationships is not one transaction.
+        `on_progress("relationships" | "nodes", deleted)` is called after each
+        batch. Setting `cancel` stops between batches; deleted batches stay deleted.
+        """
+        delete_all = not labels and not match_criteria
+        if delete_all and not force:
+            self._logger.log_warning(
+                "No labels or match criteria provided. If you want to delete all nodes, set force=True."
+            )
+            return None
 
         self._logger.log_info(
-            f"Deleting nodes with labels: {[label.value for label in labels] if labels else '*'} "
-            f"and match criteria: {match_criteria or '{}'}"
+            "Deleting nodes with labels: %s and match criteria: %s in batches of %d",
+            _Names(labels),
+            match_criteria or {},
+            batch_size,
         )
 
-        result = self.execute_query(query, match_criteria or {})
-        deleted_count = result[0]["deleted_count"] if result else 0
-        self._logger.log_info(f"Deleted {deleted_count} node(s) from the database.")
+        if not match_criteria:
+            query, parameters = query_builder.delete_node_relationships(labels, batch_size)
+            self._run_in_batches(
+                query,
+                parameters,
+                "deleted_count",
+                "relationships",
+                "delete_nodes",
+                on_progress,
+                cancel,
+            )
+        query, parameters = query_builder.delete_nodes(labels, match_criteria, batch_size)
+        deleted_count = self._run_in_batches(
+            query, parameters, "deleted_count", "nodes", "delete_nodes", on_progress, cancel
+        )
+        if delete_all:
+            self._logger.log_warning(
+                "Deleted all (%d) nodes in the database (force=True).", deleted_count
+            )
+        else:
+            self._logger.log_info("Deleted %d node(s) from the database.", deleted_count)
+        self._invalidate(label_tags(labels) + type_tags())
         return deleted_count
 
+    def relabel_nodes(
+        self,
+        labels: List[Label] = None,
+        match_criteria: Dict[str, Any] = None,
+        add_labels: List[Label] = None,
+        remove_labels: List[Label] = None,
+        batch_size: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+        on_progress: Callable[[str, int], None] = None,
+        cancel: threading.Event = None,
+    ) -> int:
+        """Add and/or remove labels of the matching nodes in batches of `batch_size`.
+
+        Progress and cancellation work as in delete_nodes. Returns the number
+        of relabeled nodes.
+        """
+        if not add_labels and not remove_labels:
+            self._logger.log_error("add_labels or remove_labels must be provided.")
+            raise ValueError("add_labels or remove_labels must be provided.")
+
+        query, parameters = query_builder.relabel_nodes(
+            labels, match_criteria, add_labels, remove_labels, batch_size
+        )
+
+        self._logger.log_info(
+            "Relabeling nodes with labels: %s and match criteria: %s: +%s -%s in batches of %d",
+            _Names(labels),
+            match_criteria or {},
+            _Names(add_labels),
+            _Names(remove_labels),
+            batch_size,
+        )
+
+        count = self._run_in_batches(
+            query, parameters, "count", "nodes", "relabel_nodes", on_progress, cancel
+        )
+        self._logger.log_info("Relabeled %d node(s).", count)
+        self._invalidate(
+            label_tags(list(labels or []) + list(add_labels or []) + list(remove_labels or []))
+        )
+        return count
+
     def get_relationships(
         self,
         types: List[RelationshipType] = None,
@@ -249,53 +793,139 @@ class Neo4jDriver:
         end_node_labels: List[Label] = None,
         end_node_properties: Dict[str, Any] = None,
         limit: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
-    ) -> List[Relationship]:
-        """Retrieve relationships between nodes."""
-        start_node_str = "start_node"
-        if start_node_labels:
-            start_node_str += (
-                f":{':'.join([label.value for label in start_node_labels])}"
-            )
-        if start_node_properties:
-            start_node_str += " WHERE " + " AND ".join(
-                [
-                    (
-                        f"start_node.{key} = '{value}'"
-                        if isinstance(value, str)
-                        else f"start_node.{key} = {value}"
-                    )
-                    for key, value in start_node_properties.items()
-                ]
+        stream: bool = False,
+        fetch_size: int = NEO4J_DEFAULT_FETCH_SIZE,
+        convert_values: bool = True,
+    ) -> Union[List[Relationship], Iterator[Relationship]]:
+        """Retrieve relationships between nodes.
+
+        With `stream=True` a generator of relationships is returned instead of
+        a list. Pass `limit=None` to read every matching relationship, and
+        `convert_values=False` to keep Neo4j temporal types as they are.
+        If the driver has a QueryCache, list reads are served from it.
+        """
+        query, parameters = query_builder.get_relationships(
+            types,
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            limit,
+        )
+
+        if stream:
+            return self._iter_relationships(
+                self.stream_query(query, parameters, fetch_size=fetch_size),
+                convert_values,
             )
+        cached, result = self._from_cache(query, parameters)
+        if not cached:
+            result = self.execute_query(query, parameters)
+            tags = type_tags(types)
+            for labels, properties in (
+                (start_node_labels, start_node_properties),
+                (end_node_labels, end_node_properties),
+            ):
+                if labels or properties:
+                    tags += label_tags(labels)
+            self._to_cache(query, parameters, result, tags)
+        return self._cast_to_relationships(result, convert_values) if result else None
 
-        end_node_str = "end_node"
-        if end_node_labels:
-            end_node_str += f":{':'.join([label.value for label in end_node_labels])}"
-        if end_node_properties:
-            end_node_str += " WHERE " + " AND ".join(
-                [
-                    (
-                        f"end_node.{key} = '{value}'"
-                        if isinstance(value, str)
-                        else f"end_node.{key} = {value}"
-                    )
-                    for key, value in end_node_properties.items()
-                ]
+    def get_relationships_columnar(
+        self,
+        types: List[RelationshipType] = None,
+        start_node_labels: List[Label] = None,
+        start_node_properties: Dict[str, Any] = None,
+        end_node_labels: List[Label] = None,
+        end_node_properties: Dict[str, Any] = None,
+        limit: int = None,
+        fetch_size: int = NEO4J_DEFAULT_FETCH_SIZE,
+        convert_values: bool = True,
+    ) -> RelationshipTable:
+        """Stream matching relationships into a columnar RelationshipTable."""
+        query, parameters = query_builder.get_relationships(
+            types,
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            limit,
+        )
+        convert_props = result_converter.PropertyConverter(convert_values)
+        table = RelationshipTable()
+        for entry in self.stream_query(query, parameters, fetch_size=fetch_size):
+            table.append(
+                entry["id"],
+                entry["start_id"],
+                entry["end_id"],
+                entry["type"],
+                convert_props(entry["properties"]),
             )
+        table.properties.compact()
+        return table
 
-        if types:
-            type_str = ":" + ":".join(rt.value for rt in types)
-        else:
-            type_str = ""
+    def get_relationships_page(
+        self,
+        types: List[RelationshipType] = None,
+        start_node_labels: List[Label] = None,
+        start_node_properties: Dict[str, Any] = None,
+        end_node_labels: List[Label] = None,
+        end_node_properties: Dict[str, Any] = None,
+        page_size: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
+        cursor: Any = None,
+        cursor_property: str = None,
+    ) -> Page:
+        """Retrieve one page of relationships ordered by a cursor key.
 
-        query = (
-            f"MATCH ({start_node_str})-[r{type_str}]->({end_node_str}) "
-            "RETURN id(r) as id, id(start_node) as start_id, id(end_node) as end_id, type(r) AS type, properties(r) AS properties "
-            f"LIMIT {limit}"
+        The key is the internal id, or `cursor_property` if given (it must be
+        unique and indexed). Pass the returned `next_cursor` to get the next
+        page; it is None once the last page has been read.
+        """
+        query, parameters = query_builder.get_relationships_page(
+            types,
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            page_size,
+            cursor,
+            cursor_property,
+        )
+        self._logger.log_info(
+            "Retrieving page of relationships of type: %s after cursor: %s", _Names(types), cursor
         )
+        result = self.execute_query(query, parameters)
+        next_cursor = result[-1]["cursor"] if len(result) == page_size else None
+        return Page(items=self._cast_to_relationships(result), next_cursor=next_cursor)
 
-        result = self.execute_query(query)
-        return self._cast_to_relationships(result) if result else None
+    def iter_relationship_pages(
+        self,
+        types: List[RelationshipType] = None,
+        start_node_labels: List[Label] = None,
+        start_node_properties: Dict[str, Any] = None,
+        end_node_labels: List[Label] = None,
+        end_node_properties: Dict[str, Any] = None,
+        page_size: int = NEO4J_DEFAULT_NUMBER_OF_NODES,
+        cursor: Any = None,
+        cursor_property: str = None,
+    ) -> Iterator[Page]:
+        """Walk all matching relationships page by page, starting after `cursor`."""
+        while True:
+            page = self.get_relationships_page(
+                types,
+                start_node_labels,
+                start_node_properties,
+                end_node_labels,
+                end_node_properties,
+                page_size,
+                cursor,
+                cursor_property,
+            )
+            if page.items:
+                yield page
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
 
     def create_relationship(
         self,
@@ -307,24 +937,152 @@ class Neo4jDriver:
         properties: Dict[str, Any] = None,
     ) -> Relationship:
         """Create a relationship between two nodes."""
+        query, parameters = query_builder.create_relationship(
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            type,
+            properties,
+        )
+        result = self.execute_query(query, parameters)
+        self._invalidate(type_tags([type]))
+        return self._cast_to_relationships(result)[0] if result else None
 
-        query = (
-            f"MATCH (start:{':'.join([label.value for label in start_node_labels])} "
-            f"{{{', '.join([f'{k}: $start_{k}' for k in start_node_properties])}}}), "
-            f"(end:{':'.join([label.value for label in end_node_labels])} "
-            f"{{{', '.join([f'{k}: $end_{k}' for k in end_node_properties])}}}) "
-            f"CREATE (start)-[r:{type.value} $props]->(end) "
-            f"RETURN id(r) AS id, id(start) AS start_id, id(end) AS end_id, type(r) AS type, properties(r) AS properties"
+    def create_relationships_batch(
+        self,
+        start_node_labels: List[Label],
+        end_node_labels: List[Label],
+        type: RelationshipType,
+        relationships: List[Dict[str, Dict[str, Any]]],
+        chunk_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+        return_relationships: bool = True,
+    ) -> Union[List[Relationship], int]:
+        """Create many relationships with one UNWIND query per chunk.
+
+        Each entry is a dict with "start_node_properties", "end_node_properties"
+        and optional "properties". All entries must use the same start and end
+        node property keys.
+        Returns the created relationships, or only their count if
+        `return_relationships` is False.
+        """
+        if not relationships:
+            self._logger.log_error("Relationships must be provided for batch creation.")
+            raise ValueError("Relationships must be provided for batch creation.")
+
+        start_keys = query_builder.shared_keys(relationships, "start_node_properties")
+        end_keys = query_builder.shared_keys(relationships, "end_node_properties")
+        if start_keys is None or end_keys is None:
+            self._logger.log_error(
+                "All relationships must share the same start and end node property keys."
+            )
+            raise ValueError(
+                "All relationships must share the same start and end node property keys."
+            )
+
+        query = query_builder.create_relationships_batch(
+            start_node_labels,
+            start_keys,
+            end_node_labels,
+            end_keys,
+            type,
+            return_relationships,
         )
 
-        parameters = {
-            **{f"start_{k}": v for k, v in start_node_properties.items()},
-            **{f"end_{k}": v for k, v in end_node_properties.items()},
-            "props": properties or {},
-        }
+        rows = [
+            {
+                "start_node_properties": entry["start_node_properties"],
+                "end_node_properties": entry["end_node_properties"],
+                "properties": entry.get("properties") or {},
+            }
+            for entry in relationships
+        ]
 
-        result = self.execute_query(query, parameters)
-        return self._cast_to_relationships(result)[0] if result else None
+        self._logger.log_info(
+            "Creating %d relationship(s) of type '%s' in chunks of %d",
+            len(rows),
+            type.value,
+            chunk_size,
+        )
+
+        created, count = [], 0
+        for chunk in chunked(rows, chunk_size):
+            result = self.execute_query(query, {"rows": chunk})
+            if return_relationships:
+                created.extend(self._cast_to_relationships(result))
+            else:
+                count += result[0]["count"] if result else 0
+        self._invalidate(type_tags([type]))
+        return created if return_relationships else count
+
+    def merge_relationships_batch(
+        self,
+        start_node_labels: List[Label],
+        end_node_labels: List[Label],
+        type: RelationshipType,
+        relationships: List[Dict[str, Dict[str, Any]]],
+        keys: List[str] = None,
+        chunk_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+        return_relationships: bool = True,
+    ) -> Union[List[Relationship], int]:
+        """Create many relationships unless they already exist, one UNWIND
+        ... MERGE query per chunk.
+
+        Entries have the same shape as for create_relationships_batch. A
+        relationship is identified by its endpoints, its type and the
+        `keys` of its properties; its remaining properties are updated.
+        Returns the merged relationships, or only their count if
+        `return_relationships` is False.
+        """
+        if not relationships:
+            self._logger.log_error("Relationships must be provided for batch merge.")
+            raise ValueError("Relationships must be provided for batch merge.")
+
+        start_keys = query_builder.shared_keys(relationships, "start_node_properties")
+        end_keys = query_builder.shared_keys(relationships, "end_node_properties")
+        if start_keys is None or end_keys is None:
+            self._logger.log_error(
+                "All relationships must share the same start and end node property keys."
+            )
+            raise ValueError(
+                "All relationships must share the same start and end node property keys."
+            )
+
+        query = query_builder.merge_relationships_batch(
+            start_node_labels,
+            start_keys,
+            end_node_labels,
+            end_keys,
+            type,
+            keys,
+            return_relationships,
+        )
+
+        rows = [
+            {
+                "start_node_properties": entry["start_node_properties"],
+                "end_node_properties": entry["end_node_properties"],
+                "properties": entry.get("properties") or {},
+            }
+            for entry in relationships
+        ]
+
+        self._logger.log_info(
+            "Merging %d relationship(s) of type '%s' in chunks of %d",
+            len(rows),
+            type.value,
+            chunk_size,
+        )
+
+        merged, count = [], 0
+        for chunk in chunked(rows, chunk_size):
+            result = self.execute_query(query, {"rows": chunk})
+            if return_relationships:
+                merged.extend(self._cast_to_relationships(result))
+            else:
+                count += result[0]["count"] if result else 0
+        self._invalidate(type_tags([type]))
+        return merged if return_relationships else count
 
     def update_relationships(
         self,
@@ -345,46 +1103,23 @@ class Neo4jDriver:
             self._logger.log_error("New properties must be provided for update.")
             raise ValueError("New properties must be provided for update.")
 
-        # Build MATCH pattern for start node
-        start_node_pattern = "start"
-        if start_node_labels:
-            start_node_pattern += (
-                f":{':'.join(label.value for label in start_node_labels)}"
-            )
-        if start_node_properties:
-            start_node_pattern += (
-                " {"
-                + ", ".join(f"{k}: $start_{k}" for k in start_node_properties)
-                + "}"
-            )
-
-        # Build MATCH pattern for end node
-        end_node_pattern = "end"
-        if end_node_labels:
-            end_node_pattern += f":{':'.join(label.value for label in end_node_labels)}"
-        if end_node_properties:
-            end_node_pattern += (
-                " {" + ", ".join(f"{k}: $end_{k}" for k in end_node_properties) + "}"
-            )
-
-        match_clause = f"MATCH ({start_node_pattern})-[r:{relationship_type.value}]->({end_node_pattern})"
-
-        query = (
-            f"{match_clause} SET r += $new_properties "
-            "RETURN id(r) AS id, id(start) AS start_id, id(end) AS end_id, type(r) AS type, properties(r) AS properties"
+        query, parameters = query_builder.update_relationships(
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            relationship_type,
+            new_properties,
         )
 
-        parameters = {
-            **{f"start_{k}": v for k, v in (start_node_properties or {}).items()},
-            **{f"end_{k}": v for k, v in (end_node_properties or {}).items()},
-            "new_properties": new_properties,
-        }
-
         self._logger.log_info(
-            f"Updating relationship of type '{relationship_type.value}' with new properties: {new_properties}"
+            "Updating relationship of type '%s' with new properties: %s",
+            relationship_type.value,
+            new_properties,
         )
 
         result = self.execute_query(query, parameters)
+        self._invalidate(type_tags([relationship_type]))
         return self._cast_to_relationships(result) if result else None
 
     def delete_relationships(
@@ -395,72 +1130,108 @@ class Neo4jDriver:
         end_node_properties: Dict[str, Any] = None,
         relationship_type: RelationshipType = None,
         force: bool = False,
+        batch_size: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+        on_progress: Callable[[str, int], None] = None,
+        cancel: threading.Event = None,
     ) -> int:
-        """Delete relationships between nodes with optional filtering."""
+        """Delete relationships between nodes with optional filtering, in
+        batches of `batch_size`.
 
-        if (
+        Deleting every relationship requires force=True. Progress and
+        cancellation work as in delete_nodes.
+        """
+        delete_all = (
             not start_node_labels
             and not start_node_properties
             and not end_node_labels
             and not end_node_properties
             and not relationship_type
-        ):
-            if force:
-                self._logger.log_warning(
-                    "No specific labels or match criteria provided. If you want to delete all relationships, set force=True."
-                )
-                return None
-            else:
-                query = "MATCH ()-[r]->() DELETE r RETURN count(r) AS deleted_count"
-                result = self.execute_query(query)
-                deleted_count = result[0]["deleted_count"] if result else 0
-                self._logger.log_warning(
-                    f"Deleted all ({deleted_count}) relationships in the database (force=True)."
-                )
-                return deleted_count
-
-        start_node_pattern = "start"
-        if start_node_labels:
-            start_node_pattern += (
-                f":{':'.join(label.value for label in start_node_labels)}"
-            )
-        if start_node_properties:
-            start_node_pattern += (
-                " {"
-                + ", ".join(f"{k}: $start_{k}" for k in start_node_properties)
-                + "}"
+        )
+        if delete_all and not force:
+            self._logger.log_warning(
+                "No specific labels or match criteria provided. If you want to delete all relationships, set force=True."
             )
+            return None
+
+        query, parameters = query_builder.delete_relationships(
+            start_node_labels,
+            start_node_properties,
+            end_node_labels,
+            end_node_properties,
+            relationship_type,
+            batch_size,
+        )
 
-        # Build end node pattern
-        end_node_pattern = "end"
-        if end_node_labels:
-            end_node_pattern += f":{':'.join(label.value for label in end_node_labels)}"
-        if end_node_properties:
-            end_node_pattern += (
-                " {" + ", ".join(f"{k}: $end_{k}" for k in end_node_properties) + "}"
+        self._logger.log_info(
+            "Deleting relationships of type: %s, start_node_labels: %s, end_node_labels: %s "
+            "in batches of %d",
+            relationship_type.value if relationship_type else "*",
+            _Names(start_node_labels),
+            _Names(end_node_labels),
+            batch_size,
+        )
+
+        deleted_count = self._run_in_batches(
+            query,
+            parameters,
+            "deleted_count",
+            "relationships",
+            "delete_relationships",
+            on_progress,
+            cancel,
+        )
+        if delete_all:
+            self._logger.log_warning(
+                "Deleted all (%d) relationships in the database (force=True).", deleted_count
             )
+        else:
+            self._logger.log_info("Deleted %d relationship(s).", deleted_count)
+        self._invalidate(type_tags([relationship_type] if relationship_type else None))
+        return deleted_count
 
-        # Build relationship pattern
-        relationship_pattern = "r"
-        if relationship_type:
-            relationship_pattern += f":{relationship_type.value}"
+    def delete_relationships_batch(
+        self,
+        start_node_labels: List[Label],
+        end_node_labels: List[Label],
+        relationships: List[Dict[str, Dict[str, Any]]],
+        relationship_type: RelationshipType = None,
+        chunk_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """Delete the relationships between many node pairs with one UNWIND
+        query per chunk.
 
-        match_clause = f"MATCH ({start_node_pattern})-[{relationship_pattern}]->({end_node_pattern})"
-        query = f"{match_clause} DELETE r RETURN count(r) AS deleted_count"
+        Each entry is a dict with "start_node_properties" and
+        "end_node_properties". All entries must use the same keys.
+        Returns the number of deleted relationships.
+        """
+        if not relationships:
+            self._logger.log_error("Relationships must be provided for batch deletion.")
+            raise ValueError("Relationships must be provided for batch deletion.")
 
-        # Prepare parameters
-        parameters = {
-            **{f"start_{k}": v for k, v in (start_node_properties or {}).items()},
-            **{f"end_{k}": v for k, v in (end_node_properties or {}).items()},
-        }
+        start_keys = query_builder.shared_keys(relationships, "start_node_properties")
+        end_keys = query_builder.shared_keys(relationships, "end_node_properties")
+        if not start_keys or not end_keys:
+            self._logger.log_error(
+                "All relationships must share the same non-empty start and end node property keys."
+            )
+            raise ValueError(
+                "All relationships must share the same non-empty start and end node property keys."
+            )
+
+        query = query_builder.delete_relationships_batch(
+            start_node_labels, start_keys, end_node_labels, end_keys, relationship_type
+        )
 
         self._logger.log_info(
-            f"Deleting relationships of type: {relationship_type.value if relationship_type else '*'}, "
-            f"start_node_labels: {[label.value for label in start_node_labels] if start_node_labels else '*'}, "
-            f"end_node_labels: {[label.value for label in end_node_labels] if end_node_labels else '*'}"
+            "Deleting relationships of type: %s between %d node pair(s) in chunks of %d",
+            relationship_type.value if relationship_type else "*",
+            len(relationships),
+            chunk_size,
         )
 
-        result = self.execute_query(query, parameters)
-        deleted_count = result[0]["deleted_count"] if result else 0
-        self._logger.log_info(f"Deleted {deleted_count} relationship(s).")
+        deleted_count = 0
+        for chunk in chunked(relationships, chunk_size):
+            result = self.execute_query(query, {"rows": chunk})
+            deleted_count += result[0]["deleted_count"] if result else 0
+        self._invalidate(type_tags([relationship_type] if relationship_type else None))
         return deleted_count
@@ -0,0 +1,824 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from utils.constants import NEO4J_MAINTENANCE_BATCH_SIZE, NEO4J_QUERY_TEMPLATE_CACHE_SIZE
+from utils.enums import Label, RelationshipType
+
+NODE_RETURN = "RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties"
+RELATIONSHIP_RETURN = (
+    "RETURN id(r) AS id, id(start) AS start_id, id(end) AS end_id, "
+    "type(r) AS type, properties(r) AS properties"
+)
+
+Query = Tuple[str, Dict[str, Any]]
+
+# Queries only contain $param placeholders, so the text depends on the query
+# shape alone and is built once per shape; the server can then reuse its plan.
+cached = lru_cache(maxsize=NEO4J_QUERY_TEMPLATE_CACHE_SIZE)
+
+
+def _labels(labels: List[Label] = None) -> Tuple[Label, ...]:
+    return tuple(labels) if labels else ()
+
+
+def _keys(properties: Dict[str, Any] = None) -> Tuple[str, ...]:
+    return tuple(properties) if properties else ()
+
+
+def _label_str(labels: Tuple[Label, ...]) -> str:
+    return f":{':'.join(label.value for label in labels)}" if labels else ""
+
+
+def _type_str(types: Tuple[RelationshipType, ...]) -> str:
+    return ":" + "|".join(rt.value for rt in types) if types else ""
+
+
+def _conditions(variable: str, prefix: str, keys: Tuple[str, ...]) -> List[str]:
+    return [f"{variable}.{k} = ${prefix}_{k}" for k in keys]
+
+
+def _node_pattern(variable: str, labels: Tuple[Label, ...], keys: Tuple[str, ...]) -> str:
+    pattern = variable + _label_str(labels)
+    if keys:
+        pattern += " {" + ", ".join(f"{k}: ${variable}_{k}" for k in keys) + "}"
+    return pattern
+
+
+def _prefixed(prefix: str, properties: Dict[str, Any] = None) -> Dict[str, Any]:
+    return {f"{prefix}_{k}": v for k, v in (properties or {}).items()}
+
+
+def shared_keys(entries: List[Dict[str, Dict[str, Any]]], field: str) -> List[str]:
+    """Return the keys of `field` shared by every entry, or None if they differ."""
+    keys = list(entries[0][field])
+    if any(entry[field].keys() != set(keys) for entry in entries):
+        return None
+    return keys
+
+
+def cache_info() -> Dict[str, Any]:
+    """Return the LRU statistics of every memoized query template."""
+    return {
+        name: template.cache_info()
+        for name, template in globals().items()
+        if name.endswith("_template") and hasattr(template, "cache_info")
+    }
+
+
+def clear_cache() -> None:
+    """Drop every memoized query template."""
+    for name, template in globals().items():
+        if name.endswith("_template") and hasattr(template, "cache_clear"):
+            template.cache_clear()
+
+
+# ===========================
+# NODES
+# ===========================
+@cached
+def _get_nodes_template(labels, keys, limited: bool) -> str:
+    query = f"MATCH (n{_label_str(labels)})"
+    if keys:
+        query += " WHERE " + " AND ".join(_conditions("n", "match", keys))
+    query += f" {NODE_RETURN}"
+    if limited:
+        query += " LIMIT $limit"
+    return query
+
+
+def get_nodes(
+    labels: List[Label] = None, properties: Dict[str, Any] = None, limit: int = None
+) -> Query:
+    query = _get_nodes_template(_labels(labels), _keys(properties), limit is not None)
+    parameters = _prefixed("match", properties)
+    if limit is not None:
+        parameters["limit"] = limit
+    return query, parameters
+
+
+@cached
+def _get_nodes_page_template(labels, keys, has_cursor: bool, cursor_property) -> str:
+    key = f"n.{cursor_property}" if cursor_property else "id(n)"
+    conditions = _conditions("n", "match", keys)
+    if has_cursor:
+        conditions.append(f"{key} > $cursor")
+
+    query = f"MATCH (n{_label_str(labels)})"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return (
+        query
+        + f" WITH n, {key} AS cursor ORDER BY cursor LIMIT $page_size"
+        + f" {NODE_RETURN}, cursor"
+    )
+
+
+def get_nodes_page(
+    labels: List[Label] = None,
+    properties: Dict[str, Any] = None,
+    page_size: int = None,
+    cursor: Any = None,
+    cursor_property: str = None,
+) -> Query:
+    query = _get_nodes_page_template(
+        _labels(labels), _keys(properties), cursor is not None, cursor_property
+    )
+    parameters = {
+        **_prefixed("match", properties),
+        "cursor": cursor,
+        "page_size": page_size,
+    }
+    return query, parameters
+
+
+@cached
+def _create_node_template(labels) -> str:
+    return f"CREATE (n{_label_str(labels)}) SET n = $properties {NODE_RETURN}"
+
+
+def create_node(labels: List[Label], properties: Dict[str, Any]) -> Query:
+    return _create_node_template(_labels(labels)), {"properties": properties}
+
+
+@cached
+def _create_nodes_batch_template(labels, return_nodes: bool) -> str:
+    query = f"UNWIND $rows AS row CREATE (n{_label_str(labels)}) SET n = row"
+    return query + (f" {NODE_RETURN}" if return_nodes else " RETURN count(n) AS count")
+
+
+def create_nodes_batch(labels: List[Label], return_nodes: bool = True) -> str:
+    return _create_nodes_batch_template(_labels(labels), return_nodes)
+
+
+@cached
+def _update_nodes_template(labels, keys) -> str:
+    query = f"MATCH (n{_label_str(labels)})"
+    if keys:
+        query += " WHERE " + " AND ".join(_conditions("n", "match", keys))
+    return query + f" SET n += $new_properties {NODE_RETURN}"
+
+
+def update_nodes(
+    labels: List[Label] = None,
+    match_criteria: Dict[str, Any] = None,
+    new_properties: Dict[str, Any] = None,
+) -> Query:
+    query = _update_nodes_template(_labels(labels), _keys(match_criteria))
+    parameters = {**_prefixed("match", match_criteria), "new_properties": new_properties}
+    return query, parameters
+
+
+@cached
+def _update_nodes_batch_template(labels, match_keys, return_nodes: bool) -> str:
+    conditions = [f"n.{key} = row.match_criteria.{key}" for key in match_keys]
+    query = (
+        f"UNWIND $rows AS row MATCH (n{_label_str(labels)}) "
+        f"WHERE {' AND '.join(conditions)} SET n += row.new_properties"
+    )
+    return query + (f" {NODE_RETURN}" if return_nodes else " RETURN count(n) AS count")
+
+
+def update_nodes_batch(
+    labels: List[Label] = None, match_keys: List[str] = None, return_nodes: bool = True
+) -> str:
+    return _update_nodes_batch_template(
+        _labels(labels), tuple(match_keys), return_nodes
+    )
+
+
+@cached
+def _merge_nodes_batch_template(labels, match_keys, version_key, return_nodes: bool) -> str:
+    match_map = ", ".join(f"{k}: row.match_criteria.{k}" for k in match_keys)
+    query = f"UNWIND $rows AS row MERGE (n{_label_str(labels)} {{{match_map}}})"
+    if version_key:
+        # Older versions of a row never overwrite newer ones, whatever the
+        # order in which concurrent batches are committed.
+        query += (
+            f" WITH n, row WHERE n.{version_key} IS NULL"
+            f" OR n.{version_key} <= row.new_properties.{version_key}"
+        )
+    query += " SET n += row.new_properties"
+    return query + (f" {NODE_RETURN}" if return_nodes else " RETURN count(n) AS count")
+
+
+def merge_nodes_batch(
+    labels: List[Label],
+    match_keys: List[str],
+    version_key: str = None,
+    return_nodes: bool = True,
+) -> str:
+    return _merge_nodes_batch_template(
+        _labels(labels), tuple(match_keys), version_key, return_nodes
+    )
+
+
+# Deletes and relabels touch at most $limit entities per query. The driver
+# runs them until a query touches fewer, each run in its own transaction.
+@cached
+def _delete_nodes_template(labels, keys) -> str:
+    query = f"MATCH (n{_label_str(labels)})"
+    if keys:
+        query += " WHERE " + " AND ".join(_conditions("n", "match", keys))
+    return query + " WITH n LIMIT $limit DETACH DELETE n RETURN count(n) AS deleted_count"
+
+
+def delete_nodes(
+    labels: List[Label] = None,
+    match_criteria: Dict[str, Any] = None,
+    limit: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+) -> Query:
+    query = _delete_nodes_template(_labels(labels), _keys(match_criteria))
+    return query, {**_prefixed("match", match_criteria), "limit": limit}
+
+
+@cached
+def _delete_node_relationships_template(labels) -> str:
+    return (
+        f"MATCH (n{_label_str(labels)})-[r]-() "
+        "WITH DISTINCT r LIMIT $limit DELETE r RETURN count(r) AS deleted_count"
+    )
+
+
+def delete_node_relationships(
+    labels: List[Label] = None, limit: int = NEO4J_MAINTENANCE_BATCH_SIZE
+) -> Query:
+    """Delete the relationships, in either direction, of nodes with `labels`."""
+    return _delete_node_relationships_template(_labels(labels)), {"limit": limit}
+
+
+@cached
+def _relabel_nodes_template(labels, keys, add_labels, remove_labels) -> str:
+    # Only nodes still missing a label to add or carrying one to remove match,
+    # so every run makes progress.
+    pending = [f"NOT n:{label.value}" for label in add_labels]
+    pending += [f"n:{label.value}" for label in remove_labels]
+    conditions = _conditions("n", "match", keys) + ["(" + " OR ".join(pending) + ")"]
+    query = f"MATCH (n{_label_str(labels)}) WHERE {' AND '.join(conditions)} WITH n LIMIT $limit"
+    if add_labels:
+        query += f" SET n{_label_str(add_labels)}"
+    if remove_labels:
+        query += f" REMOVE n{_label_str(remove_labels)}"
+    return query + " RETURN count(n) AS count"
+
+
+def relabel_nodes(
+    labels: List[Label] = None,
+    match_criteria: Dict[str, Any] = None,
+    add_labels: List[Label] = None,
+    remove_labels: List[Label] = None,
+    limit: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+) -> Query:
+    query = _relabel_nodes_template(
+        _labels(labels), _keys(match_criteria), _labels(add_labels), _labels(remove_labels)
+    )
+    return query, {**_prefixed("match", match_criteria), "limit": limit}
+
+
+# ===========================
+# RELATIONSHIPS
+# ===========================
+@cached
+def _get_relationships_template(
+    types, start_labels, start_keys, end_labels, end_keys, limited: bool
+) -> str:
+    conditions = _conditions("start", "start", start_keys)
+    conditions += _conditions("end", "end", end_keys)
+
+    query = (
+        f"MATCH (start{_label_str(start_labels)})"
+        f"-[r{_type_str(types)}]->(end{_label_str(end_labels)})"
+    )
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" {RELATIONSHIP_RETURN}"
+    if limited:
+        query += " LIMIT $limit"
+    return query
+
+
+def get_relationships(
+    types: List[RelationshipType] = None,
+    start_node_labels: List[Label] = None,
+    start_node_properties: Dict[str, Any] = None,
+    end_node_labels: List[Label] = None,
+    end_node_properties: Dict[str, Any] = None,
+    limit: int = None,
+) -> Query:
+    query = _get_relationships_template(
+        _labels(types),
+        _labels(start_node_labels),
+        _keys(start_node_properties),
+        _labels(end_node_labels),
+        _keys(end_node_properties),
+        limit is not None,
+    )
+    parameters = {
+        **_prefixed("start", start_node_properties),
+        **_prefixed("end", end_node_properties),
+    }
+    if limit is not None:
+        parameters["limit"] = limit
+    return query, parameters
+
+
+@cached
+def _get_relationships_page_template(
+    types, start_labels, start_keys, end_labels, end_keys, has_cursor, cursor_property
+) -> str:
+    key = f"r.{cursor_property}" if cursor_property else "id(r)"
+    conditions = _conditions("start", "start", start_keys)
+    conditions += _conditions("end", "end", end_keys)
+    if has_cursor:
+        conditions.append(f"{key} > $cursor")
+
+    query = (
+        f"MATCH (start{_label_str(start_labels)})"
+        f"-[r{_type_str(types)}]->(end{_label_str(end_labels)})"
+    )
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return (
+        query
+        + f" WITH r, start, end, {key} AS cursor ORDER BY cursor LIMIT $page_size"
+        + f" {RELATIONSHIP_RETURN}, cursor"
+    )
+
+
+def get_relationships_page(
+    types: List[RelationshipType] = None,
+    start_node_labels: List[Label] = None,
+    start_node_properties: Dict[str, Any] = None,
+    end_node_labels: List[Label] = None,
+    end_node_properties: Dict[str, Any] = None,
+    page_size: int = None,
+    cursor: Any = None,
+    cursor_property: str = None,
+) -> Query:
+    query = _get_relationships_page_template(
+        _labels(types),
+        _labels(start_node_labels),
+        _keys(start_node_properties),
+        _labels(end_node_labels),
+        _keys(end_node_properties),
+        cursor is not None,
+        cursor_property,
+    )
+    parameters = {
+        **_prefixed("start", start_node_properties),
+        **_prefixed("end", end_node_properties),
+        "cursor": cursor,
+        "page_size": page_size,
+    }
+    return query, parameters
+
+
+@cached
+def _create_relationship_template(
+    start_labels, start_keys, end_labels, end_keys, type
+) -> str:
+    return (
+        f"MATCH ({_node_pattern('start', start_labels, start_keys)}), "
+        f"({_node_pattern('end', end_labels, end_keys)}) "
+        f"CREATE (start)-[r:{type.value} $props]->(end) {RELATIONSHIP_RETURN}"
+    )
+
+
+def create_relationship(
+    start_node_labels: List[Label],
+    start_node_properties: Dict[str, Any],
+    end_node_labels: List[Label],
+    end_node_properties: Dict[str, Any],
+    type: RelationshipType,
+    properties: Dict[str, Any] = None,
+) -> Query:
+    query = _create_relationship_template(
+        _labels(start_node_labels),
+        _keys(start_node_properties),
+        _labels(end_node_labels),
+        _keys(end_node_properties),
+        type,
+    )
+    parameters = {
+        **_prefixed("start", start_node_properties),
+        **_prefixed("end", end_node_properties),
+        "props": properties or {},
+    }
+    return query, parameters
+
+
+@cached
+def _create_relationships_batch_template(
+    start_labels, start_keys, end_labels, end_keys, type, return_relationships: bool
+) -> str:
+    start_map = ", ".join(f"{k}: row.start_node_properties.{k}" for k in start_keys)
+    end_map = ", ".join(f"{k}: row.end_node_properties.{k}" for k in end_keys)
+    query = (
+        "UNWIND $rows AS row "
+        f"MATCH (start{_label_str(start_labels)} {{{start_map}}}), "
+        f"(end{_label_str(end_labels)} {{{end_map}}}) "
+        f"CREATE (start)-[r:{type.value}]->(end) SET r = row.properties"
+    )
+    return query + (
+        f" {RELATIONSHIP_RETURN}" if return_relationships else " RETURN count(r) AS count"
+    )
+
+
+def create_relationships_batch(
+    start_node_labels: List[Label],
+    start_keys: List[str],
+    end_node_labels: List[Label],
+    end_keys: List[str],
+    type: RelationshipType,
+    return_relationships: bool = True,
+) -> str:
+    return _create_relationships_batch_template(
+        _labels(start_node_labels),
+        tuple(start_keys),
+        _labels(end_node_labels),
+        tuple(end_keys),
+        type,
+        return_relationships,
+    )
+
+
+@cached
+def _merge_relationships_batch_template(
+    start_labels, start_keys, end_labels, end_keys, type, keys, return_relationships: bool
+) -> str:
+    start_map = ", ".join(f"{k}: row.start_node_properties.{k}" for k in start_keys)
+    end_map = ", ".join(f"{k}: row.end_node_properties.{k}" for k in end_keys)
+    relationship_map = ", ".join(f"{k}: row.properties.{k}" for k in keys)
+    if relationship_map:
+        relationship_map = f" {{{relationship_map}}}"
+    query = (
+        "UNWIND $rows AS row "
+        f"MATCH (start{_label_str(start_labels)} {{{start_map}}}), "
+        f"(end{_label_str(end_labels)} {{{end_map}}}) "
+        f"MERGE (start)-[r:{type.value}{relationship_map}]->(end) SET r += row.properties"
+    )
+    return query + (
+        f" {RELATIONSHIP_RETURN}" if return_relationships else " RETURN count(r) AS count"
+    )
+
+
+def merge_relationships_batch(
+    start_node_labels: List[Label],
+    start_keys: List[str],
+    end_node_labels: List[Label],
+    end_keys: List[str],
+    type: RelationshipType,
+    keys: List[str] = None,
+    return_relationships: bool = True,
+) -> str:
+    return _merge_relationships_batch_template(
+        _labels(start_node_labels),
+        tuple(start_keys),
+        _labels(end_node_labels),
+        tuple(end_keys),
+        type,
+        tuple(keys or ()),
+        return_relationships,
+    )
+
+
+@cached
+def _update_relationships_template(
+    start_labels, start_keys, end_labels, end_keys, relationship_type
+) -> str:
+    return (
+        f"MATCH ({_node_pattern('start', start_labels, start_keys)})"
+        f"-[r:{relationship_type.value}]->"
+        f"({_node_pattern('end', end_labels, end_keys)}) "
+        f"SET r += $new_properties {RELATIONSHIP_RETURN}"
+    )
+
+
+def update_relationships(
+    start_node_labels: List[Label] = None,
+    start_node_properties: Dict[str, Any] = None,
+    end_node_labels: List[Label] = None,
+    end_node_properties: Dict[str, Any] = None,
+    relationship_type: RelationshipType = None,
+    new_properties: Dict[str, Any] = None,
+) -> Query:
+    query = _update_relationships_template(
+        _labels(start_node_labels),
+        _keys(start_node_properties),
+        _labels(end_node_labels),
+        _keys(end_node_properties),
+        relationship_type,
+    )
+    parameters = {
+        **_prefixed("start", start_node_properties),
+        **_prefixed("end", end_node_properties),
+        "new_properties": new_properties,
+    }
+    return query, parameters
+
+
+@cached
+def _delete_relationships_template(
+    start_labels, start_keys, end_labels, end_keys, relationship_type
+) -> str:
+    type_str = f":{relationship_type.value}" if relationship_type else ""
+    return (
+        f"MATCH ({_node_pattern('start', start_labels, start_keys)})"
+        f"-[r{type_str}]->"
+        f"({_node_pattern('end', end_labels, end_keys)}) "
+        "WITH r LIMIT $limit DELETE r RETURN count(r) AS deleted_count"
+    )
+
+
+def delete_relationships(
+    start_node_labels: List[Label] = None,
+    start_node_properties: Dict[str, Any] = None,
+    end_node_labels: List[Label] = None,
+    end_node_properties: Dict[str, Any] = None,
+    relationship_type: RelationshipType = None,
+    limit: int = NEO4J_MAINTENANCE_BATCH_SIZE,
+) -> Query:
+    query = _delete_relationships_template(
+        _labels(start_node_labels),
+        _keys(start_node_properties),
+        _labels(end_node_labels),
+        _keys(end_node_properties),
+        relationship_type,
+    )
+    parameters = {
+        **_prefixed("start", start_node_properties),
+        **_prefixed("end", end_node_properties),
+        "limit": limit,
+    }
+    return query, parameters
+
+
+@cached
+def _delete_relationships_batch_template(
+    start_labels, start_keys, end_labels, end_keys, relationship_type
+) -> str:
+    start_map = ", ".join(f"{k}: row.start_node_properties.{k}" for k in start_keys)
+    end_map = ", ".join(f"{k}: row.end_node_properties.{k}" for k in end_keys)
+    type_str = f":{relationship_type.value}" if relationship_type else ""
+    return (
+        "UNWIND $rows AS row "
+        f"MATCH (start{_label_str(start_labels)} {{{start_map}}})"
+        f"-[r{type_str}]->(end{_label_str(end_labels)} {{{end_map}}}) "
+        "DELETE r RETURN count(r) AS deleted_count"
+    )
+
+
+def delete_relationships_batch(
+    start_node_labels: List[Label],
+    start_keys: List[str],
+    end_node_labels: List[Label],
+    end_keys: List[str],
+    relationship_type: RelationshipType = None,
+) -> str:
+    return _delete_relationships_batch_template(
+        _labels(start_node_labels),
+        tuple(start_keys),
+        _labels(end_node_labels),
+        tuple(end_keys),
+        relationship_type,
+    )
+
+
+# ===========================
+# SCHEMA
+# ===========================
+@cached
+def _create_unique_constraint_template(label, key) -> str:
+    return (
+        f"CREATE CONSTRAINT {label.value.lower()}_{key}_unique IF NOT EXISTS "
+        f"FOR (n:{label.value}) REQUIRE n.{key} IS UNIQUE"
+    )
+
+
+def create_unique_constraint(label: Label, key: str) -> str:
+    return _create_unique_constraint_template(label, key)
+
+
+@cached
+def _create_node_index_template(label, key) -> str:
+    return (
+        f"CREATE INDEX {label.value.lower()}_{key}_index IF NOT EXISTS "
+        f"FOR (n:{label.value}) ON (n.{key})"
+    )
+
+
+def create_node_index(label: Label, key: str) -> str:
+    return _create_node_index_template(label, key)
+
+
+@cached
+def _create_relationship_index_template(type, key) -> str:
+    return (
+        f"CREATE INDEX {type.value.lower()}_{key}_index IF NOT EXISTS "
+        f"FOR ()-[r:{type.value}]-() ON (r.{key})"
+    )
+
+
+def create_relationship_index(type: RelationshipType, key: str) -> str:
+    return _create_relationship_index_template(type, key)
+
+
+# ===========================
+# INGESTION
+# ===========================
+# A graph loaded month by month has one HOLDS per customer, product and month;
+# one kept up to date by the delta loader has at most one per pair.
+MONTHLY_HOLDINGS = (
+    f"MATCH (c:{Label.CUSTOMER.value})-[h:{RelationshipType.HOLDS.value}]->"
+    f"(p:{Label.PRODUCT.value}) WITH c, p, count(h) AS months WHERE months > 1 "
+    "RETURN c.customer_code AS customer_code LIMIT 1"
+)
+
+
+# ===========================
+# STATISTICS
+# ===========================
+COUNT_CUSTOMERS = f"MATCH (c:{Label.CUSTOMER.value}) RETURN count(c) AS count"
+
+
+@cached
+def _count_customers_template(month_filter: bool) -> str:
+    if not month_filter:
+        return COUNT_CUSTOMERS
+    return (
+        f"MATCH (c:{Label.CUSTOMER.value})-[h:{RelationshipType.HOLDS.value}]->"
+        f"(:{Label.PRODUCT.value}) WHERE h.date = $month RETURN count(DISTINCT c) AS count"
+    )
+
+
+def count_customers(month: Any = None) -> Query:
+    """Count the customers holding a product in `month`, or all customers."""
+    query = _count_customers_template(month is not None)
+    return query, ({"month": month} if month is not None else {})
+
+
+@cached
+def _product_holders_template(month_filter: bool) -> str:
+    where = " WHERE h.date = $month" if month_filter else ""
+    return (
+        f"MATCH (c:{Label.CUSTOMER.value})-[h:{RelationshipType.HOLDS.value}]->"
+        f"(p:{Label.PRODUCT.value}){where} RETURN p.code AS code, count(DISTINCT c) AS holders"
+    )
+
+
+# Customers are counted DISTINCT: a graph versioned by month has one HOLDS
+# per customer and month, so without a month a customer counts once.
+def product_holders(month: Any = None) -> Query:
+    """Count the holders of every product, in one month or in any month."""
+    query = _product_holders_template(month is not None)
+    return query, ({"month": month} if month is not None else {})
+
+
+@cached
+def _product_co_ownership_template(month_filter: bool) -> str:
+    where = " AND h1.date = $month AND h2.date = $month" if month_filter else ""
+    return (
+        f"MATCH (p1:{Label.PRODUCT.value})<-[h1:{RelationshipType.HOLDS.value}]-"
+        f"(c:{Label.CUSTOMER.value})-[h2:{RelationshipType.HOLDS.value}]->"
+        f"(p2:{Label.PRODUCT.value}) WHERE p1.code < p2.code{where} "
+        "RETURN p1.code AS code_1, p2.code AS code_2, count(DISTINCT c) AS customers"
+    )
+
+
+def product_co_ownership(month: Any = None) -> Query:
+    """Count the customers holding each pair of products together."""
+    query = _product_co_ownership_template(month is not None)
+    return query, ({"month": month} if month is not None else {})
+
+
+MATERIALIZED_STATISTICS_MONTHS = (
+    f"MATCH (p:{Label.PRODUCT.value}) WHERE p.statistics_month IS NOT NULL "
+    "RETURN DISTINCT p.statistics_month AS month"
+)
+
+
+# ===========================
+# RECOMMENDATIONS
+# ===========================
+# Score of a product X for a customer: the sum over the products p the
+# customer holds of co_owned(p, X) / holders(p), i.e. the share of p's
+# holders that also hold X ("confidence"), or the raw count with
+# weighting="count". The counts are read from the Product nodes, where
+# ProductStatisticsJob materializes them, so a customer costs one index
+# seek plus at most one visit per product instead of a walk over every
+# other holder.
+RECOMMENDATION_WEIGHTS = {
+    "confidence": "toFloat(p.co_owned_counts[i]) / p.holders",
+    "count": "toFloat(p.co_owned_counts[i])",
+}
+
+
+def _recommendation_scoring(weighting: str) -> str:
+    return (
+        "UNWIND held AS p "
+        "UNWIND range(0, size(coalesce(p.co_owned_codes, [])) - 1) AS i "
+        f"WITH held, p.co_owned_codes[i] AS code, {RECOMMENDATION_WEIGHTS[weighting]} AS weight "
+        "WHERE NOT code IN [x IN held | x.code] "
+        "WITH code, sum(weight) AS score ORDER BY score DESC, code LIMIT $k"
+    )
+
+
+def _held_products(customer: str, month_filter: bool) -> str:
+    where = " WHERE h.date = $month" if month_filter else ""
+    return (
+        f"OPTIONAL MATCH ({customer})-[h:{RelationshipType.HOLDS.value}]->"
+        f"(p:{Label.PRODUCT.value}){where} "
+    )
+
+
+@cached
+def _recommend_products_template(weighting: str, month_filter: bool) -> str:
+    return (
+        f"MATCH (c:{Label.CUSTOMER.value} {{customer_code: $customer_code}}) "
+        + _held_products("c", month_filter)
+        + "WITH collect(DISTINCT p) AS held "
+        + _recommendation_scoring(weighting)
+        + " RETURN code, score"
+    )
+
+
+def recommend_products(
+    customer_code: Any, k: int, weighting: str = "confidence", month: Any = None
+) -> Query:
+    """Top-k products for one customer, from co-ownership with what they hold."""
+    query = _recommend_products_template(weighting, month is not None)
+    parameters = {"customer_code": customer_code, "k": k}
+    if month is not None:
+        parameters["month"] = month
+    return query, parameters
+
+
+@cached
+def _recommend_products_batch_template(weighting: str, month_filter: bool) -> str:
+    return (
+        "UNWIND $customer_codes AS customer_code "
+        f"MATCH (c:{Label.CUSTOMER.value} {{customer_code: customer_code}}) "
+        + _held_products("c", month_filter)
+        + "WITH customer_code, collect(DISTINCT p) AS held "
+        "CALL { WITH held "
+        + _recommendation_scoring(weighting)
+        + " RETURN collect({code: code, score: score}) AS recommendations } "
+        "RETURN customer_code, recommendations"
+    )
+
+
+def recommend_products_batch(
+    customer_codes: List[Any], k: int, weighting: str = "confidence", month: Any = None
+) -> Query:
+    """Top-k products for many customers in one UNWIND round trip."""
+    query = _recommend_products_batch_template(weighting, month is not None)
+    parameters = {"customer_codes": list(customer_codes), "k": k}
+    if month is not None:
+        parameters["month"] = month
+    return query, parameters
+
+
+@cached
+def _write_recommendations_batch_template() -> str:
+    customer, product = Label.CUSTOMER.value, Label.PRODUCT.value
+    recommended = RelationshipType.RECOMMENDED.value
+    return (
+        f"UNWIND $rows AS row MATCH (c:{customer} {{customer_code: row.customer_code}}) "
+        f"OPTIONAL MATCH (c)-[old:{recommended}]->() DELETE old "
+        "WITH DISTINCT c, row UNWIND row.recommendations AS recommendation "
+        f"MATCH (p:{product} {{code: recommendation.code}}) "
+        f"CREATE (c)-[r:{recommended}]->(p) "
+        "SET r.rank = recommendation.rank, r.score = recommendation.score "
+        "RETURN count(r) AS count"
+    )
+
+
+def write_recommendations_batch() -> str:
+    """Replace the RECOMMENDED relationships of every customer in $rows."""
+    return _write_recommendations_batch_template()
+
+
+@cached
+def _get_recommendations_template() -> str:
+    return (
+        f"MATCH (:{Label.CUSTOMER.value} {{customer_code: $customer_code}})"
+        f"-[r:{RelationshipType.RECOMMENDED.value}]->(p:{Label.PRODUCT.value}) "
+        "RETURN p.code AS code, r.score AS score ORDER BY r.rank"
+    )
+
+
+def get_recommendations(customer_code: Any) -> Query:
+    return _get_recommendations_template(), {"customer_code": customer_code}
+
+
+@cached
+def _delete_recommendations_template() -> str:
+    return (
+        "UNWIND $customer_codes AS customer_code "
+        f"MATCH (:{Label.CUSTOMER.value} {{customer_code: customer_code}})"
+        f"-[r:{RelationshipType.RECOMMENDED.value}]->() "
+        "DELETE r RETURN count(r) AS deleted_count"
+    )
+
+
+def delete_recommendations(customer_codes: List[Any]) -> Query:
+    return _delete_recommendations_template(), {"customer_codes": list(customer_codes)}
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+from utils.constants import (
+    NEO4J_CACHE_MAX_ENTRIES,
+    NEO4J_CACHE_MAX_RECORDS,
+    NEO4J_CACHE_TTL,
+)
+
+WILDCARD = "*"
+
+
+def label_tags(labels: Iterable[Any] = None) -> List[str]:
+    """Return the invalidation tags of node labels; no labels means any label."""
+    return [f"label:{label.value}" for label in labels] if labels else [f"label:{WILDCARD}"]
+
+
+def type_tags(types: Iterable[Any] = None) -> List[str]:
+    """Return the invalidation tags of relationship types; no types means any type."""
+    return [f"type:{type.value}" for type in types] if types else [f"type:{WILDCARD}"]
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters of a QueryCache since it was created or last reset.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    records: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class _Entry:
+    value: List[Dict[str, Any]]
+    expires_at: float
+    tags: Tuple[str, ...]
+
+
+class QueryCache:
+    """LRU cache with a TTL for the results of read queries.
+
+    Entries are keyed on the query template plus its parameters and carry
+    tags such as "label:Customer" or "type:HOLDS". Invalidating a tag drops
+    every entry that has it, or the wildcard of its namespace ("label:*").
+    Invalidating a wildcard drops the whole namespace.
+
+    The cache is bounded both by number of entries and by the total number
+    of cached records, which is what memory use is proportional to.
+    Cached results are shared between callers and must not be modified.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = NEO4J_CACHE_MAX_ENTRIES,
+        max_records: int = NEO4J_CACHE_MAX_RECORDS,
+        ttl: float = NEO4J_CACHE_TTL,
+    ):
+        if max_entries <= 0 or max_records <= 0:
+            raise ValueError("max_entries and max_records must be positive integers.")
+        self._max_entries = max_entries
+        self._max_records = max_records
+        self._ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._records = 0
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _freeze(value: Any) -> Hashable:
+        if isinstance(value, dict):
+            return tuple(sorted((k, QueryCache._freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(QueryCache._freeze(v) for v in value)
+        if isinstance(value, set):
+            return frozenset(QueryCache._freeze(v) for v in value)
+        return value
+
+    def key(self, query: str, parameters: Dict[str, Any] = None) -> Hashable:
+        """Return the cache key of a query, or None if its parameters are unhashable."""
+        key = (query, self._freeze(parameters or {}))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (True, value) on a hit and (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at < time.monotonic():
+                self._remove(key)
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return True, entry.value
+
+    def put(self, key: Hashable, value: List[Dict[str, Any]], tags: Iterable[str]) -> None:
+        size = len(value)
+        if size > self._max_records:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = _Entry(value, time.monotonic() + self._ttl, tuple(tags))
+            self._entries[key] = entry
+            self._records += size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while (
+                len(self._entries) > self._max_entries or self._records > self._max_records
+            ):
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._records -= len(entry.value)
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop the entries affected by a write to `tags`; return how many."""
+        with self._lock:
+            keys: Set[Hashable] = set()
+            for tag in tags:
+                namespace, _, name = tag.partition(":")
+                if name == WILDCARD:
+                    for other, other_keys in self._tags.items():
+                        if other.startswith(f"{namespace}:"):
+                            keys |= other_keys
+                else:
+                    keys |= self._tags.get(tag, set())
+                    keys |= self._tags.get(f"{namespace}:{WILDCARD}", set())
+            for key in keys:
+                self._remove(key)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._records = 0
+
+    def stats(self) -> CacheStats:
+        """Return a copy of the counters together with the current size."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+                records=self._records,
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = CacheStats()
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Tuple
+
+from utils.constants import NEO4J_METRICS_MAX_SAMPLES
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def server_time(summary) -> float:
+    """Return the server-reported time of a result summary, in seconds."""
+    if summary is None:
+        return 0.0
+    available_after = getattr(summary, "result_available_after", None) or 0
+    consumed_after = getattr(summary, "result_consumed_after", None) or 0
+    return (available_after + consumed_after) / 1000
+
+
+@dataclass
+class QueryStats:
+    """
+    Aggregated measurements for one (operation, query template) pair.
+    """
+
+    operation: str
+    query: str
+    count: int = 0
+    errors: int = 0
+    records: int = 0
+    parameter_bytes: int = 0
+    wall_time_sum: float = 0.0
+    server_time_sum: float = 0.0
+    samples: Deque[float] = field(default_factory=deque)
+
+    @property
+    def query_id(self) -> str:
+        return hashlib.sha1(self.query.encode("utf-8")).hexdigest()[:12]
+
+    def quantiles(self) -> Dict[float, float]:
+        """Return p50/p95/p99 of the recent wall times, in seconds."""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        return {
+            q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES
+        }
+
+
+class QueryMetrics:
+    """In-process latency and throughput histograms for driver queries.
+
+    Pass an instance to Neo4jDriver to record every query it runs.
+    """
+
+    def __init__(self, max_samples: int = NEO4J_METRICS_MAX_SAMPLES):
+        self._max_samples = max_samples
+        self._stats: Dict[Tuple[str, str], QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        operation: str,
+        query: str,
+        wall_time: float,
+        records: int = 0,
+        parameter_bytes: int = 0,
+        server_time: float = 0.0,
+        error: bool = False,
+    ) -> None:
+        """Record one execution of `query` issued by the driver method `operation`."""
+        key = (operation, query)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = QueryStats(
+                    operation, query, samples=deque(maxlen=self._max_samples)
+                )
+                self._stats[key] = stats
+            stats.count += 1
+            stats.errors += int(error)
+            stats.records += records
+            stats.parameter_bytes += parameter_bytes
+            stats.wall_time_sum += wall_time
+            stats.server_time_sum += server_time
+            stats.samples.append(wall_time)
+
+    def snapshot(self) -> List[QueryStats]:
+        """Return a copy of the current statistics, slowest total time first."""
+        with self._lock:
+            stats = [
+                QueryStats(
+                    s.operation,
+                    s.query,
+                    s.count,
+                    s.errors,
+                    s.records,
+                    s.parameter_bytes,
+                    s.wall_time_sum,
+                    s.server_time_sum,
+                    deque(s.samples),
+                )
+                for s in self._stats.values()
+            ]
+        return sorted(stats, key=lambda s: s.wall_time_sum, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def export(self, exporter: "MetricsExporter") -> None:
+        exporter.export(self.snapshot())
+
+
+class MetricsExporter(ABC):
+    """Base class for writing a QueryMetrics snapshot somewhere."""
+
+    @abstractmethod
+    def export(self, stats: List[QueryStats]) -> None:
+        """Write `stats`, sorted by total wall time."""
+
+
+class PrometheusTextExporter(MetricsExporter):
+    """Write the metrics in the Prometheus text exposition format.
+
+    The file can be picked up by node_exporter's textfile collector.
+    """
+
+    PREFIX = "neo4j_driver_query"
+
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+
+    @staticmethod
+    def _labels(stats: QueryStats, **extra) -> str:
+        labels = {"operation": stats.operation, "query_id": stats.query_id, **extra}
+        return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+    def render(self, stats: List[QueryStats]) -> str:
+        p = self.PREFIX
+        lines = [
+            f"# HELP {p}_duration_seconds Client-side wall time of driver queries.",
+            f"# TYPE {p}_duration_seconds summary",
+        ]
+        for s in stats:
+            for q, value in s.quantiles().items():
+                lines.append(f"{p}_duration_seconds{{{self._labels(s, quantile=q)}}} {value}")
+            lines.append(f"{p}_duration_seconds_sum{{{self._labels(s)}}} {s.wall_time_sum}")
+            lines.append(f"{p}_duration_seconds_count{{{self._labels(s)}}} {s.count}")
+
+        counters = [
+            ("server_seconds_total", "Server-reported time until results were consumed.", "server_time_sum"),
+            ("errors_total", "Failed driver queries.", "errors"),
+            ("records_total", "Records returned by driver queries.", "records"),
+            ("parameter_bytes_total", "Approximate size of query parameters.", "parameter_bytes"),
+        ]
+        for name, description, attribute in counters:
+            lines.append(f"# HELP {p}_{name} {description}")
+            lines.append(f"# TYPE {p}_{name} counter")
+            for s in stats:
+                lines.append(f"{p}_{name}{{{self._labels(s)}}} {getattr(s, attribute)}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, stats: List[QueryStats]) -> None:
+        # Write to a temporary file first so scrapers never see a partial dump.
+        directory = os.path.dirname(self._file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self._file_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(self.render(stats))
+        os.replace(temporary_path, self._file_path)
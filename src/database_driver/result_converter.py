@@ -0,0 +1,90 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set
+from neo4j.time import Date as Neo4jDate, DateTime as Neo4jDateTime, Time as Neo4jTime
+
+from models.neo4j_driver_models.database_models import Node, Relationship
+
+# Exact-type dispatch table from Neo4j values to their native Python equivalents.
+# Types that are not listed are returned unchanged.
+CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    Neo4jDate: Neo4jDate.to_native,
+    Neo4jDateTime: Neo4jDateTime.to_native,
+    Neo4jTime: Neo4jTime.to_native,
+}
+
+
+class PropertyConverter:
+    """Convert the property maps of one result to native Python values.
+
+    Results are homogeneous, so the keys that can hold Neo4j values are worked
+    out from the first row that contains them; every other key is passed
+    through without being looked at. Keys whose first value was None stay
+    under watch. With `convert=False` property maps are returned untouched.
+    """
+
+    def __init__(self, convert: bool = True):
+        self._convert = convert
+        self._known: Set[str] = set()
+        self._checked: List[str] = []
+
+    def _plan(self, properties: Dict[str, Any]) -> None:
+        for key, value in properties.items():
+            if key not in self._known:
+                self._known.add(key)
+                if value is None or type(value) in CONVERTERS:
+                    self._checked.append(key)
+
+    def __call__(self, properties: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._convert:
+            return properties
+        if not properties.keys() <= self._known:
+            self._plan(properties)
+
+        converted = None
+        for key in self._checked:
+            value = properties.get(key)
+            converter = CONVERTERS.get(type(value))
+            if converter is not None:
+                if converted is None:
+                    converted = dict(properties)
+                converted[key] = converter(value)
+        return properties if converted is None else converted
+
+
+def iter_nodes(
+    result: Iterable[Dict[str, Any]], convert: bool = True
+) -> Iterator[Node]:
+    convert_props = PropertyConverter(convert)
+    return (
+        Node(
+            id=entry["id"],
+            labels=entry["labels"],
+            properties=convert_props(entry["properties"]),
+        )
+        for entry in result
+    )
+
+
+def iter_relationships(
+    result: Iterable[Dict[str, Any]], convert: bool = True
+) -> Iterator[Relationship]:
+    convert_props = PropertyConverter(convert)
+    return (
+        Relationship(
+            id=entry["id"],
+            start_id=entry["start_id"],
+            end_id=entry["end_id"],
+            type=entry["type"],
+            properties=convert_props(entry["properties"]),
+        )
+        for entry in result
+    )
+
+
+def to_nodes(result: Iterable[Dict[str, Any]], convert: bool = True) -> List[Node]:
+    return list(iter_nodes(result, convert))
+
+
+def to_relationships(
+    result: Iterable[Dict[str, Any]], convert: bool = True
+) -> List[Relationship]:
+    return list(iter_relationships(result, convert))
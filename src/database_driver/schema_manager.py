@@ -0,0 +1,136 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List
+
+from database_driver import query_builder
+from logger.logger import Logger
+from models.neo4j_driver_models.schema_models import IndexMiss, SchemaDefinition
+from utils.enums import Label, RelationshipType
+
+if TYPE_CHECKING:
+    from database_driver.neo4j_driver import Neo4jDriver
+
+# Properties the driver and the loaders match on, per label and relationship type.
+NODE_SCHEMA: Dict[Label, SchemaDefinition] = {
+    Label.PERSON: SchemaDefinition(indexed=("name",)),
+    Label.MOVIES: SchemaDefinition(indexed=("name",)),
+    Label.CUSTOMER: SchemaDefinition(unique=("customer_code",)),
+    Label.PRODUCT: SchemaDefinition(unique=("code",)),
+    Label.BENCHMARK: SchemaDefinition(unique=("uid",)),
+}
+RELATIONSHIP_SCHEMA: Dict[RelationshipType, SchemaDefinition] = {
+    RelationshipType.HOLDS: SchemaDefinition(indexed=("date",)),
+}
+
+# Plan operators that read every node of a label / every relationship of a type
+SCAN_OPERATORS = {
+    "AllNodesScan",
+    "NodeByLabelScan",
+    "DirectedRelationshipTypeScan",
+    "UndirectedRelationshipTypeScan",
+    "DirectedAllRelationshipsScan",
+    "UndirectedAllRelationshipsScan",
+}
+
+
+class SchemaManager:
+    """
+    Create the indexes and constraints declared in NODE_SCHEMA and
+    RELATIONSHIP_SCHEMA, and find queries that do not use them.
+
+    Every statement uses IF NOT EXISTS, so `apply()` can run on each connect.
+    """
+
+    def __init__(
+        self,
+        driver: "Neo4jDriver",
+        logger: Logger,
+        node_schema: Dict[Label, SchemaDefinition] = None,
+        relationship_schema: Dict[RelationshipType, SchemaDefinition] = None,
+    ):
+        self._driver = driver
+        self._logger = logger
+        self._node_schema = NODE_SCHEMA if node_schema is None else node_schema
+        self._relationship_schema = (
+            RELATIONSHIP_SCHEMA if relationship_schema is None else relationship_schema
+        )
+
+    def statements(self) -> List[str]:
+        """Return the schema statements for every declared property."""
+        statements = []
+        for label, definition in self._node_schema.items():
+            statements += [
+                query_builder.create_unique_constraint(label, key)
+                for key in definition.unique
+            ]
+            statements += [
+                query_builder.create_node_index(label, key) for key in definition.indexed
+            ]
+        for type, definition in self._relationship_schema.items():
+            if definition.unique:
+                raise ValueError(
+                    f"Uniqueness is not supported on relationship type '{type.value}'."
+                )
+            statements += [
+                query_builder.create_relationship_index(type, key)
+                for key in definition.indexed
+            ]
+        return statements
+
+    def apply(self) -> List[str]:
+        """
+        Create the missing indexes and constraints.
+        A statement that fails (for example because existing data violates a
+        uniqueness constraint) is logged and skipped.
+        Returns:
+            List[str]: The statements that were applied successfully.
+        """
+        applied = []
+        for statement in self.statements():
+            try:
+                self._driver.execute_query(statement)
+                applied.append(statement)
+            except Exception as e:
+                self._logger.log_warning(
+                    'Could not apply schema statement "%s": %s', statement, e
+                )
+        self._logger.log_info(
+            "Applied %d of %d schema statement(s).", len(applied), len(self.statements())
+        )
+        return applied
+
+    def report(self, queries: Iterable[str]) -> List[IndexMiss]:
+        """
+        Explain each query and report the ones that filter a full scan.
+        The queries are not executed. The templates the driver has run can be
+        taken from QueryMetrics: `[s.query for s in metrics.snapshot()]`.
+        Args:
+            queries (Iterable[str]): Query texts with $parameters.
+        Returns:
+            List[IndexMiss]: One entry per scan operator of a filtering query.
+        """
+        misses = []
+        for query in dict.fromkeys(queries):
+            plan = self._driver.explain(query)
+            operators = list(self._walk(plan))
+            if not any(self._operator(op) == "Filter" for op in operators):
+                continue
+            for op in operators:
+                name = self._operator(op)
+                if name in SCAN_OPERATORS:
+                    details = str(op.get("args", {}).get("Details", ""))
+                    misses.append(IndexMiss(query, name, details))
+
+        for miss in misses:
+            self._logger.log_warning("Query would miss an index: %s", miss)
+        return misses
+
+    @staticmethod
+    def _operator(plan: Dict[str, Any]) -> str:
+        return plan.get("operatorType", "").split("@")[0]
+
+    @classmethod
+    def _walk(cls, plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        if not plan:
+            return
+        yield plan
+        for child in plan.get("children", []):
+            yield from cls._walk(child)
@@ -0,0 +1,333 @@
+import argparse
+import json
+import os
+import shutil
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ingestion.santander_csv import read_santander_csv
+from logger.logger import Logger
+from utils.constants import (
+    LOG_FILE_BASE,
+    SANTANDER_CANONICAL_DTYPES,
+    SANTANDER_CSV_CHUNK_SIZE,
+    SANTANDER_PRODUCT_COLUMNS,
+    SANTANDER_SAMPLE_CUSTOMERS,
+    SANTANDER_SAMPLE_RANDOM_STATE,
+)
+
+ARROW_TYPES = {
+    "datetime64[ns]": pa.timestamp("ns"),
+    "uint32": pa.uint32(),
+    "uint8": pa.uint8(),
+    "UInt8": pa.uint8(),
+    "Int32": pa.int32(),
+    "float64": pa.float64(),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+}
+# Nullable integers come back from Arrow as floats when they hold nulls
+NULLABLE_DTYPES = {
+    column: dtype
+    for column, dtype in SANTANDER_CANONICAL_DTYPES.items()
+    if dtype in ("UInt8", "Int32")
+}
+
+
+def canonical_columns() -> List[str]:
+    return list(SANTANDER_CANONICAL_DTYPES)
+
+
+def arrow_schema(columns: Sequence[str] = None) -> pa.Schema:
+    return pa.schema(
+        [(c, ARROW_TYPES[SANTANDER_CANONICAL_DTYPES[c]]) for c in columns or canonical_columns()]
+    )
+
+
+def month_key(month) -> str:
+    """Return a month (date, Timestamp or ISO string) as "YYYY-MM-DD"."""
+    return pd.Timestamp(month).strftime("%Y-%m-%d")
+
+
+def to_canonical(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Cast a chunk from read_santander_csv to SANTANDER_CANONICAL_DTYPES."""
+    for column in chunk.columns:
+        dtype = SANTANDER_CANONICAL_DTYPES[column]
+        if dtype == "datetime64[ns]":
+            chunk[column] = pd.to_datetime(chunk[column], errors="coerce")
+        elif dtype == "uint8":
+            chunk[column] = chunk[column].fillna(0).astype(np.uint8)
+        elif dtype in ("UInt8", "Int32"):
+            chunk[column] = pd.to_numeric(chunk[column], errors="coerce").astype(dtype)
+        else:
+            chunk[column] = chunk[column].astype(dtype)
+    return chunk
+
+
+def to_frame(table: pa.Table) -> pd.DataFrame:
+    """Convert an Arrow table of the store to pandas with the canonical dtypes."""
+    frame = table.to_pandas(split_blocks=True, self_destruct=True)
+    for column, dtype in NULLABLE_DTYPES.items():
+        if column in frame and frame[column].dtype != dtype:
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+class SantanderFeatureStore:
+    """
+    The Santander extract as month-partitioned Parquet, with the canonical
+    renamed schema of SANTANDER_CANONICAL_DTYPES.
+
+    `convert` parses the CSV once; afterwards `read` loads only the requested
+    columns, months and customers, memory-mapping the Parquet files. Derived
+    data is cached next to the partitions: per-month holding matrices as .npy
+    files that are memory-mapped, and customer samples. Layout:
+
+        <directory>/manifest.json
+        <directory>/months/month=<date>/data.parquet
+        <directory>/cache/holdings-<date>/{customer_codes,holdings}.npy
+        <directory>/samples/customers-<n>-<seed>.npy, sample-<n>-<seed>.parquet
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, directory: str, logger: Logger):
+        self._directory = directory
+        self._logger = logger
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self._directory, *parts)
+
+    def _partition(self, month: str) -> str:
+        return self._path("months", f"month={month}", "data.parquet")
+
+    # ===========================
+    # CONVERSION
+    # ===========================
+    def manifest(self) -> Dict:
+        path = self._path(self.MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    @staticmethod
+    def _source(csv_path: str) -> Dict:
+        stat = os.stat(csv_path)
+        return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def convert(
+        self,
+        csv_path: str,
+        chunk_size: int = SANTANDER_CSV_CHUNK_SIZE,
+        force: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Convert a raw or renamed Santander CSV into one Parquet file per month.
+        Nothing is done if the store was already built from the same file,
+        unless `force` is set. Returns the number of rows of every month.
+        """
+        manifest = self.manifest()
+        source = self._source(csv_path)
+        if manifest and manifest["source"] == source and not force:
+            self._logger.log_info("Feature store is up to date with %s", csv_path)
+            return manifest["months"]
+
+        # Partitions are written next to the live ones and swapped in at the
+        # end, so readers never see a half-converted store.
+        staging = self._path("months.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        schema = arrow_schema()
+        writers: Dict[str, pq.ParquetWriter] = {}
+        months: Dict[str, int] = {}
+        try:
+            for chunk in read_santander_csv(csv_path, canonical_columns(), chunk_size):
+                chunk = to_canonical(chunk)
+                for month, rows in chunk.groupby("date", sort=False):
+                    key = month_key(month)
+                    if key not in writers:
+                        directory = os.path.join(staging, f"month={key}")
+                        os.makedirs(directory)
+                        writers[key] = pq.ParquetWriter(
+                            os.path.join(directory, "data.parquet"), schema
+                        )
+                    writers[key].write_table(
+                        pa.Table.from_pandas(rows, schema=schema, preserve_index=False)
+                    )
+                    months[key] = months.get(key, 0) + len(rows)
+                self._logger.log_info("Converted %d row(s) of %s", sum(months.values()), csv_path)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        shutil.rmtree(self._path("months"), ignore_errors=True)
+        os.replace(staging, self._path("months"))
+        # Anything derived from the previous partitions is stale now
+        shutil.rmtree(self._path("cache"), ignore_errors=True)
+        shutil.rmtree(self._path("samples"), ignore_errors=True)
+
+        manifest = {"source": source, "months": dict(sorted(months.items()))}
+        path = self._path(self.MANIFEST_FILE)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(f"{path}.tmp", path)
+        return manifest["months"]
+
+    # ===========================
+    # READS
+    # ===========================
+    def months(self) -> List[str]:
+        manifest = self.manifest()
+        if manifest is None:
+            self._logger.log_error("The feature store is empty. Run convert() first.")
+            raise RuntimeError("The feature store is empty. Run convert() first.")
+        return list(manifest["months"])
+
+    def read_table(
+        self,
+        columns: Sequence[str] = None,
+        months: Sequence = None,
+        customer_codes: Sequence[int] = None,
+    ) -> pa.Table:
+        """Like `read`, but return the Arrow table."""
+        known = self.months()
+        selected = [month_key(m) for m in months] if months is not None else known
+        unknown = set(selected) - set(known)
+        if unknown:
+            self._logger.log_error("Months not in the feature store: %s", sorted(unknown))
+            raise ValueError(f"Months not in the feature store: {sorted(unknown)}")
+
+        columns = list(columns) if columns else canonical_columns()
+        read_columns = columns
+        if customer_codes is not None:
+            codes = pa.array(np.asarray(customer_codes, dtype=np.uint32))
+            if "customer_code" not in columns:
+                read_columns = columns + ["customer_code"]
+
+        tables = []
+        for month in selected:
+            table = pq.read_table(self._partition(month), columns=read_columns, memory_map=True)
+            if customer_codes is not None:
+                table = table.filter(pc.is_in(table["customer_code"], value_set=codes))
+            tables.append(table.select(columns))
+        if not tables:
+            return arrow_schema(columns).empty_table()
+        return pa.concat_tables(tables)
+
+    def read(
+        self,
+        columns: Sequence[str] = None,
+        months: Sequence = None,
+        customer_codes: Sequence[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Load part of the extract.
+        Args:
+            columns (Sequence[str]): Renamed columns to load; all by default.
+            months (Sequence): Months (dates or ISO strings) to load; all by default.
+            customer_codes (Sequence[int]): Only keep these customers.
+        Returns:
+            pd.DataFrame: Rows in file order, with the canonical dtypes.
+        """
+        return to_frame(self.read_table(columns, months, customer_codes))
+
+    def holdings(self, month) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the customer codes and the customers x products uint8 matrix
+        of one month. Both are cached as .npy files and memory-mapped.
+        """
+        key = month_key(month)
+        directory = self._path("cache", f"holdings-{key}")
+        if not os.path.exists(os.path.join(directory, "holdings.npy")):
+            frame = self.read(["customer_code"] + SANTANDER_PRODUCT_COLUMNS, [key])
+            staging = f"{directory}.tmp"
+            os.makedirs(staging, exist_ok=True)
+            np.save(os.path.join(staging, "customer_codes.npy"), frame["customer_code"].to_numpy())
+            np.save(
+                os.path.join(staging, "holdings.npy"),
+                np.ascontiguousarray(frame[SANTANDER_PRODUCT_COLUMNS].to_numpy(np.uint8)),
+            )
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(staging, directory)
+        return (
+            np.load(os.path.join(directory, "customer_codes.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "holdings.npy"), mmap_mode="r"),
+        )
+
+    # ===========================
+    # CUSTOMER SAMPLE
+    # ===========================
+    def sample_customers(
+        self,
+        size: int = SANTANDER_SAMPLE_CUSTOMERS,
+        random_state: int = SANTANDER_SAMPLE_RANDOM_STATE,
+    ) -> np.ndarray:
+        """
+        Return the customer codes sampled by the extract_train_data notebook:
+        `size` rows drawn from the customer_code column (so customers present
+        in more months are likelier and codes can repeat), deduplicated.
+        The codes are cached, so later calls do not read the data again.
+        """
+        path = self._path("samples", f"customers-{size}-{random_state}.npy")
+        if not os.path.exists(path):
+            codes = self.read(["customer_code"])["customer_code"]
+            sample = pd.unique(codes.sample(size, random_state=random_state).to_numpy())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.save(f"{path}.tmp.npy", sample)
+            os.replace(f"{path}.tmp.npy", path)
+        return np.load(path)
+
+    def read_sample(
+        self,
+        columns: Sequence[str] = None,
+        months: Sequence = None,
+        size: int = SANTANDER_SAMPLE_CUSTOMERS,
+        random_state: int = SANTANDER_SAMPLE_RANDOM_STATE,
+    ) -> pd.DataFrame:
+        """
+        Load the rows of the sampled customers (the notebook's
+        train_adjusted.csv). All of their rows are cached in one Parquet file
+        on first use; `columns` and `months` are then read from that file.
+        """
+        path = self._path("samples", f"sample-{size}-{random_state}.parquet")
+        if not os.path.exists(path):
+            table = self.read_table(customer_codes=self.sample_customers(size, random_state))
+            pq.write_table(table, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+
+        columns = list(columns) if columns else canonical_columns()
+        if months is None:
+            return to_frame(pq.read_table(path, columns=columns, memory_map=True))
+        table = pq.read_table(path, columns=list(dict.fromkeys(columns + ["date"])), memory_map=True)
+        dates = pa.array(pd.to_datetime([month_key(m) for m in months]), pa.timestamp("ns"))
+        table = table.filter(pc.is_in(table["date"], value_set=dates))
+        return to_frame(table.select(columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the Santander CSV into the Parquet feature store."
+    )
+    parser.add_argument("csv_path", help="Raw or renamed CSV file")
+    parser.add_argument("directory", help="Feature store directory")
+    parser.add_argument("--chunk-size", type=int, default=SANTANDER_CSV_CHUNK_SIZE)
+    parser.add_argument("--force", action="store_true", help="Convert even if up to date")
+    parser.add_argument(
+        "--sample", action="store_true", help="Also build the cached customer sample"
+    )
+    args = parser.parse_args()
+
+    store = SantanderFeatureStore(args.directory, Logger(file_name=LOG_FILE_BASE))
+    for month, rows in store.convert(args.csv_path, args.chunk_size, args.force).items():
+        print(f"{month}: {rows} row(s)")
+    if args.sample:
+        print(f"Sampled {len(store.sample_customers())} customer(s)")
+        store.read_sample(["customer_code"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+from utils.constants import (
+    SANTANDER_CSV_CHUNK_SIZE,
+    SANTANDER_CUSTOMER_COLUMNS,
+    SANTANDER_DTYPES,
+    SANTANDER_PRODUCT_COLUMNS,
+    SANTANDER_RENAME_MAP,
+)
+
+# Columns that are padded with spaces or contain "NA" strings in the raw file
+INTEGER_COLUMNS = ["age", "seniority"]
+DATE_COLUMNS = ["date", "first_holder_date"]
+
+
+def default_columns() -> List[str]:
+    """Return the renamed columns needed to build the graph."""
+    return ["date"] + SANTANDER_CUSTOMER_COLUMNS + SANTANDER_PRODUCT_COLUMNS
+
+
+def read_santander_csv(
+    csv_path: str,
+    columns: List[str] = None,
+    chunk_size: int = SANTANDER_CSV_CHUNK_SIZE,
+    skip_rows: int = 0,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a Santander CSV as typed chunks with the project's column names.
+
+    Works on the raw Kaggle file (train_ver2.csv) as well as on files whose
+    columns were already renamed by the extraction notebooks. Only `columns`
+    are parsed, each with an explicit dtype, so pandas never has to guess
+    types for a whole column and memory stays bounded by `chunk_size`.
+    Args:
+        csv_path (str): Path of the CSV file.
+        columns (List[str]): Renamed columns to load. Defaults to default_columns().
+        chunk_size (int): Number of rows per chunk.
+        skip_rows (int): Number of data rows to skip at the start of the file.
+    Yields:
+        pd.DataFrame: Chunks with renamed, typed columns and a RangeIndex
+        continuing across chunks (so `index` is the row offset in the file).
+    """
+    wanted = set(columns or default_columns())
+    header = pd.read_csv(csv_path, nrows=0).columns
+    rename = {column: SANTANDER_RENAME_MAP.get(column, column) for column in header}
+    usecols = [column for column in header if rename[column] in wanted]
+    dtype = {column: SANTANDER_DTYPES.get(rename[column], "str") for column in usecols}
+
+    missing = wanted - {rename[column] for column in usecols}
+    if missing:
+        raise ValueError(f"Columns not found in {csv_path}: {sorted(missing)}")
+
+    reader = pd.read_csv(
+        csv_path,
+        usecols=usecols,
+        dtype=dtype,
+        chunksize=chunk_size,
+        skiprows=range(1, skip_rows + 1) if skip_rows else None,
+    )
+    offset = skip_rows
+    for chunk in reader:
+        if chunk.empty:
+            continue
+        chunk = chunk.rename(columns=rename)
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield normalize(chunk)
+
+
+def normalize(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Parse padded integer columns and dates of a renamed chunk, in place."""
+    for column in INTEGER_COLUMNS:
+        if column in chunk:
+            chunk[column] = pd.to_numeric(
+                chunk[column].str.strip(), errors="coerce"
+            ).astype("Int64")
+    for column in DATE_COLUMNS:
+        if column in chunk:
+            chunk[column] = pd.to_datetime(chunk[column], errors="coerce").dt.date
+    for column in chunk.columns:
+        if column in DATE_COLUMNS:
+            continue
+        # Text is object dtype before pandas 3 and StringDtype from pandas 3.
+        if is_object_dtype(chunk[column]) or is_string_dtype(chunk[column]):
+            chunk[column] = chunk[column].str.strip()
+    return chunk
+
+
+def to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a frame to plain Python dicts, with missing values as None."""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
@@ -0,0 +1,363 @@
+import argparse
+import json
+import os
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from analytics.product_statistics import ProductStatisticsJob, ProductStatisticsStore
+from database_driver import query_builder
+from database_driver.neo4j_driver import Neo4jDriver
+from ingestion.santander_csv import read_santander_csv, to_records
+from ingestion.santander_ingestion import (
+    SantanderIngestion,
+    holding_entries,
+    merge_customers,
+    merge_holdings,
+)
+from logger.logger import Logger
+from models.ingestion_models.ingestion_models import DeltaCheckpoint, DeltaStats
+from models.neo4j_driver_models.connection_model import ConnectionModel
+from recommender.serving import FileRecommendationStore
+from utils.constants import (
+    LOG_FILE_BASE,
+    NEO4J_DEFAULT_BATCH_SIZE,
+    SANTANDER_CSV_CHUNK_SIZE,
+    SANTANDER_CUSTOMER_COLUMNS,
+    SANTANDER_PRODUCT_COLUMNS,
+)
+from utils.enums import Label, RelationshipType
+from utils.utils import chunked
+
+PROPERTY_COLUMNS = [c for c in SANTANDER_CUSTOMER_COLUMNS if c != "customer_code"]
+
+
+class SantanderDeltaLoader:
+    """
+    Apply monthly Santander snapshots to the graph incrementally.
+
+    The last known state of every customer (properties and product flags) is
+    kept in `state_dir`. Each new month is diffed against it per customer_code
+    and only the differences are written: changed properties, new customers,
+    and HOLDS relationships for products that were added (dated with the month)
+    or removed. The cost of a refresh grows with churn rather than with the
+    number of customers.
+
+    The graph therefore holds one HOLDS per product a customer currently
+    holds, dated with the month it was acquired, unlike the month-dated
+    history SantanderIngestion writes. Removing a product deletes every HOLDS
+    between the pair, whatever its date, and customers absent from a month
+    keep their holdings. `run` refuses to start on a graph that already has
+    several HOLDS for one customer and product.
+
+    A checkpoint is saved after every written chunk. An interrupted load
+    re-reads the month in progress to rebuild its snapshot but only writes the
+    rows after the checkpoint.
+
+    `on_month_loaded(month, rows)` is called once a month is complete, with
+    the latest row of every customer present that month (indexed by
+    customer_code), e.g. to refresh statistics derived from the holdings.
+    `on_holdings_changed(customer_codes)` is called after every written chunk
+    with the customers that gained or lost a product, e.g. to invalidate
+    their precomputed recommendations.
+    """
+
+    CHECKPOINT_FILE = "checkpoint.json"
+    # Pickled rather than Parquet: the columns become object dtype once
+    # concatenated with the empty initial snapshot and hold dates, nullable
+    # integers and text that diff() compares as they are; a Parquet round
+    # trip would infer new dtypes for them.
+    SNAPSHOT_FILE = "snapshot.pkl"
+
+    def __init__(
+        self,
+        driver: Neo4jDriver,
+        logger: Logger,
+        state_dir: str,
+        chunk_size: int = SANTANDER_CSV_CHUNK_SIZE,
+        batch_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+        on_month_loaded: Callable[[str, pd.DataFrame], None] = None,
+        on_holdings_changed: Callable[[List[int]], None] = None,
+    ):
+        self._driver = driver
+        self._logger = logger
+        self._state_dir = state_dir
+        self._chunk_size = chunk_size
+        self._batch_size = batch_size
+        self._on_month_loaded = on_month_loaded
+        self._on_holdings_changed = on_holdings_changed
+        os.makedirs(state_dir, exist_ok=True)
+
+    # ===========================
+    # STATE
+    # ===========================
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self._state_dir, file_name)
+
+    def load_checkpoint(self) -> DeltaCheckpoint:
+        path = self._path(self.CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            return DeltaCheckpoint()
+        with open(path, "r", encoding="utf-8") as file:
+            return DeltaCheckpoint(**json.load(file))
+
+    def _save_checkpoint(self, checkpoint: DeltaCheckpoint) -> None:
+        path = self._path(self.CHECKPOINT_FILE)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(asdict(checkpoint), file)
+        os.replace(f"{path}.tmp", path)
+
+    def load_snapshot(self) -> pd.DataFrame:
+        """Return the last known state, indexed by customer_code."""
+        path = self._path(self.SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return pd.DataFrame(
+                columns=PROPERTY_COLUMNS + SANTANDER_PRODUCT_COLUMNS,
+                index=pd.Index([], name="customer_code", dtype=np.int64),
+            )
+        return pd.read_pickle(path)
+
+    def _save_snapshot(self, snapshot: pd.DataFrame) -> None:
+        path = self._path(self.SNAPSHOT_FILE)
+        snapshot.to_pickle(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    # ===========================
+    # LOAD
+    # ===========================
+    def run(self, csv_path: str) -> List[DeltaStats]:
+        """
+        Apply every month of `csv_path` newer than the checkpoint.
+        Args:
+            csv_path (str): Raw or renamed Santander CSV, sorted by month. The
+                checkpoint offsets refer to this file, so keep using the same
+                file until its last month is loaded.
+        Returns:
+            List[DeltaStats]: What was written for each month.
+        """
+        SantanderIngestion(self._driver, self._logger).prepare()
+        checkpoint = self.load_checkpoint()
+        if checkpoint.last_month is None and not checkpoint.row_offset:
+            self._check_current_holdings()
+        previous = self.load_snapshot()
+        self._logger.log_info(
+            "Resuming %s after month %s at row %d",
+            csv_path,
+            checkpoint.last_month,
+            checkpoint.row_offset,
+        )
+
+        results: List[DeltaStats] = []
+        month, month_rows, end = None, [], checkpoint.month_offset
+        for chunk in read_santander_csv(
+            csv_path, chunk_size=self._chunk_size, skip_rows=checkpoint.month_offset
+        ):
+            end = chunk.index[-1] + 1
+            for date, rows in chunk.groupby("date", sort=False):
+                key = date.isoformat()
+                if checkpoint.last_month is not None and key <= checkpoint.last_month:
+                    continue
+                if key != month:
+                    if month is not None:
+                        previous = self._complete_month(
+                            month, previous, month_rows, rows.index[0], checkpoint
+                        )
+                    month, month_rows = key, []
+                    checkpoint.month_offset = rows.index[0]
+                    results.append(DeltaStats(month))
+
+                month_rows.append(rows)
+                pending = rows[rows.index >= checkpoint.row_offset]
+                if len(pending):
+                    self._apply(previous, pending, date, results[-1])
+                    checkpoint.row_offset = pending.index[-1] + 1
+                    self._save_checkpoint(checkpoint)
+
+        if month is not None:
+            self._complete_month(month, previous, month_rows, end, checkpoint)
+        return results
+
+    def _check_current_holdings(self) -> None:
+        if self._driver.execute_query(query_builder.MONTHLY_HOLDINGS):
+            self._logger.log_error(
+                "The graph has HOLDS for several months; the delta loader only keeps current holdings."
+            )
+            raise RuntimeError(
+                "The graph has HOLDS for several months; the delta loader only keeps current holdings."
+            )
+
+    def _complete_month(
+        self,
+        month: str,
+        previous: pd.DataFrame,
+        month_rows: List[pd.DataFrame],
+        end: int,
+        checkpoint: DeltaCheckpoint,
+    ) -> pd.DataFrame:
+        current = self._snapshot(pd.concat(month_rows))
+        snapshot = pd.concat(
+            [previous[~previous.index.isin(current.index)], current]
+        )
+        # The snapshot goes first: if the process stops in between, the month
+        # is replayed against its own snapshot, which writes nothing.
+        self._save_snapshot(snapshot)
+        checkpoint.last_month = month
+        checkpoint.month_offset = checkpoint.row_offset = end
+        self._save_checkpoint(checkpoint)
+        self._logger.log_info("Month %s loaded, %d customer(s) known", month, len(snapshot))
+        if self._on_month_loaded is not None:
+            self._on_month_loaded(month, current)
+        return snapshot
+
+    @staticmethod
+    def _snapshot(rows: pd.DataFrame) -> pd.DataFrame:
+        latest = rows.drop_duplicates("customer_code", keep="last")
+        return latest.set_index("customer_code")[PROPERTY_COLUMNS + SANTANDER_PRODUCT_COLUMNS]
+
+    def _apply(
+        self, previous: pd.DataFrame, rows: pd.DataFrame, date, stats: DeltaStats
+    ) -> None:
+        updates, added, removed = self.diff(previous, rows, date)
+        stats.rows += len(rows)
+        for batch in chunked(updates, self._batch_size):
+            stats.customers += self._driver.execute_write(merge_customers, batch)
+        for batch in chunked(added, self._batch_size):
+            stats.added_holdings += self._driver.execute_write(merge_holdings, batch)
+        for batch in chunked(removed, self._batch_size):
+            stats.removed_holdings += self._driver.execute_write(
+                self._delete_holdings, batch
+            )
+        if self._on_holdings_changed is not None and (added or removed):
+            self._on_holdings_changed(
+                sorted({e["start_node_properties"]["customer_code"] for e in added + removed})
+            )
+        self._logger.log_info(
+            "Rows %d-%d of %s: %d customer update(s), +%d/-%d holding(s)",
+            rows.index[0],
+            rows.index[-1],
+            stats.month,
+            len(updates),
+            len(added),
+            len(removed),
+        )
+
+    @staticmethod
+    def diff(
+        previous: pd.DataFrame, rows: pd.DataFrame, date
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Compare the rows of one month with the last known state.
+        Args:
+            previous (pd.DataFrame): Last known state, indexed by customer_code.
+            rows (pd.DataFrame): Rows of the new month.
+            date: The month of `rows`.
+        Returns:
+            tuple: (customer merge entries with only the changed properties,
+            HOLDS entries to add, HOLDS entries to remove)
+        """
+        current = SantanderDeltaLoader._snapshot(rows)
+        before = previous.reindex(current.index)
+        codes = current.index.to_numpy()
+
+        new_flags = current[SANTANDER_PRODUCT_COLUMNS].to_numpy(dtype=np.float32) == 1
+        old_flags = before[SANTANDER_PRODUCT_COLUMNS].to_numpy(dtype=np.float32) == 1
+        added = holding_entries(
+            codes, new_flags & ~old_flags, np.full(len(codes), date, dtype=object)
+        )
+        removed = holding_entries(codes, old_flags & ~new_flags)
+
+        changed = pd.DataFrame(index=current.index)
+        for column in PROPERTY_COLUMNS:
+            new, old = current[column], before[column].astype(current[column].dtype)
+            equal = (new == old).fillna(False) | (new.isna() & old.isna())
+            changed[column] = ~equal.to_numpy(dtype=bool)
+        is_new = ~current.index.isin(previous.index)
+        mask = changed.to_numpy()
+        rows_to_write = np.flatnonzero(mask.any(axis=1) | is_new)
+
+        records = to_records(current.iloc[rows_to_write][PROPERTY_COLUMNS])
+        updates = []
+        for row, properties in zip(rows_to_write, records):
+            columns = mask[row]
+            new_properties = {
+                column: value
+                for column, value, is_changed in zip(PROPERTY_COLUMNS, properties.values(), columns)
+                if is_changed
+            }
+            new_properties["customer_code"] = int(codes[row])
+            new_properties["snapshot_date"] = date
+            updates.append(
+                {
+                    "match_criteria": {"customer_code": int(codes[row])},
+                    "new_properties": new_properties,
+                }
+            )
+        return updates, added, removed
+
+    @staticmethod
+    def _delete_holdings(driver: Neo4jDriver, batch: List[Dict[str, Any]]) -> int:
+        return driver.delete_relationships_batch(
+            [Label.CUSTOMER],
+            [Label.PRODUCT],
+            batch,
+            RelationshipType.HOLDS,
+            chunk_size=len(batch),
+        )
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Apply new monthly Santander snapshots to Neo4j."
+    )
+    parser.add_argument("csv_path", help="Raw or renamed CSV file, sorted by month")
+    parser.add_argument("state_dir", help="Directory for the checkpoint and snapshot")
+    parser.add_argument("--chunk-size", type=int, default=SANTANDER_CSV_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=NEO4J_DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--statistics-dir", help="Keep product statistics materialized in this directory"
+    )
+    parser.add_argument(
+        "--recommendations-dir",
+        help="Invalidate the precomputed recommendations kept in this directory",
+    )
+    args = parser.parse_args()
+
+    logger = Logger(file_name=LOG_FILE_BASE)
+    driver = Neo4jDriver(logger)
+    driver.connect(
+        ConnectionModel(
+            host=os.getenv("NEO4J_HOST"),
+            user=os.getenv("NEO4J_USER"),
+            password=os.getenv("NEO4J_PASSWORD"),
+        )
+    )
+    try:
+        statistics = None
+        if args.statistics_dir:
+            statistics = ProductStatisticsJob(
+                driver, logger, ProductStatisticsStore(args.statistics_dir)
+            )
+        recommendations = None
+        if args.recommendations_dir:
+            recommendations = FileRecommendationStore(args.recommendations_dir)
+        loader = SantanderDeltaLoader(
+            driver,
+            logger,
+            args.state_dir,
+            args.chunk_size,
+            args.batch_size,
+            on_month_loaded=statistics.on_month_loaded if statistics else None,
+            on_holdings_changed=recommendations.invalidate if recommendations else None,
+        )
+        for stats in loader.run(args.csv_path):
+            print(stats)
+    finally:
+        driver.disconnect()
+
+
+if __name__ == "__main__":
+    main()
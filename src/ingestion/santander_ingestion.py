@@ -0,0 +1,241 @@
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Set
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from database_driver.neo4j_driver import Neo4jDriver
+from database_driver.schema_manager import SchemaManager
+from ingestion.santander_csv import read_santander_csv, to_records
+from logger.logger import Logger
+from models.ingestion_models.ingestion_models import IngestionStats
+from models.neo4j_driver_models.connection_model import ConnectionModel
+from utils.constants import (
+    LOG_FILE_BASE,
+    NEO4J_DEFAULT_BATCH_SIZE,
+    SANTANDER_CSV_CHUNK_SIZE,
+    SANTANDER_CUSTOMER_COLUMNS,
+    SANTANDER_INGESTION_WORKERS,
+    SANTANDER_PRODUCT_COLUMNS,
+    SANTANDER_PRODUCT_NAMES,
+)
+from utils.enums import Label, RelationshipType
+from utils.utils import chunked
+
+
+class SantanderIngestion:
+    """
+    Load the Santander product recommendation CSV into the graph.
+
+    Every row becomes a Customer node (keyed on customer_code) and one HOLDS
+    relationship per product flag set that month, carrying the month as
+    `date`. Product nodes are keyed on their column name (`code`).
+
+    The CSV is read chunk by chunk on the calling thread while a bounded pool
+    of workers writes earlier chunks; each worker writes in UNWIND batches,
+    each batch in its own managed write transaction so deadlocks between
+    workers are retried by the driver. At most `workers * 2` chunks are held
+    in memory at any time.
+    """
+
+    def __init__(
+        self,
+        driver: Neo4jDriver,
+        logger: Logger,
+        chunk_size: int = SANTANDER_CSV_CHUNK_SIZE,
+        batch_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+        workers: int = SANTANDER_INGESTION_WORKERS,
+    ):
+        if workers <= 0:
+            raise ValueError("workers must be a positive integer.")
+        self._driver = driver
+        self._logger = logger
+        self._chunk_size = chunk_size
+        self._batch_size = batch_size
+        self._workers = workers
+
+    def prepare(self) -> None:
+        """Create the uniqueness constraints MERGE relies on, and the products."""
+        # Without the constraints concurrent MERGEs of the same customer could
+        # create duplicates, and every MERGE would scan all Customer nodes.
+        SchemaManager(self._driver, self._logger).apply()
+
+        products = [
+            {"match_criteria": {"code": code}, "new_properties": {"code": code, "name": name}}
+            for code, name in SANTANDER_PRODUCT_NAMES.items()
+        ]
+        self._driver.merge_nodes_batch([Label.PRODUCT], products, return_nodes=False)
+
+    def run(self, csv_path: str, skip_rows: int = 0) -> IngestionStats:
+        """
+        Ingest `csv_path` and return what was written.
+        Args:
+            csv_path (str): Raw or renamed Santander CSV file.
+            skip_rows (int): Number of data rows to skip at the start of the file.
+        Returns:
+            IngestionStats: Rows read, chunks written, customers and holdings merged.
+        """
+        self.prepare()
+        self._logger.log_info(
+            "Ingesting %s with %d worker(s), chunks of %d rows",
+            csv_path,
+            self._workers,
+            self._chunk_size,
+        )
+
+        stats = IngestionStats()
+        pending: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            try:
+                for chunk in read_santander_csv(
+                    csv_path, chunk_size=self._chunk_size, skip_rows=skip_rows
+                ):
+                    if len(pending) >= self._workers * 2:
+                        pending = self._collect(pending, stats)
+                    pending.add(executor.submit(self.write_chunk, chunk))
+                while pending:
+                    pending = self._collect(pending, stats)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        self._logger.log_info(
+            "Ingested %d row(s) in %d chunk(s): %d customer update(s), %d holding(s)",
+            stats.rows,
+            stats.chunks,
+            stats.customers,
+            stats.holdings,
+        )
+        return stats
+
+    def _collect(self, pending: Set[Future], stats: IngestionStats) -> Set[Future]:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            stats.add(future.result())
+        return pending
+
+    def write_chunk(self, chunk: pd.DataFrame) -> IngestionStats:
+        """Write the customers of one chunk, then their holdings."""
+        stats = IngestionStats(rows=len(chunk), chunks=1)
+        for batch in chunked(self.customer_updates(chunk), self._batch_size):
+            stats.customers += self._driver.execute_write(merge_customers, batch)
+        for batch in chunked(self.holdings(chunk), self._batch_size):
+            stats.holdings += self._driver.execute_write(merge_holdings, batch)
+        if len(chunk):
+            self._logger.log_info(
+                "Wrote rows %d-%d", chunk.index[0], chunk.index[-1]
+            )
+        return stats
+
+    @staticmethod
+    def customer_updates(chunk: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Build one merge entry per customer in the chunk from its latest row.
+        `snapshot_date` records the month the properties were taken from.
+        """
+        latest = chunk.drop_duplicates("customer_code", keep="last")
+        properties = to_records(latest[SANTANDER_CUSTOMER_COLUMNS])
+        for entry, snapshot_date in zip(properties, latest["date"]):
+            entry["snapshot_date"] = snapshot_date
+        return [
+            {
+                "match_criteria": {"customer_code": entry["customer_code"]},
+                "new_properties": entry,
+            }
+            for entry in properties
+        ]
+
+    @staticmethod
+    def holdings(chunk: pd.DataFrame) -> List[Dict[str, Dict[str, Any]]]:
+        """Build one HOLDS entry per (row, product) whose flag is set."""
+        flags = chunk[SANTANDER_PRODUCT_COLUMNS].to_numpy(dtype=np.float32) == 1
+        return holding_entries(
+            chunk["customer_code"].to_numpy(), flags, chunk["date"].to_numpy()
+        )
+
+
+def holding_entries(
+    customer_codes: np.ndarray, flags: np.ndarray, dates: np.ndarray = None
+) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Build one HOLDS entry per True cell of a (customers x products) flag matrix.
+    Args:
+        customer_codes (np.ndarray): customer_code of every matrix row.
+        flags (np.ndarray): Boolean matrix, columns in SANTANDER_PRODUCT_COLUMNS order.
+        dates (np.ndarray): Month of every matrix row, or None to build entries
+            without relationship properties.
+    """
+    rows, columns = np.nonzero(flags)
+    customer_codes = customer_codes[rows].tolist()
+    entries = [
+        {
+            "start_node_properties": {"customer_code": customer_code},
+            "end_node_properties": {"code": SANTANDER_PRODUCT_COLUMNS[column]},
+        }
+        for customer_code, column in zip(customer_codes, columns)
+    ]
+    if dates is not None:
+        for entry, date in zip(entries, dates[rows]):
+            entry["properties"] = {"date": date}
+    return entries
+
+
+def merge_customers(driver: Neo4jDriver, batch: List[Dict[str, Any]]) -> int:
+    """Merge one batch of Customer entries, never overwriting newer snapshots."""
+    return driver.merge_nodes_batch(
+        [Label.CUSTOMER],
+        batch,
+        version_key="snapshot_date",
+        chunk_size=len(batch),
+        return_nodes=False,
+    )
+
+
+def merge_holdings(driver: Neo4jDriver, batch: List[Dict[str, Any]]) -> int:
+    """Merge one batch of monthly HOLDS entries."""
+    return driver.merge_relationships_batch(
+        [Label.CUSTOMER],
+        [Label.PRODUCT],
+        RelationshipType.HOLDS,
+        batch,
+        keys=["date"],
+        chunk_size=len(batch),
+        return_relationships=False,
+    )
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Load the Santander CSV into Neo4j.")
+    parser.add_argument("csv_path", help="Raw (train_ver2.csv) or renamed CSV file")
+    parser.add_argument("--chunk-size", type=int, default=SANTANDER_CSV_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=NEO4J_DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=SANTANDER_INGESTION_WORKERS)
+    args = parser.parse_args()
+
+    logger = Logger(file_name=LOG_FILE_BASE, non_blocking=True)
+    driver = Neo4jDriver(logger)
+    driver.connect(
+        ConnectionModel(
+            host=os.getenv("NEO4J_HOST"),
+            user=os.getenv("NEO4J_USER"),
+            password=os.getenv("NEO4J_PASSWORD"),
+            # One connection per worker plus one for the reader thread
+            max_connection_pool_size=args.workers + 1,
+        )
+    )
+    try:
+        stats = SantanderIngestion(
+            driver, logger, args.chunk_size, args.batch_size, args.workers
+        ).run(args.csv_path)
+        print(stats)
+    finally:
+        driver.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import atexit
 import os
+import queue
+import sys
 from enum import Enum
-import inspect
 import logging
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
 class LogType(Enum):
@@ -14,17 +20,50 @@ class LogType(Enum):
 
 class Logger:
 
-    def __init__(self, file_name: str, level: LogType = LogType.INFO):
+    def __init__(
+        self,
+        file_name: str,
+        level: LogType = LogType.INFO,
+        non_blocking: bool = False,
+        name: str = None,
+    ):
+        """
+        Args:
+            file_name (str): The name of the log file, without the .log extension.
+            level (LogType): The minimum level that is written.
+            non_blocking (bool): Hand records to a background thread through a
+                queue so that file I/O never happens on the calling thread.
+            name (str): Use a named logger with its own `level`, writing to the
+                handlers of the first Logger, e.g. to keep a chatty component
+                quieter than the rest. None uses the root logger.
+        """
         self._create_log_file_if_not_exists(file_name)
+        self._listener = None
+
+        if non_blocking:
+            file_handler = logging.FileHandler(f"{file_name}.log", encoding="utf-8")
+            file_handler.setFormatter(
+                logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+            )
+            log_queue = queue.SimpleQueue()
+            self._listener = QueueListener(log_queue, file_handler)
+            self._listener.start()
+            atexit.register(self.close)
 
-        logging.basicConfig(
-            filename=f"{file_name}.log",
-            level=level.value,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-            encoding="utf-8",
-        )
-        self._logger = logging.getLogger()
+            root = logging.getLogger()
+            root.setLevel(level.value)
+            root.addHandler(QueueHandler(log_queue))
+        else:
+            logging.basicConfig(
+                filename=f"{file_name}.log",
+                level=level.value,
+                format=LOG_FORMAT,
+                datefmt=LOG_DATE_FORMAT,
+                encoding="utf-8",
+            )
+        self._logger = logging.getLogger(name)
+        if name is not None:
+            self._logger.setLevel(level.value)
 
     def _create_log_file_if_not_exists(self, file_name: str):
         """
@@ -48,30 +87,50 @@ class Logger:
         except Exception as e:
             print(f"Error creating log file: {e}")
 
-    def _get_caller_context(self):
+    def close(self):
+        """Flush and stop the background listener of a non-blocking logger."""
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+
+    def is_enabled(self, level: LogType) -> bool:
+        """Check whether a message of the given level would be written."""
+        return self._logger.isEnabledFor(level.value)
+
+    @staticmethod
+    def _get_caller_context(depth: int = 3):
         """
         Helper method to retrieve the caller's class name and method name.
+        Only the caller's frame is looked up, not the whole stack.
+        Args:
+            depth (int): How many frames above this method the caller is.
         Returns:
             tuple: (class_name, method_name)
         """
-        caller_frame = inspect.stack()[2]  # [2] gets the frame of the caller
-        caller_class = caller_frame.frame.f_locals.get("self", None)
+        caller_frame = sys._getframe(depth)
+        caller_class = caller_frame.f_locals.get("self", None)
         class_name = caller_class.__class__.__name__ if caller_class else "Root"
-        method_name = caller_frame.function
+        method_name = caller_frame.f_code.co_name
         return class_name, method_name
 
-    def log_debug(self, message: str):
+    def _log(self, level: int, message: str, args: tuple):
+        # Nothing is formatted unless the level is enabled; `args` are applied
+        # %-style like the standard logging module.
+        if not self._logger.isEnabledFor(level):
+            return
         class_name, method_name = self._get_caller_context()
-        self._logger.debug(f"{class_name} - {method_name}() - {message}")
+        if args:
+            message = message % args
+        self._logger.log(level, f"{class_name} - {method_name}() - {message}")
 
-    def log_info(self, message: str):
-        class_name, method_name = self._get_caller_context()
-        self._logger.info(f"{class_name} - {method_name}() - {message}")
+    def log_debug(self, message: str, *args):
+        self._log(logging.DEBUG, message, args)
 
-    def log_warning(self, message: str):
-        class_name, method_name = self._get_caller_context()
-        self._logger.warning(f"{class_name} - {method_name}() - {message}")
+    def log_info(self, message: str, *args):
+        self._log(logging.INFO, message, args)
 
-    def log_error(self, message: str):
-        class_name, method_name = self._get_caller_context()
-        self._logger.error(f"{class_name} - {method_name}() - {message}")
+    def log_warning(self, message: str, *args):
+        self._log(logging.WARNING, message, args)
+
+    def log_error(self, message: str, *args):
+        self._log(logging.ERROR, message, args)
@@ -25,38 +25,37 @@ def main():
     )
     my_neo4j_driver.connect(my_connection_model)
 
-    _ = my_neo4j_driver.execute_query(
-        query="MATCH (n) DETACH DELETE n",
-        parameters=None,
-    )
-
-    # Create nodes
-    trung = my_neo4j_driver.create_node(
-        labels=[Label.PERSON], properties={"name": "Trung", "age": 25}
-    )
-    print(f"Created node: {trung}")
-    huong = my_neo4j_driver.create_node(
-        labels=[Label.PERSON], properties={"name": "Huong", "age": 26}
-    )
-    print(f"Created node: {huong}")
-    phuong = my_neo4j_driver.create_node(
-        labels=[Label.PERSON], properties={"name": "Phuong", "age": 26}
-    )
-    print(f"Created node: {phuong}")
-    vo = my_neo4j_driver.create_node(
-        labels=[Label.PERSON], properties={"name": "Vo", "age": 31}
-    )
-    print(f"Created node: {vo}")
-    uyen = my_neo4j_driver.create_node(
-        labels=[Label.PERSON], properties={"name": "Uyen", "age": 28}
-    )
-    print(f"Created node: {uyen}")
-
-    prison_break = my_neo4j_driver.create_node(
-        labels=[Label.MOVIES],
-        properties={"name": "Prison Break", "release_date": date(2005, 8, 29)},
-    )
-    print(f"Created node: {prison_break}")
+    # Start from an empty graph, deleting in batches
+    _ = my_neo4j_driver.delete_nodes(force=True)
+
+    # Create nodes in one session and one transaction
+    with my_neo4j_driver.transaction() as tx:
+        trung = tx.create_node(
+            labels=[Label.PERSON], properties={"name": "Trung", "age": 25}
+        )
+        print(f"Created node: {trung}")
+        huong = tx.create_node(
+            labels=[Label.PERSON], properties={"name": "Huong", "age": 26}
+        )
+        print(f"Created node: {huong}")
+        phuong = tx.create_node(
+            labels=[Label.PERSON], properties={"name": "Phuong", "age": 26}
+        )
+        print(f"Created node: {phuong}")
+        vo = tx.create_node(
+            labels=[Label.PERSON], properties={"name": "Vo", "age": 31}
+        )
+        print(f"Created node: {vo}")
+        uyen = tx.create_node(
+            labels=[Label.PERSON], properties={"name": "Uyen", "age": 28}
+        )
+        print(f"Created node: {uyen}")
+
+        prison_break = tx.create_node(
+            labels=[Label.MOVIES],
+            properties={"name": "Prison Break", "release_date": date(2005, 8, 29)},
+        )
+        print(f"Created node: {prison_break}")
 
     # Get all nodes
     nodes = my_neo4j_driver.get_nodes()
@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Throughput and latency of one driver operation at one scale.
+
+    `seconds` is the wall time of the whole operation, including result
+    casting. `queries` is the number of round trips it made and the
+    latencies are quantiles over those queries, in seconds.
+    """
+
+    operation: str
+    mode: str  # "single", "batch", "read" or "cast"
+    scale: int
+    items: int
+    queries: int
+    seconds: float
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items per second."""
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.operation}[{self.mode}]@{self.scale}"
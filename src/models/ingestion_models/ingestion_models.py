@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class IngestionStats:
+    """
+    Counts of what an ingestion run read from the CSV and wrote to the graph.
+    """
+
+    rows: int = 0
+    chunks: int = 0
+    customers: int = 0
+    holdings: int = 0
+
+    def add(self, other: "IngestionStats") -> None:
+        self.rows += other.rows
+        self.chunks += other.chunks
+        self.customers += other.customers
+        self.holdings += other.holdings
+
+
+@dataclass
+class DeltaCheckpoint:
+    """
+    Progress of the incremental loader.
+
+    `last_month` is the last snapshot that was completely applied. Rows before
+    `row_offset` have been written; `month_offset` is where the month in
+    progress starts, so its snapshot can be rebuilt after an interruption.
+    """
+
+    last_month: str = None
+    month_offset: int = 0
+    row_offset: int = 0
+
+
+@dataclass
+class DeltaStats:
+    """
+    Changes written by the incremental loader for one month.
+    """
+
+    month: str
+    rows: int = 0
+    customers: int = 0
+    added_holdings: int = 0
+    removed_holdings: int = 0
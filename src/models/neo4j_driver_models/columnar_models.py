@@ -0,0 +1,211 @@
+from array import array
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.neo4j_driver_models.database_models import (
+    SlottedNode,
+    SlottedRelationship,
+)
+
+
+class PropertyColumns:
+    """
+    Stores the property maps of many entities as one column per key.
+
+    Values are collected in lists while rows are appended; `compact()` turns
+    every column into a NumPy array (int64, float64, bool or object).
+    Missing properties are stored as None (NaN in float columns).
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, Any] = {}
+        self._size = 0
+        self._compact = True
+
+    def __len__(self) -> int:
+        return self._size
+
+    def keys(self) -> List[str]:
+        return list(self._columns)
+
+    def append(self, properties: Dict[str, Any]) -> None:
+        if self._compact and self._columns:
+            self._columns = {key: list(column) for key, column in self._columns.items()}
+        self._compact = False
+
+        size = self._size
+        for key, value in properties.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = [None] * size
+            column.append(value)
+        self._size = size + 1
+        if len(properties) != len(self._columns):
+            for column in self._columns.values():
+                if len(column) < self._size:
+                    column.append(None)
+
+    def compact(self) -> None:
+        if self._compact:
+            return
+        self._columns = {
+            key: self._to_array(column) for key, column in self._columns.items()
+        }
+        self._compact = True
+
+    @staticmethod
+    def _to_array(values: List[Any]) -> np.ndarray:
+        value_types = {type(value) for value in values}
+        if value_types == {bool}:
+            return np.array(values, dtype=bool)
+        if value_types == {int}:
+            try:
+                return np.array(values, dtype=np.int64)
+            except OverflowError:
+                return np.array(values, dtype=object)
+        if value_types and value_types <= {int, float, type(None)}:
+            return np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
+    def column(self, key: str) -> np.ndarray:
+        self.compact()
+        return self._columns[key]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        properties = {}
+        for key, column in self._columns.items():
+            value = column[index]
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            properties[key] = value.item() if isinstance(value, np.generic) else value
+        return properties
+
+
+class NodeTable:
+    """
+    Columnar container for many nodes.
+
+    Ids are kept in a typed array, label sets are interned and referenced by
+    index, and properties live in PropertyColumns. Indexing or iterating
+    creates SlottedNode row views on demand.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self._label_codes = array("I")
+        self._label_sets: List[Tuple[str, ...]] = []
+        self._label_index: Dict[Tuple[str, ...], int] = {}
+        self.properties = PropertyColumns()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, id: int, labels: List[str], properties: Dict[str, Any]) -> None:
+        label_set = tuple(labels)
+        code = self._label_index.get(label_set)
+        if code is None:
+            code = self._label_index[label_set] = len(self._label_sets)
+            self._label_sets.append(label_set)
+        self.ids.append(id)
+        self._label_codes.append(code)
+        self.properties.append(properties)
+
+    def labels(self, index: int) -> List[str]:
+        return list(self._label_sets[self._label_codes[index]])
+
+    def __getitem__(self, index: int) -> SlottedNode:
+        self.properties.compact()
+        return SlottedNode(
+            id=self.ids[index],
+            labels=self.labels(index),
+            properties=self.properties.row(index),
+        )
+
+    def __iter__(self) -> Iterator[SlottedNode]:
+        return (self[index] for index in range(len(self)))
+
+    def to_dataframe(self):
+        """Build a pandas DataFrame straight from the columns, indexed by node id."""
+        self.properties.compact()
+        label_codes = np.array(self._label_codes, dtype=np.int64)
+        columns = {
+            "labels": pd.Categorical.from_codes(
+                label_codes, [":".join(label_set) for label_set in self._label_sets]
+            ),
+            **{key: self.properties.column(key) for key in self.properties.keys()},
+        }
+        index = pd.Index(np.array(self.ids, dtype=np.int64), name="id")
+        return pd.DataFrame(columns, index=index, copy=False)
+
+
+class RelationshipTable:
+    """
+    Columnar container for many relationships.
+
+    Ids and endpoint ids are kept in typed arrays, types are interned, and
+    properties live in PropertyColumns. Indexing or iterating creates
+    SlottedRelationship row views on demand.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.start_ids = array("q")
+        self.end_ids = array("q")
+        self._type_codes = array("I")
+        self._types: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        self.properties = PropertyColumns()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(
+        self,
+        id: int,
+        start_id: int,
+        end_id: int,
+        type: str,
+        properties: Dict[str, Any],
+    ) -> None:
+        code = self._type_index.get(type)
+        if code is None:
+            code = self._type_index[type] = len(self._types)
+            self._types.append(type)
+        self.ids.append(id)
+        self.start_ids.append(start_id)
+        self.end_ids.append(end_id)
+        self._type_codes.append(code)
+        self.properties.append(properties)
+
+    def __getitem__(self, index: int) -> SlottedRelationship:
+        self.properties.compact()
+        return SlottedRelationship(
+            id=self.ids[index],
+            start_id=self.start_ids[index],
+            end_id=self.end_ids[index],
+            type=self._types[self._type_codes[index]],
+            properties=self.properties.row(index),
+        )
+
+    def __iter__(self) -> Iterator[SlottedRelationship]:
+        return (self[index] for index in range(len(self)))
+
+    def to_dataframe(self):
+        """Build a pandas DataFrame straight from the columns, indexed by relationship id."""
+        self.properties.compact()
+        type_codes = np.array(self._type_codes, dtype=np.int64)
+        columns = {
+            "start_id": np.array(self.start_ids, dtype=np.int64),
+            "end_id": np.array(self.end_ids, dtype=np.int64),
+            "type": pd.Categorical.from_codes(type_codes, self._types),
+            **{key: self.properties.column(key) for key in self.properties.keys()},
+        }
+        index = pd.Index(np.array(self.ids, dtype=np.int64), name="id")
+        return pd.DataFrame(columns, index=index, copy=False)
@@ -6,3 +6,18 @@ class ConnectionModel:
     host: str
     user: str
     password: str
+    database: str = None
+    max_connection_pool_size: int = None
+    connection_acquisition_timeout: float = None
+    max_connection_lifetime: float = None
+    max_transaction_retry_time: float = None
+
+    def driver_config(self) -> dict:
+        """Return the pool and retry settings that were explicitly configured."""
+        config = {
+            "max_connection_pool_size": self.max_connection_pool_size,
+            "connection_acquisition_timeout": self.connection_acquisition_timeout,
+            "max_connection_lifetime": self.max_connection_lifetime,
+            "max_transaction_retry_time": self.max_transaction_retry_time,
+        }
+        return {key: value for key, value in config.items() if value is not None}
@@ -40,3 +40,56 @@ class Relationship:
             f"type={self.type}, "
             f"properties={self.properties})"
         )
+
+
+@dataclass
+class SlottedNode:
+    """
+    Memory-lean variant of Node without a per-instance __dict__.
+    """
+
+    __slots__ = ("id", "labels", "properties")
+
+    id: int
+    labels: List[Label]
+    properties: Dict[str, any]
+
+    def __str__(self):
+        return f"SlottedNode(id = {self.id}, labels={self.labels}, properties={self.properties})"
+
+
+@dataclass
+class SlottedRelationship:
+    """
+    Memory-lean variant of Relationship without a per-instance __dict__.
+    """
+
+    __slots__ = ("id", "start_id", "end_id", "type", "properties")
+
+    id: int
+    start_id: int
+    end_id: int
+    type: str
+    properties: Dict[str, any]
+
+    def __str__(self):
+        return (
+            f"SlottedRelationship(id={self.id}, "
+            f"start_id={self.start_id}, "
+            f"end_id={self.end_id}, "
+            f"type={self.type}, "
+            f"properties={self.properties})"
+        )
+
+
+@dataclass
+class Page:
+    """
+    Represents one page of a keyset-paginated result.
+    """
+
+    items: List[any]
+    next_cursor: any = None
+
+    def __str__(self):
+        return f"Page(items={len(self.items)}, next_cursor={self.next_cursor})"
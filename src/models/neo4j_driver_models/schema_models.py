@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class SchemaDefinition:
+    """
+    Properties of one label or relationship type that are looked up by value.
+    Unique properties get a uniqueness constraint (which is backed by an index),
+    indexed properties get a range index.
+    """
+
+    unique: Tuple[str, ...] = ()
+    indexed: Tuple[str, ...] = ()
+
+
+@dataclass
+class IndexMiss:
+    """
+    A query whose plan scans a whole label or relationship type to filter it.
+    """
+
+    query: str
+    operator: str
+    details: str
+
+    def __str__(self):
+        return f"{self.operator} ({self.details}): {self.query}"
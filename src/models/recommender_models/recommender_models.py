@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+
+@dataclass
+class Recommendation:
+    """
+    A product recommended to a customer, with its score (higher is better).
+    """
+
+    code: str
+    score: float
+
+
+@dataclass
+class TuningResult:
+    """
+    Outcome of a hybrid weight search.
+
+    `results` is a (evaluated, 4) array of f1, f2, f3 and MAP@k, best first.
+    `stopped_early` tells whether the search ended before all `candidates`
+    were evaluated.
+    """
+
+    results: np.ndarray
+    candidates: int
+    stopped_early: bool = False
+
+    @property
+    def evaluated(self) -> int:
+        return len(self.results)
+
+    @property
+    def best_weights(self) -> Tuple[float, float, float]:
+        return tuple(float(w) for w in self.results[0, :3])
+
+    @property
+    def best_score(self) -> float:
+        return float(self.results[0, 3])
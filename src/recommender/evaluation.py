@@ -0,0 +1,121 @@
+from itertools import product
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from recommender.hybrid import top_k
+from recommender.model_based import Holdings, as_dense
+from utils.constants import RECOMMENDER_TOP_K
+
+# Weights tried by the sample notebook's grid search: np.linspace(0.1, 1, 3)
+DEFAULT_WEIGHT_VALUES = (0.1, 0.55, 1.0)
+
+
+def align(codes_before: np.ndarray, codes_after: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the row numbers of the customers present in both snapshots, in
+    the order of `codes_before`.
+    """
+    codes_before, codes_after = np.asarray(codes_before), np.asarray(codes_after)
+    order = np.argsort(codes_after, kind="stable")
+    positions = np.searchsorted(codes_after, codes_before, sorter=order)
+    positions = np.minimum(positions, len(codes_after) - 1)
+    found = codes_after[order[positions]] == codes_before
+    return np.flatnonzero(found), order[positions[found]]
+
+
+def added_products(before: Holdings, after: Holdings) -> np.ndarray:
+    """Return which products each customer added between two aligned snapshots, as in `rec_test()`."""
+    return (as_dense(before) == 0) & (as_dense(after) == 1)
+
+
+def average_precision_at_k(
+    recommended: np.ndarray, actual: np.ndarray, k: int = RECOMMENDER_TOP_K
+) -> np.ndarray:
+    """
+    Return AP@k of every row, like the notebook's `apk()`.
+    Args:
+        recommended (np.ndarray): (..., rows, k) product indexes, best first, -1 padded.
+        actual (np.ndarray): (rows, products) boolean matrix of the products added.
+    """
+    recommended = recommended[..., :k]
+    valid = recommended >= 0
+    rows = np.arange(actual.shape[0])[:, None]
+    hits = actual[rows, np.where(valid, recommended, 0)] & valid
+    cumulative = np.cumsum(hits, axis=-1)
+    precision = np.where(hits, cumulative / np.arange(1, recommended.shape[-1] + 1), 0.0)
+    relevant = np.minimum(actual.sum(axis=1), k)
+    return np.divide(
+        precision.sum(axis=-1), relevant, out=np.zeros(precision.shape[:-1]), where=relevant > 0
+    )
+
+
+def mean_average_precision_at_k(
+    recommended: np.ndarray,
+    actual: np.ndarray,
+    k: int = RECOMMENDER_TOP_K,
+    only_changed: bool = False,
+) -> float:
+    """
+    Return MAP@k over all rows, like `mapk()`. With `only_changed` only
+    customers that added at least one product are counted.
+    """
+    scores = average_precision_at_k(recommended, actual, k)
+    if only_changed:
+        scores = scores[actual.any(axis=1)]
+    return float(scores.mean()) if scores.size else 0.0
+
+
+def weight_grid(values: Sequence[float] = DEFAULT_WEIGHT_VALUES) -> np.ndarray:
+    """Return every (f1, f2, f3) combination of `values` as a (n, 3) array."""
+    return np.array(list(product(values, repeat=3)), dtype=np.float32)
+
+
+def grid_search(
+    popularity: np.ndarray,
+    user_item: np.ndarray,
+    model_based: np.ndarray,
+    owned: Holdings,
+    actual: np.ndarray,
+    weights: np.ndarray = None,
+    k: int = RECOMMENDER_TOP_K,
+    only_changed: bool = False,
+    block_rows: int = 10_000,
+) -> np.ndarray:
+    """
+    Evaluate MAP@k of the hybrid recommender for a whole grid of weights.
+
+    The score matrices are computed once by the caller; every block of
+    customers is combined with all weights at once (a weights x customers x
+    products tensor), owned products are masked and the top-k taken with
+    argpartition.
+    Args:
+        popularity (np.ndarray): (products,) popularity scores.
+        user_item (np.ndarray): (customers, products) user-item scores.
+        model_based (np.ndarray): (customers, products) model-based scores.
+        owned (Holdings): (customers, products) products held before.
+        actual (np.ndarray): (customers, products) products added afterwards.
+        weights (np.ndarray): (n, 3) array of (f1, f2, f3); defaults to weight_grid().
+    Returns:
+        np.ndarray: (n, 4) array of f1, f2, f3 and MAP@k, best first.
+    """
+    weights = weight_grid() if weights is None else np.asarray(weights, dtype=np.float32)
+    owned = as_dense(owned).astype(bool)
+    actual = np.asarray(actual, dtype=bool)
+    rows = np.flatnonzero(actual.any(axis=1)) if only_changed else np.arange(actual.shape[0])
+
+    totals = np.zeros(len(weights))
+    f1, f2, f3 = (weights[:, i, None, None] for i in range(3))
+    for start in range(0, len(rows), block_rows):
+        block = rows[start:start + block_rows]
+        scores = (
+            f1 * popularity[None, None, :]
+            + f2 * user_item[block][None]
+            + f3 * model_based[block][None]
+        )
+        scores[:, owned[block]] = -np.inf
+        recommended = top_k(scores, k=k)
+        totals += average_precision_at_k(recommended, actual[block], k).sum(axis=1)
+
+    results = np.column_stack([weights, totals / max(len(rows), 1)])
+    return results[np.argsort(-results[:, 3], kind="stable")]
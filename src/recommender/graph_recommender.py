@@ -0,0 +1,106 @@
+from datetime import date
+from typing import Any, Dict, List
+
+from database_driver import query_builder
+from database_driver.neo4j_driver import Neo4jDriver
+from logger.logger import Logger
+from models.recommender_models.recommender_models import Recommendation
+from utils.constants import NEO4J_DEFAULT_BATCH_SIZE, RECOMMENDER_TOP_K
+from utils.utils import chunked
+
+
+class GraphRecommender:
+    """
+    Online "customers who hold what you hold also hold X" recommendations,
+    scored inside Neo4j.
+
+    Scores are weighted co-occurrences read from the co-ownership counts that
+    ProductStatisticsJob materializes on the Product nodes (see
+    query_builder.RECOMMENDATION_WEIGHTS). A lookup is one parameterized
+    query that seeks the customer through the customer_code constraint, so
+    no matrix is built on the client.
+
+    The first lookup checks that the statistics are materialized, and with
+    `month`, that they were computed for that month.
+    """
+
+    def __init__(
+        self,
+        driver: Neo4jDriver,
+        logger: Logger,
+        k: int = RECOMMENDER_TOP_K,
+        weighting: str = "confidence",
+        month: Any = None,
+    ):
+        """
+        Args:
+            k (int): Number of products to recommend.
+            weighting (str): "confidence" or "count".
+            month: Only use HOLDS relationships of this month (a date or ISO
+                string), for graphs loaded with one relationship per month.
+                The materialized statistics must be of the same month.
+        """
+        if weighting not in query_builder.RECOMMENDATION_WEIGHTS:
+            logger.log_error("Unknown weighting: %s", weighting)
+            raise ValueError(f"Unknown weighting: {weighting}")
+        self._driver = driver
+        self._logger = logger
+        self.k = k
+        self.weighting = weighting
+        self.month = date.fromisoformat(month) if isinstance(month, str) else month
+        self._checked = False
+
+    def _check_statistics(self) -> None:
+        if self._checked:
+            return
+        months = [
+            row["month"]
+            for row in self._driver.execute_query(query_builder.MATERIALIZED_STATISTICS_MONTHS)
+        ]
+        if not months:
+            self._logger.log_error(
+                "Product statistics are not materialized. Run ProductStatisticsJob first."
+            )
+            raise RuntimeError(
+                "Product statistics are not materialized. Run ProductStatisticsJob first."
+            )
+        if self.month is not None and months != [self.month.isoformat()]:
+            self._logger.log_error(
+                "Product statistics are materialized for %s, not %s.", months, self.month
+            )
+            raise ValueError(
+                f"Product statistics are materialized for {months}, not {self.month}."
+            )
+        self._checked = True
+
+    def recommend(self, customer_code: Any, k: int = None) -> List[Recommendation]:
+        """Return the best products for `customer_code`, or [] if it is unknown."""
+        self._check_statistics()
+        query, parameters = query_builder.recommend_products(
+            customer_code, k or self.k, self.weighting, self.month
+        )
+        result = self._driver.execute_query(query, parameters)
+        return [Recommendation(row["code"], row["score"]) for row in result]
+
+    def recommend_batch(
+        self,
+        customer_codes: List[Any],
+        k: int = None,
+        chunk_size: int = NEO4J_DEFAULT_BATCH_SIZE,
+    ) -> Dict[Any, List[Recommendation]]:
+        """
+        Return the recommendations of many customers, one UNWIND query per
+        chunk. Unknown customer codes are left out of the result.
+        """
+        self._check_statistics()
+        recommendations = {}
+        for chunk in chunked(customer_codes, chunk_size):
+            query, parameters = query_builder.recommend_products_batch(
+                chunk, k or self.k, self.weighting, self.month
+            )
+            for row in self._driver.execute_query(query, parameters):
+                recommendations[row["customer_code"]] = [
+                    Recommendation(entry["code"], entry["score"])
+                    for entry in row["recommendations"]
+                ]
+        return recommendations
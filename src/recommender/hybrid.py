@@ -0,0 +1,87 @@
+from typing import List, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from recommender.model_based import Holdings, as_dense
+from recommender.similarity import KNNIndex
+from utils.constants import RECOMMENDER_MIN_SIMILARITY, RECOMMENDER_TOP_K
+
+
+def popularity_scores(holdings: Holdings) -> np.ndarray:
+    """Return the share of customers holding each product, as in `popularity_based()`."""
+    if sparse.issparse(holdings):
+        counts = np.asarray((holdings > 0).sum(axis=0)).ravel()
+    else:
+        counts = (np.asarray(holdings) > 0).sum(axis=0)
+    return (counts / max(holdings.shape[0], 1)).astype(np.float32)
+
+
+def user_item_scores(
+    holdings: Holdings,
+    knn: KNNIndex,
+    min_similarity: float = RECOMMENDER_MIN_SIMILARITY,
+) -> np.ndarray:
+    """
+    Return the customers x products matrix of the share of each customer's
+    neighbours holding each product, as in `useritem()`.
+
+    Row i of `holdings` must belong to row i of `knn`. Neighbours less similar
+    than `min_similarity` are ignored; customers without any get zeros.
+    """
+    rows, k = knn.neighbors.shape
+    if holdings.shape[0] != rows:
+        raise ValueError("holdings and knn must have the same customers in the same order.")
+
+    neighbors = np.asarray(knn.neighbors)
+    valid = (neighbors >= 0) & (np.asarray(knn.scores) >= min_similarity)
+    counts = valid.sum(axis=1)
+    weights = np.divide(1.0, counts, out=np.zeros(rows), where=counts > 0)
+
+    # Averaging the neighbours' rows is one sparse product: W[i, j] = 1/count_i
+    # for every neighbour j of customer i.
+    row_index = np.repeat(np.arange(rows), k)[valid.ravel()]
+    averaging = sparse.csr_matrix(
+        (weights[row_index], (row_index, neighbors[valid])), shape=(rows, rows)
+    )
+    return np.asarray(averaging @ as_dense(holdings).astype(np.float32), dtype=np.float32)
+
+
+def combine(
+    popularity: np.ndarray,
+    user_item: np.ndarray,
+    model_based: np.ndarray,
+    weights: Sequence[float],
+) -> np.ndarray:
+    """Return f1 * popularity + f2 * user_item + f3 * model_based, as in `hybrid()`."""
+    f1, f2, f3 = weights
+    return f1 * popularity[None, :] + f2 * user_item + f3 * model_based
+
+
+def top_k(scores: np.ndarray, owned: Holdings = None, k: int = RECOMMENDER_TOP_K) -> np.ndarray:
+    """
+    Return the column indexes of the `k` best products of every row, best
+    first, skipping products that are already `owned`; -1 pads rows with
+    fewer than `k` candidates.
+    """
+    scores = np.array(scores, dtype=np.float32)
+    if owned is not None:
+        scores[as_dense(owned).astype(bool)] = -np.inf
+    k = min(k, scores.shape[-1])
+    best = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    best_scores = np.take_along_axis(scores, best, axis=-1)
+    order = np.argsort(-best_scores, axis=-1, kind="stable")
+    best = np.take_along_axis(best, order, axis=-1)
+    best[np.take_along_axis(best_scores, order, axis=-1) == -np.inf] = -1
+    return best
+
+
+def recommend(
+    scores: np.ndarray,
+    products: List[str],
+    owned: Holdings = None,
+    k: int = RECOMMENDER_TOP_K,
+) -> List[List[str]]:
+    """Return the product codes of `top_k` for every row, as in `recommendation()`."""
+    codes = np.asarray(products, dtype=object)
+    return [codes[row[row >= 0]].tolist() for row in top_k(scores, owned, k)]
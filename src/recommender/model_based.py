@@ -0,0 +1,137 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union
+
+import numpy as np
+from scipy import sparse
+from sklearn.tree import DecisionTreeClassifier
+
+from utils.constants import (
+    RECOMMENDER_MODEL_MAX_DEPTH,
+    RECOMMENDER_SCORE_BATCH_ROWS,
+)
+
+Holdings = Union[np.ndarray, sparse.spmatrix]
+
+# Training matrix of a worker process, set once by the pool initializer so it
+# is not pickled again for every product.
+_worker_holdings: np.ndarray = None
+
+
+def _init_worker(holdings: np.ndarray) -> None:
+    global _worker_holdings
+    _worker_holdings = holdings
+
+
+def _fit_product(column: int, max_depth: int, random_state: int) -> DecisionTreeClassifier:
+    target = _worker_holdings[:, column]
+    features = np.delete(_worker_holdings, column, axis=1)
+    model = DecisionTreeClassifier(max_depth=max_depth, random_state=random_state)
+    return model.fit(features, target)
+
+
+def as_dense(holdings: Holdings) -> np.ndarray:
+    """Return a customers x products 0/1 matrix as a dense uint8 array."""
+    if sparse.issparse(holdings):
+        holdings = holdings.toarray()
+    return (np.asarray(holdings) > 0).astype(np.uint8)
+
+
+class ModelBasedRecommender:
+    """
+    One decision tree per product that predicts whether a customer holds it
+    from the customer's other products, as in the sample notebook's
+    `modelbased()`.
+
+    The trees are fitted once, in parallel across products in a process pool,
+    and can be saved and loaded. `predict_proba` scores every customer for
+    every product in one vectorized pass.
+    """
+
+    def __init__(
+        self,
+        max_depth: int = RECOMMENDER_MODEL_MAX_DEPTH,
+        workers: int = None,
+        random_state: int = 0,
+    ):
+        self.max_depth = max_depth
+        self.workers = workers
+        self.random_state = random_state
+        self.products: List[str] = []
+        self.models: List[DecisionTreeClassifier] = []
+
+    def fit(self, holdings: Holdings, products: List[str]) -> "ModelBasedRecommender":
+        """
+        Fit one model per product.
+        Args:
+            holdings (Holdings): customers x products 0/1 matrix, dense or sparse.
+            products (List[str]): Product code of every column.
+        """
+        holdings = as_dense(holdings)
+        if holdings.shape[1] != len(products):
+            raise ValueError("holdings must have one column per product.")
+
+        workers = min(self.workers or os.cpu_count() or 1, len(products))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(holdings,)
+        ) as executor:
+            self.models = list(
+                executor.map(
+                    _fit_product,
+                    range(len(products)),
+                    [self.max_depth] * len(products),
+                    [self.random_state] * len(products),
+                )
+            )
+        self.products = list(products)
+        return self
+
+    def predict_proba(
+        self, holdings: Holdings, batch_rows: int = RECOMMENDER_SCORE_BATCH_ROWS
+    ) -> np.ndarray:
+        """
+        Return the customers x products matrix of holding probabilities.
+        Customers are scored `batch_rows` at a time to bound memory.
+        """
+        if not self.models:
+            raise RuntimeError("The recommender must be fitted or loaded first.")
+        holdings = as_dense(holdings)
+        if holdings.shape[1] != len(self.products):
+            raise ValueError("holdings must have one column per product.")
+
+        scores = np.zeros(holdings.shape, dtype=np.float32)
+        for start in range(0, holdings.shape[0], batch_rows):
+            batch = holdings[start:start + batch_rows]
+            for column, model in enumerate(self.models):
+                features = np.delete(batch, column, axis=1)
+                positive = np.flatnonzero(model.classes_ == 1)
+                if len(positive):
+                    scores[start:start + len(batch), column] = model.predict_proba(
+                        features
+                    )[:, positive[0]]
+        return scores
+
+    def save(self, file_path: str) -> None:
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, "wb") as file:
+            pickle.dump(
+                {
+                    "max_depth": self.max_depth,
+                    "random_state": self.random_state,
+                    "products": self.products,
+                    "models": self.models,
+                },
+                file,
+            )
+
+    @classmethod
+    def load(cls, file_path: str) -> "ModelBasedRecommender":
+        with open(file_path, "rb") as file:
+            state = pickle.load(file)
+        recommender = cls(max_depth=state["max_depth"], random_state=state["random_state"])
+        recommender.products = state["products"]
+        recommender.models = state["models"]
+        return recommender
@@ -0,0 +1,307 @@
+import json
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from database_driver import query_builder
+from database_driver.neo4j_driver import Neo4jDriver
+from database_driver.query_cache import QueryCache
+from logger.logger import Logger
+from models.recommender_models.recommender_models import Recommendation
+from recommender.hybrid import top_k
+from recommender.model_based import Holdings, as_dense
+from utils.constants import (
+    NEO4J_DEFAULT_BATCH_SIZE,
+    RECOMMENDER_SCORE_BATCH_ROWS,
+    RECOMMENDER_SERVING_CACHE_SIZE,
+    RECOMMENDER_SERVING_TTL,
+    RECOMMENDER_TOP_K,
+)
+from utils.utils import chunked
+
+
+def top_n(
+    scores: np.ndarray,
+    owned: Holdings = None,
+    n: int = RECOMMENDER_TOP_K,
+    batch_rows: int = RECOMMENDER_SCORE_BATCH_ROWS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the product indexes (-1 padded) and scores (NaN padded) of the
+    `n` best products of every row, skipping owned products.
+    """
+    rows = scores.shape[0]
+    n = min(n, scores.shape[1])
+    items = np.empty((rows, n), dtype=np.int8)
+    item_scores = np.empty((rows, n), dtype=np.float32)
+    owned = as_dense(owned) if owned is not None else None
+    for start in range(0, rows, batch_rows):
+        block = slice(start, start + batch_rows)
+        best = top_k(scores[block], owned[block] if owned is not None else None, n)
+        items[block] = best
+        taken = np.take_along_axis(np.asarray(scores[block], dtype=np.float32), np.maximum(best, 0), axis=1)
+        item_scores[block] = np.where(best >= 0, taken, np.nan)
+    return items, item_scores
+
+
+def _as_recommendations(
+    products: Sequence[str], items: np.ndarray, scores: np.ndarray
+) -> List[Recommendation]:
+    return [
+        Recommendation(products[item], float(score))
+        for item, score in zip(items.tolist(), scores.tolist())
+        if item >= 0
+    ]
+
+
+class RecommendationStore(ABC):
+    """Where precomputed top-N recommendations are kept."""
+
+    @abstractmethod
+    def write(
+        self,
+        customer_codes: np.ndarray,
+        items: np.ndarray,
+        scores: np.ndarray,
+        products: List[str],
+    ) -> int:
+        """Replace the recommendations of `customer_codes`; return how many were written."""
+
+    @abstractmethod
+    def get(self, customer_code: int) -> List[Recommendation]:
+        """Return the recommendations of a customer, or None if there is no valid entry."""
+
+    @abstractmethod
+    def invalidate(self, customer_codes: Iterable[int]) -> int:
+        """Drop the entries of `customer_codes`; return how many existed."""
+
+
+class FileRecommendationStore(RecommendationStore):
+    """
+    Recommendations as memory-mapped .npy files: sorted customer codes,
+    an int8 product index matrix and a float32 score matrix, so a lookup is
+    a binary search plus one row read.
+
+    Invalidated customers are flagged in `stale.npy`, which is mapped
+    read-write, so flags set by another process (e.g. the delta loader) are
+    seen by readers of the same directory straight away.
+
+    Every publish writes a new version subdirectory, then atomically
+    replaces the `CURRENT` file naming it and removes the older versions;
+    one publisher runs at a time. Readers compare the inode and mtime of
+    `CURRENT` on every lookup and remap the files when they changed.
+    """
+
+    FILES = ("customer_codes", "items", "scores", "stale")
+    POINTER = "CURRENT"
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._arrays: Dict[str, np.ndarray] = None
+        self._products: List[str] = None
+        self._version: Tuple[int, int] = None
+
+    def _open(self) -> bool:
+        pointer = os.path.join(self._directory, self.POINTER)
+        try:
+            stat = os.stat(pointer)
+            version = (stat.st_ino, stat.st_mtime_ns)
+            if self._arrays is None or version != self._version:
+                with open(pointer, "r", encoding="utf-8") as file:
+                    current = os.path.join(self._directory, file.read().strip())
+                with open(os.path.join(current, "products.json"), "r", encoding="utf-8") as file:
+                    products = json.load(file)
+                self._arrays = {
+                    name: np.load(
+                        os.path.join(current, f"{name}.npy"),
+                        mmap_mode="r+" if name == "stale" else "r",
+                    )
+                    for name in self.FILES
+                }
+                self._products = products
+                self._version = version
+        except FileNotFoundError:
+            # Nothing published yet, or the version was superseded and removed
+            # while it was being opened; the next lookup maps the new one.
+            self._arrays = None
+            return False
+        return True
+
+    def write(self, customer_codes, items, scores, products) -> int:
+        order = np.argsort(customer_codes, kind="stable")
+        version = f"v{time.time_ns()}"
+        staging = os.path.join(self._directory, version)
+        os.makedirs(staging)
+        arrays = {
+            "customer_codes": np.asarray(customer_codes, dtype=np.int64)[order],
+            "items": np.asarray(items, dtype=np.int8)[order],
+            "scores": np.asarray(scores, dtype=np.float32)[order],
+            "stale": np.zeros(len(order), dtype=bool),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), array)
+        with open(os.path.join(staging, "products.json"), "w", encoding="utf-8") as file:
+            json.dump(list(products), file)
+
+        pointer = os.path.join(self._directory, self.POINTER)
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as file:
+            file.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+        self._arrays = None
+        # Readers that still map an old version keep their open files.
+        for entry in os.scandir(self._directory):
+            if entry.is_dir() and entry.name != version:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        return len(order)
+
+    def _positions(self, customer_codes: np.ndarray) -> np.ndarray:
+        codes = self._arrays["customer_codes"]
+        if not len(codes):
+            return np.empty(0, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(codes, customer_codes), len(codes) - 1)
+        return positions[codes[positions] == customer_codes]
+
+    def get(self, customer_code: int) -> List[Recommendation]:
+        if not self._open():
+            return None
+        positions = self._positions(np.array([customer_code], dtype=np.int64))
+        if not len(positions) or self._arrays["stale"][positions[0]]:
+            return None
+        row = positions[0]
+        return _as_recommendations(
+            self._products, self._arrays["items"][row], self._arrays["scores"][row]
+        )
+
+    def invalidate(self, customer_codes: Iterable[int]) -> int:
+        if not self._open():
+            return 0
+        positions = self._positions(np.fromiter(customer_codes, dtype=np.int64))
+        stale = self._arrays["stale"]
+        count = int((~stale[positions]).sum())
+        stale[positions] = True
+        stale.flush()
+        return count
+
+
+class GraphRecommendationStore(RecommendationStore):
+    """
+    Recommendations as RECOMMENDED relationships from each Customer to its
+    top products, with `rank` and `score` properties.
+    """
+
+    def __init__(
+        self, driver: Neo4jDriver, logger: Logger, batch_size: int = NEO4J_DEFAULT_BATCH_SIZE
+    ):
+        self._driver = driver
+        self._logger = logger
+        self._batch_size = batch_size
+
+    @staticmethod
+    def _write_batch(driver: Neo4jDriver, rows: List[Dict]) -> int:
+        result = driver.execute_query(query_builder.write_recommendations_batch(), {"rows": rows})
+        return result[0]["count"] if result else 0
+
+    def write(self, customer_codes, items, scores, products) -> int:
+        rows = (
+            {
+                "customer_code": int(code),
+                "recommendations": [
+                    {"code": r.code, "rank": rank, "score": r.score}
+                    for rank, r in enumerate(_as_recommendations(products, row_items, row_scores))
+                ],
+            }
+            for code, row_items, row_scores in zip(customer_codes, items, scores)
+        )
+        written = 0
+        for batch in chunked(rows, self._batch_size):
+            # The old relationships are deleted and the new ones created in
+            # one transaction, so readers never see a customer without any.
+            written += self._driver.execute_write(self._write_batch, batch)
+        self._logger.log_info("Wrote %d RECOMMENDED relationship(s)", written)
+        return written
+
+    def get(self, customer_code: int) -> List[Recommendation]:
+        result = self._driver.execute_query(*query_builder.get_recommendations(customer_code))
+        return [Recommendation(row["code"], row["score"]) for row in result] or None
+
+    def invalidate(self, customer_codes: Iterable[int]) -> int:
+        deleted = 0
+        for batch in chunked((int(code) for code in customer_codes), self._batch_size):
+            result = self._driver.execute_query(*query_builder.delete_recommendations(batch))
+            deleted += result[0]["deleted_count"] if result else 0
+        return deleted
+
+
+def publish(
+    store: RecommendationStore,
+    customer_codes: np.ndarray,
+    scores: np.ndarray,
+    products: List[str],
+    owned: Holdings = None,
+    n: int = RECOMMENDER_TOP_K,
+) -> int:
+    """
+    Batch job: write the top `n` products of every customer to `store`.
+    Args:
+        scores (np.ndarray): (customers, products) scores, e.g. hybrid.combine().
+        owned (Holdings): Products the customers hold, never recommended.
+    """
+    items, item_scores = top_n(scores, owned, n)
+    return store.write(np.asarray(customer_codes), items, item_scores, products)
+
+
+class RecommendationService:
+    """
+    Online lookups of precomputed recommendations.
+
+    Answers come from an in-process LRU (a QueryCache keyed on the customer
+    code) in front of the store. Entries expire after `ttl` seconds, which
+    bounds how long a change made by another process can go unnoticed;
+    `invalidate` drops them at once, from both the LRU and the store.
+    Customers without a valid entry get `fallback(customer_code)`, or [].
+    """
+
+    def __init__(
+        self,
+        store: RecommendationStore,
+        logger: Logger,
+        cache_size: int = RECOMMENDER_SERVING_CACHE_SIZE,
+        ttl: float = RECOMMENDER_SERVING_TTL,
+        fallback: Callable[[int], List[Recommendation]] = None,
+    ):
+        self._store = store
+        self._logger = logger
+        self._cache = QueryCache(
+            max_entries=cache_size, max_records=cache_size * RECOMMENDER_TOP_K * 4, ttl=ttl
+        )
+        self._fallback = fallback
+
+    @staticmethod
+    def _tag(customer_code: int) -> str:
+        return f"customer:{customer_code}"
+
+    def recommend(self, customer_code: int) -> List[Recommendation]:
+        customer_code = int(customer_code)
+        hit, recommendations = self._cache.get(customer_code)
+        if hit:
+            return recommendations
+        recommendations = self._store.get(customer_code)
+        if recommendations is None:
+            return self._fallback(customer_code) if self._fallback else []
+        self._cache.put(customer_code, recommendations, [self._tag(customer_code)])
+        return recommendations
+
+    def invalidate(self, customer_codes: Iterable[int]) -> int:
+        """Forget the recommendations of customers whose holdings changed."""
+        customer_codes = [int(code) for code in customer_codes]
+        self._cache.invalidate([self._tag(code) for code in customer_codes])
+        invalidated = self._store.invalidate(customer_codes)
+        self._logger.log_info("Invalidated recommendations of %d customer(s)", invalidated)
+        return invalidated
+
+    def stats(self):
+        return self._cache.stats()
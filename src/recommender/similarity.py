@@ -0,0 +1,274 @@
+import os
+from typing import Tuple
+
+import numpy as np
+from scipy import sparse
+
+from utils.constants import (
+    RECOMMENDER_DEFAULT_NEIGHBORS,
+    RECOMMENDER_LSH_BANDS,
+    RECOMMENDER_LSH_ROWS_PER_BAND,
+    RECOMMENDER_SIMILARITY_BLOCK_BYTES,
+)
+
+
+class KNNIndex:
+    """
+    The k nearest neighbours of every customer.
+
+    Row i belongs to `customer_codes[i]`; `neighbors[i]` holds the row
+    numbers of its neighbours, most similar first, padded with -1, and
+    `scores[i]` their cosine similarities. Customer codes are mapped to rows
+    through a direct-address table, so a lookup is O(1).
+    """
+
+    FILES = ("customer_codes", "neighbors", "scores")
+
+    def __init__(self, customer_codes: np.ndarray, neighbors: np.ndarray, scores: np.ndarray):
+        self.customer_codes = customer_codes
+        self.neighbors = neighbors
+        self.scores = scores
+        self._positions, self._position_map = self._build_positions(customer_codes)
+
+    def __len__(self) -> int:
+        return len(self.customer_codes)
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    @staticmethod
+    def _build_positions(customer_codes: np.ndarray):
+        # Customer codes are dense non-negative integers, so a table indexed by
+        # code costs a few bytes per customer; anything else falls back to a dict.
+        codes = np.asarray(customer_codes)
+        if len(codes) and np.issubdtype(codes.dtype, np.integer) and codes.min() >= 0:
+            size = int(codes.max()) + 1
+            if size <= 8 * len(codes) + 1024:
+                positions = np.full(size, -1, dtype=np.int64)
+                positions[codes] = np.arange(len(codes))
+                return positions, None
+        return None, {code: row for row, code in enumerate(codes.tolist())}
+
+    def position(self, customer_code: int) -> int:
+        """Return the row of `customer_code`, or -1 if it is unknown."""
+        if self._positions is not None:
+            if 0 <= customer_code < len(self._positions):
+                return int(self._positions[customer_code])
+            return -1
+        return self._position_map.get(customer_code, -1)
+
+    def lookup(self, customer_code: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the customer codes and similarities of the neighbours of
+        `customer_code`, most similar first.
+        """
+        row = self.position(customer_code)
+        if row < 0:
+            raise KeyError(f"Unknown customer_code: {customer_code}")
+        neighbors = self.neighbors[row]
+        found = neighbors >= 0
+        return self.customer_codes[neighbors[found]], self.scores[row][found]
+
+    def save(self, directory: str) -> None:
+        """Save as .npy files that `load` can memory-map."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "KNNIndex":
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in cls.FILES
+        }
+        return cls(**arrays)
+
+
+class SimilarityEngine:
+    """
+    Top-k user-user cosine similarity on sparse holding vectors.
+
+    Customers with identical vectors share one "pattern"; with 24 binary
+    products there are far fewer patterns than customers. Similarities are
+    computed between patterns, in blocks of at most `block_bytes`, and each
+    customer's neighbours are expanded from the most similar patterns. Memory
+    grows linearly with the number of customers (plus one block).
+
+    With `lsh=True` patterns are only compared with those sharing a random
+    hyperplane (SimHash) bucket in at least one band, which gives approximate
+    neighbours when there are too many distinct patterns to compare exactly.
+    """
+
+    def __init__(
+        self,
+        k: int = RECOMMENDER_DEFAULT_NEIGHBORS,
+        block_bytes: int = RECOMMENDER_SIMILARITY_BLOCK_BYTES,
+        lsh: bool = False,
+        bands: int = RECOMMENDER_LSH_BANDS,
+        rows_per_band: int = RECOMMENDER_LSH_ROWS_PER_BAND,
+        seed: int = 0,
+    ):
+        if k <= 0:
+            raise ValueError("k must be a positive integer.")
+        if rows_per_band > 62:
+            raise ValueError("rows_per_band must be at most 62.")
+        self.k = k
+        self.block_bytes = block_bytes
+        self.lsh = lsh
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+        self.seed = seed
+
+    def fit(self, matrix: sparse.spmatrix, customer_codes: np.ndarray) -> KNNIndex:
+        """
+        Build the k-NN index of the rows of `matrix`.
+        Args:
+            matrix (sparse.spmatrix): customers x products matrix, e.g.
+                GraphSnapshot.bipartite(Label.CUSTOMER, Label.PRODUCT).
+            customer_codes (np.ndarray): customer_code of every row.
+        Returns:
+            KNNIndex: Neighbours of every row. Customers without any holding
+            have no neighbours.
+        """
+        matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        if matrix.shape[0] != len(customer_codes):
+            raise ValueError("matrix must have one row per customer_code.")
+
+        pattern_of, first_rows, counts = self._unique_rows(matrix)
+        empty = matrix[first_rows].getnnz(axis=1) == 0
+        patterns = self._normalize(matrix[first_rows])
+
+        candidates = min(len(first_rows), self.k + 1)
+        if self.lsh:
+            top, top_scores = self._top_patterns_lsh(patterns, empty, candidates)
+        else:
+            top, top_scores = self._top_patterns_exact(patterns, empty, candidates)
+
+        neighbors, scores = self._expand(pattern_of, counts, empty, top, top_scores)
+        return KNNIndex(np.asarray(customer_codes), neighbors, scores)
+
+    @staticmethod
+    def _unique_rows(matrix: sparse.csr_matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Two random projections identify a row; equal rows always get equal
+        # keys and a collision of different rows is practically impossible.
+        projections = np.random.default_rng(0).random((matrix.shape[1], 2))
+        keys = matrix @ projections
+        _, first_rows, pattern_of, counts = np.unique(
+            keys, axis=0, return_index=True, return_inverse=True, return_counts=True
+        )
+        return pattern_of.ravel(), first_rows, counts
+
+    @staticmethod
+    def _normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        return sparse.csr_matrix(sparse.diags(inverse.astype(np.float32)) @ matrix)
+
+    @staticmethod
+    def _select(similarities: np.ndarray, candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the `candidates` largest entries of every row, sorted."""
+        top = np.argpartition(-similarities, candidates - 1, axis=1)[:, :candidates]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def _top_patterns_exact(
+        self, patterns: sparse.csr_matrix, empty: np.ndarray, candidates: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        count = patterns.shape[0]
+        block = max(1, self.block_bytes // (4 * count))
+        # With few products the patterns fit in a dense matrix and the block
+        # products run through BLAS instead of sparse matrix multiplication.
+        dense = patterns.shape[1] * count * 4 <= self.block_bytes
+        transposed = patterns.T.toarray() if dense else patterns.T.tocsc()
+        top = np.empty((count, candidates), dtype=np.int64)
+        top_scores = np.empty((count, candidates), dtype=np.float32)
+        for start in range(0, count, block):
+            stop = min(start + block, count)
+            if dense:
+                similarities = patterns[start:stop].toarray() @ transposed
+            else:
+                similarities = (patterns[start:stop] @ transposed).toarray()
+            similarities[:, empty] = -np.inf
+            top[start:stop], top_scores[start:stop] = self._select(similarities, candidates)
+        return top, top_scores
+
+    def _top_patterns_lsh(
+        self, patterns: sparse.csr_matrix, empty: np.ndarray, candidates: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        count = patterns.shape[0]
+        rng = np.random.default_rng(self.seed)
+        planes = rng.standard_normal((patterns.shape[1], self.bands * self.rows_per_band))
+        bits = np.asarray(patterns @ planes) > 0
+        weights = 1 << np.arange(self.rows_per_band, dtype=np.int64)
+
+        buckets = []
+        for band in range(self.bands):
+            columns = slice(band * self.rows_per_band, (band + 1) * self.rows_per_band)
+            keys = bits[:, columns].astype(np.int64) @ weights
+            keys[empty] = -1
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            left = np.searchsorted(sorted_keys, keys, "left")
+            right = np.searchsorted(sorted_keys, keys, "right")
+            buckets.append((order, left, right))
+
+        top = np.full((count, candidates), -1, dtype=np.int64)
+        top_scores = np.full((count, candidates), -np.inf, dtype=np.float32)
+        for pattern in np.flatnonzero(~empty):
+            members = np.unique(
+                np.concatenate(
+                    [order[left[pattern]:right[pattern]] for order, left, right in buckets]
+                )
+            )
+            similarities = (patterns[members] @ patterns[pattern].T).toarray().ravel()
+            found = min(candidates, len(members))
+            selected, selected_scores = self._select(similarities[None, :], found)
+            top[pattern, :found] = members[selected[0]]
+            top_scores[pattern, :found] = selected_scores[0]
+        return top, top_scores
+
+    def _expand(
+        self,
+        pattern_of: np.ndarray,
+        counts: np.ndarray,
+        empty: np.ndarray,
+        top: np.ndarray,
+        top_scores: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Turn each pattern's most similar patterns into per-customer neighbours."""
+        k = self.k
+        rows = len(pattern_of)
+        members = np.argsort(pattern_of, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)])
+        neighbors = np.full((rows, k), -1, dtype=np.int32 if rows < 2**31 else np.int64)
+        scores = np.zeros((rows, k), dtype=np.float32)
+
+        for pattern in np.flatnonzero(~empty):
+            # k + 1 candidates, so every customer still has k after removing itself
+            candidates, candidate_scores, needed = [], [], k + 1
+            for other, score in zip(top[pattern], top_scores[pattern]):
+                if other < 0 or not np.isfinite(score) or needed == 0:
+                    break
+                taken = members[starts[other]:starts[other] + min(needed, counts[other])]
+                candidates.append(taken)
+                candidate_scores.append(np.full(len(taken), score, dtype=np.float32))
+                needed -= len(taken)
+            candidates = np.concatenate(candidates)
+            candidate_scores = np.concatenate(candidate_scores)
+
+            own = members[starts[pattern]:starts[pattern + 1]]
+            length = min(k, len(candidates))
+            neighbors[own, :length] = candidates[:length]
+            scores[own, :length] = candidate_scores[:length]
+            for position in np.flatnonzero(pattern_of[candidates] == pattern):
+                row = candidates[position]
+                others = np.delete(candidates, position)[:k]
+                neighbors[row, :] = -1
+                scores[row, :] = 0
+                neighbors[row, :len(others)] = others
+                scores[row, :len(others)] = np.delete(candidate_scores, position)[:k]
+        return neighbors, scores
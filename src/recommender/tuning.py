@@ -0,0 +1,194 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from logger.logger import Logger
+from models.recommender_models.recommender_models import TuningResult
+from recommender.evaluation import DEFAULT_WEIGHT_VALUES, grid_search, weight_grid
+from recommender.model_based import Holdings, as_dense
+from utils.constants import (
+    RECOMMENDER_TOP_K,
+    RECOMMENDER_TUNING_BATCH,
+    RECOMMENDER_TUNING_BLOCK_ROWS,
+)
+
+# Score matrices of a worker process, attached once by the pool initializer.
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_memory: List[shared_memory.SharedMemory] = []
+
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+
+def _init_worker(specs: Dict[str, ArraySpec]) -> None:
+    for name, (memory_name, shape, dtype) in specs.items():
+        memory = shared_memory.SharedMemory(name=memory_name)
+        _worker_memory.append(memory)
+        _worker_arrays[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _evaluate(weights: np.ndarray, k: int, block_rows: int) -> np.ndarray:
+    a = _worker_arrays
+    return grid_search(
+        a["popularity"], a["user_item"], a["model_based"], a["owned"], a["actual"],
+        weights, k, block_rows=block_rows,
+    )
+
+
+def random_weights(
+    count: int, low: float = 0.1, high: float = 1.0, seed: int = 0
+) -> np.ndarray:
+    """Return `count` (f1, f2, f3) drawn uniformly from [low, high]."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(low, high, (count, 3)).astype(np.float32)
+
+
+class HybridTuner:
+    """
+    Search the (f1, f2, f3) weights of the hybrid recommender in parallel.
+
+    The component scores are computed once by the caller. The rows of the
+    user cohort are copied into shared memory, and batches of candidate
+    weights are evaluated by a process pool with `evaluation.grid_search`,
+    each worker reading the same matrices without a copy.
+
+    With `patience`, the search stops once that many batches in a row did
+    not beat the best MAP@k by more than `min_delta`. Candidates are then
+    evaluated in a random order, so a grid is not explored corner first.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        workers: int = None,
+        k: int = RECOMMENDER_TOP_K,
+        batch_size: int = RECOMMENDER_TUNING_BATCH,
+        block_rows: int = RECOMMENDER_TUNING_BLOCK_ROWS,
+        patience: int = None,
+        min_delta: float = 0.0,
+        seed: int = 0,
+    ):
+        self._logger = logger
+        self.workers = workers
+        self.k = k
+        self.batch_size = batch_size
+        self.block_rows = block_rows
+        self.patience = patience
+        self.min_delta = min_delta
+        self.seed = seed
+
+    def tune(
+        self,
+        popularity: np.ndarray,
+        user_item: np.ndarray,
+        model_based: np.ndarray,
+        owned: Holdings,
+        actual: np.ndarray,
+        weights: np.ndarray = None,
+        cohort: np.ndarray = None,
+    ) -> TuningResult:
+        """
+        Evaluate MAP@k of candidate weights on a cohort of customers.
+        Args:
+            popularity (np.ndarray): (products,) popularity scores.
+            user_item (np.ndarray): (customers, products) user-item scores.
+            model_based (np.ndarray): (customers, products) model-based scores.
+            owned (Holdings): (customers, products) products held before.
+            actual (np.ndarray): (customers, products) products added afterwards.
+            weights (np.ndarray): (n, 3) candidates, e.g. weight_grid() or
+                random_weights(); defaults to the notebook's grid.
+            cohort (np.ndarray): Row numbers or boolean mask of the customers
+                to evaluate on, e.g. actual.any(axis=1) for those that added a
+                product; defaults to every customer.
+        """
+        weights = weight_grid(DEFAULT_WEIGHT_VALUES) if weights is None else weights
+        weights = np.asarray(weights, dtype=np.float32)
+        if weights.ndim != 2 or weights.shape[1] != 3:
+            self._logger.log_error("weights must be a (n, 3) array.")
+            raise ValueError("weights must be a (n, 3) array.")
+        if self.patience:
+            weights = weights[np.random.default_rng(self.seed).permutation(len(weights))]
+
+        rows = slice(None) if cohort is None else np.asarray(cohort)
+        arrays = {
+            "popularity": np.asarray(popularity, dtype=np.float32),
+            "user_item": np.asarray(user_item, dtype=np.float32)[rows],
+            "model_based": np.asarray(model_based, dtype=np.float32)[rows],
+            "owned": as_dense(owned)[rows].astype(bool),
+            "actual": np.asarray(actual, dtype=bool)[rows],
+        }
+        self._logger.log_info(
+            "Tuning %d weight candidate(s) on %d customer(s)", len(weights), len(arrays["actual"])
+        )
+
+        memory = []
+        try:
+            specs = {}
+            for name, array in arrays.items():
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                memory.append(block)
+                np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+                specs[name] = (block.name, array.shape, array.dtype.str)
+            del arrays
+            return self._run(weights, specs)
+        finally:
+            for block in memory:
+                block.close()
+                block.unlink()
+
+    def _run(self, weights: np.ndarray, specs: Dict[str, ArraySpec]) -> TuningResult:
+        batches = [
+            weights[start:start + self.batch_size]
+            for start in range(0, len(weights), self.batch_size)
+        ]
+        workers = min(self.workers or os.cpu_count() or 1, len(batches))
+        results: Dict[int, np.ndarray] = {}
+        best, stale, next_batch, checked = -np.inf, 0, 0, 0
+        stopped = False
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(specs,)
+        ) as executor:
+            # Only a few batches are queued ahead, so an early stop leaves
+            # little work to throw away.
+            pending = {}
+            while next_batch < len(batches) or pending:
+                while next_batch < len(batches) and len(pending) < workers * 2 and not stopped:
+                    future = executor.submit(_evaluate, batches[next_batch], self.k, self.block_rows)
+                    pending[future] = next_batch
+                    next_batch += 1
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+
+                # Batches are judged in submission order, so the outcome does
+                # not depend on which worker finishes first.
+                while checked in results and not stopped:
+                    score = results[checked][0, 3]
+                    if score > best + self.min_delta:
+                        best, stale = score, 0
+                    else:
+                        stale += 1
+                    checked += 1
+                    if self.patience and stale >= self.patience and checked < len(batches):
+                        stopped = True
+                        self._logger.log_info(
+                            "Early stop after %d batch(es), best MAP@%d: %.6f",
+                            checked,
+                            self.k,
+                            best,
+                        )
+                if stopped:
+                    for future in [f for f in pending if f.cancel()]:
+                        del pending[future]
+
+        # After an early stop, batches past the last judged one are dropped:
+        # which of them finished depends on worker timing.
+        kept = range(checked) if stopped else sorted(results)
+        evaluated = np.concatenate([results[i] for i in kept])
+        evaluated = evaluated[np.argsort(-evaluated[:, 3], kind="stable")]
+        return TuningResult(evaluated, len(weights), stopped)
@@ -9,3 +9,201 @@ LOG_FILE_BASE = f"{LOG_DIR}/app"
 # NEO4J DATABASE CONFIGURATION
 # ===========================
 NEO4J_DEFAULT_NUMBER_OF_NODES = 100
+NEO4J_DEFAULT_BATCH_SIZE = 1000
+NEO4J_DEFAULT_FETCH_SIZE = 1000
+NEO4J_DEFAULT_MAX_CONCURRENCY = 100
+NEO4J_QUERY_TEMPLATE_CACHE_SIZE = 512
+NEO4J_METRICS_MAX_SAMPLES = 1024
+NEO4J_CACHE_MAX_ENTRIES = 1024
+NEO4J_CACHE_MAX_RECORDS = 100_000
+NEO4J_CACHE_TTL = 60.0  # seconds
+NEO4J_MAINTENANCE_BATCH_SIZE = 10_000
+
+
+# ===========================
+# SANTANDER DATASET
+# ===========================
+SANTANDER_CSV_CHUNK_SIZE = 100_000
+SANTANDER_INGESTION_WORKERS = 4
+
+# Raw Kaggle column names -> names used across the project
+SANTANDER_RENAME_MAP = {
+    "fecha_dato": "date",
+    "ncodpers": "customer_code",
+    "ind_empleado": "employee_index",
+    "pais_residencia": "country_residence",
+    "sexo": "gender",
+    "age": "age",
+    "fecha_alta": "first_holder_date",
+    "ind_nuevo": "new_customer_index",
+    "antiguedad": "seniority",
+    "indrel": "internal",
+    "ult_fec_cli_1t": "last_date_as_primary_customer",
+    "indrel_1mes": "customer_type_at_beginning_of_month",
+    "tiprel_1mes": "customer_relationship_at_beginning_of_month",
+    "indresi": "residence_index",
+    "indext": "foreigner_index",
+    "conyuemp": "spouse_index",
+    "canal_entrada": "channel_used",
+    "indfall": "deceased_index",
+    "tipodom": "address_type",
+    "cod_prov": "province_code",
+    "nomprov": "province_name",
+    "ind_actividad_cliente": "activity_index",
+    "renta": "income",
+    "segmento": "segmentation",
+    "ind_ahor_fin_ult1": "saving_account",
+    "ind_aval_fin_ult1": "guarantees",
+    "ind_cco_fin_ult1": "current_account",
+    "ind_cder_fin_ult1": "derivada_account",
+    "ind_cno_fin_ult1": "payroll_account",
+    "ind_ctju_fin_ult1": "junior_account",
+    "ind_ctma_fin_ult1": "mas_particular_account",
+    "ind_ctop_fin_ult1": "particular_account",
+    "ind_ctpp_fin_ult1": "particular_plu_account",
+    "ind_deco_fin_ult1": "short_term_deposits",
+    "ind_deme_fin_ult1": "medium_term_deposits",
+    "ind_dela_fin_ult1": "long_term_deposits",
+    "ind_ecue_fin_ult1": "e_account",
+    "ind_fond_fin_ult1": "funds",
+    "ind_hip_fin_ult1": "mortgage",
+    "ind_plan_fin_ult1": "pension_plan",
+    "ind_pres_fin_ult1": "loans",
+    "ind_reca_fin_ult1": "taxes",
+    "ind_tjcr_fin_ult1": "credit_card",
+    "ind_valo_fin_ult1": "securities",
+    "ind_viv_fin_ult1": "home_account",
+    "ind_nomina_ult1": "payroll",
+    "ind_nom_pens_ult1": "pension_payroll",
+    "ind_recibo_ult1": "direct_debit",
+}
+
+# Product flag columns (renamed) -> display names
+SANTANDER_PRODUCT_NAMES = {
+    "saving_account": "Saving Account",
+    "guarantees": "Guarantees",
+    "current_account": "Current Accounts",
+    "derivada_account": "Derivada Account",
+    "payroll_account": "Payroll Account",
+    "junior_account": "Junior Account",
+    "mas_particular_account": "Más particular Account",
+    "particular_account": "particular Account",
+    "particular_plu_account": "particular Plus Account",
+    "short_term_deposits": "Short-term deposits",
+    "medium_term_deposits": "Medium-term deposits",
+    "long_term_deposits": "Long-term deposits",
+    "e_account": "e-account",
+    "funds": "Funds",
+    "mortgage": "Mortgage",
+    "pension_plan": "Pensions",
+    "loans": "Loans",
+    "taxes": "Taxes",
+    "credit_card": "Credit Card",
+    "securities": "Securities",
+    "home_account": "Home Account",
+    "payroll": "Payroll",
+    "pension_payroll": "Pensions",
+    "direct_debit": "Direct Debit",
+}
+SANTANDER_PRODUCT_COLUMNS = list(SANTANDER_PRODUCT_NAMES)
+
+# Customer attributes stored on Customer nodes (renamed)
+SANTANDER_CUSTOMER_COLUMNS = [
+    "customer_code",
+    "employee_index",
+    "country_residence",
+    "gender",
+    "age",
+    "first_holder_date",
+    "new_customer_index",
+    "seniority",
+    "segmentation",
+    "income",
+    "province_name",
+    "activity_index",
+    "channel_used",
+]
+
+# Explicit dtypes (renamed) so chunks never fall back to mixed-type inference.
+# Numeric columns padded with spaces in the raw file (age, seniority) are read
+# as strings and parsed afterwards.
+SANTANDER_DTYPES = {
+    "date": "str",
+    "customer_code": "uint32",
+    "employee_index": "str",
+    "country_residence": "str",
+    "gender": "str",
+    "age": "str",
+    "first_holder_date": "str",
+    "new_customer_index": "float32",
+    "seniority": "str",
+    "segmentation": "str",
+    "income": "float64",
+    "province_name": "str",
+    "activity_index": "float32",
+    "channel_used": "str",
+    **{product: "float32" for product in SANTANDER_PRODUCT_COLUMNS},
+}
+
+
+# Canonical dtypes of every renamed column in the feature store. Product flags
+# are uint8 (missing flags count as not held, as in the sample notebook),
+# small codes use nullable integers and repeated strings are categoricals.
+SANTANDER_CATEGORICAL_COLUMNS = [
+    "employee_index",
+    "country_residence",
+    "gender",
+    "last_date_as_primary_customer",
+    "customer_type_at_beginning_of_month",
+    "customer_relationship_at_beginning_of_month",
+    "residence_index",
+    "foreigner_index",
+    "spouse_index",
+    "channel_used",
+    "deceased_index",
+    "province_name",
+    "segmentation",
+]
+SANTANDER_CANONICAL_DTYPES = {
+    "date": "datetime64[ns]",
+    "customer_code": "uint32",
+    "age": "UInt8",
+    "first_holder_date": "datetime64[ns]",
+    "new_customer_index": "UInt8",
+    "seniority": "Int32",
+    "internal": "UInt8",
+    "address_type": "UInt8",
+    "province_code": "UInt8",
+    "activity_index": "UInt8",
+    "income": "float64",
+    **{column: "category" for column in SANTANDER_CATEGORICAL_COLUMNS},
+    **{product: "uint8" for product in SANTANDER_PRODUCT_COLUMNS},
+}
+
+# Customer sample of the extract_train_data notebook
+SANTANDER_SAMPLE_CUSTOMERS = 100_000
+SANTANDER_SAMPLE_RANDOM_STATE = 42
+
+# ===========================
+# RECOMMENDER
+# ===========================
+RECOMMENDER_DEFAULT_NEIGHBORS = 20
+RECOMMENDER_SIMILARITY_BLOCK_BYTES = 256 * 1024 * 1024
+RECOMMENDER_LSH_BANDS = 8
+RECOMMENDER_LSH_ROWS_PER_BAND = 8
+RECOMMENDER_MODEL_MAX_DEPTH = 9
+RECOMMENDER_SCORE_BATCH_ROWS = 100_000
+RECOMMENDER_TOP_K = 7
+RECOMMENDER_MIN_SIMILARITY = 0.65
+RECOMMENDER_TUNING_BATCH = 8  # weight candidates per worker task
+RECOMMENDER_TUNING_BLOCK_ROWS = 10_000
+RECOMMENDER_SERVING_CACHE_SIZE = 100_000  # customers
+RECOMMENDER_SERVING_TTL = 300.0  # seconds
+
+
+# ===========================
+# BENCHMARK
+# ===========================
+BENCHMARK_SCALES = (1_000, 100_000, 1_000_000)
+BENCHMARK_SINGLE_CALLS = 1_000  # single-call operations are timed on at most this many calls
+BENCHMARK_REGRESSION_TOLERANCE = 0.10  # throughput drop reported as a regression
@@ -4,8 +4,14 @@ from enum import Enum
 class Label(Enum):
     PERSON = "Person"
     MOVIES = "Movies"
+    CUSTOMER = "Customer"
+    PRODUCT = "Product"
+    BENCHMARK = "Benchmark"
 
 
 class RelationshipType(Enum):
     KNOWS = "KNOWS"
     WATCHES = "WATCHES"
+    HOLDS = "HOLDS"
+    RECOMMENDED = "RECOMMENDED"
+    BENCHMARK_LINK = "BENCHMARK_LINK"
@@ -0,0 +1,15 @@
+from itertools import islice
+from typing import Any, Iterable, Iterator, List
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most `size` items from an iterable."""
+    if size <= 0:
+        raise ValueError("Chunk size must be a positive integer.")
+
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
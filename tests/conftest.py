@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from logger.logger import Logger  # noqa: E402
+
+
+@pytest.fixture
+def logger(tmp_path):
+    return Logger(file_name=str(tmp_path / "test"))
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+from benchmarks.fake_backend import AsyncFakeNeo4jDriver, FakeNeo4jDriver
+from database_driver.async_neo4j_driver import AsyncNeo4jDriver
+from database_driver.neo4j_driver import Neo4jDriver
+from utils.enums import Label, RelationshipType
+
+LINKS = [(1, 2), (1, 3), (2, 3)]
+
+
+def _driver(logger, nodes=5):
+    driver = Neo4jDriver(logger)
+    driver.use_backend(FakeNeo4jDriver())
+    driver.create_nodes_batch([Label.BENCHMARK], [{"uid": i} for i in range(1, nodes + 1)])
+    for start, end in LINKS:
+        driver.create_relationship(
+            [Label.BENCHMARK],
+            {"uid": start},
+            [Label.BENCHMARK],
+            {"uid": end},
+            RelationshipType.BENCHMARK_LINK,
+        )
+    return driver
+
+
+async def _async_driver(logger, nodes=5):
+    driver = AsyncNeo4jDriver(logger)
+    driver.use_backend(AsyncFakeNeo4jDriver())
+    for i in range(1, nodes + 1):
+        await driver.create_node([Label.BENCHMARK], {"uid": i})
+    for start, end in LINKS:
+        await driver.create_relationship(
+            [Label.BENCHMARK],
+            {"uid": start},
+            [Label.BENCHMARK],
+            {"uid": end},
+            RelationshipType.BENCHMARK_LINK,
+        )
+    return driver
+
+
+def test_deleting_everything_requires_force(logger):
+    driver = _driver(logger)
+    assert driver.delete_nodes() is None
+    assert driver.delete_relationships() is None
+    assert len(driver.get_nodes([Label.BENCHMARK])) == 5
+    assert len(driver.get_relationships()) == 3
+
+    assert driver.delete_relationships(force=True) == 3
+    assert driver.delete_nodes(force=True) == 5
+
+
+def test_batches_stop_at_the_first_short_batch(logger):
+    progress = []
+    driver = _driver(logger)
+    deleted = driver.delete_nodes(
+        [Label.BENCHMARK], batch_size=2, on_progress=lambda *p: progress.append(p)
+    )
+    assert deleted == 5
+    assert progress == [
+        ("relationships", 2),
+        ("relationships", 3),
+        ("nodes", 2),
+        ("nodes", 4),
+        ("nodes", 5),
+    ]
+
+    # A full last batch needs one more, empty, batch to notice the end.
+    progress.clear()
+    driver = _driver(logger, nodes=4)
+    driver.delete_relationships(
+        relationship_type=RelationshipType.BENCHMARK_LINK,
+        batch_size=3,
+        on_progress=lambda *p: progress.append(p),
+    )
+    assert progress == [("relationships", 3), ("relationships", 3)]
+
+
+def test_cancel_stops_between_batches(logger):
+    cancel = threading.Event()
+
+    def on_progress(kind, total):
+        if kind == "nodes" and total >= 2:
+            cancel.set()
+
+    driver = _driver(logger)
+    deleted = driver.delete_nodes(
+        [Label.BENCHMARK], batch_size=2, on_progress=on_progress, cancel=cancel
+    )
+    assert deleted == 2
+    assert len(driver.get_nodes([Label.BENCHMARK])) == 3
+
+
+def test_async_batched_deletes(logger):
+    async def run():
+        driver = await _async_driver(logger)
+        assert await driver.delete_nodes() is None
+        assert await driver.delete_relationships() is None
+
+        progress = []
+        deleted = await driver.delete_relationships(
+            relationship_type=RelationshipType.BENCHMARK_LINK,
+            batch_size=2,
+            on_progress=lambda *p: progress.append(p),
+        )
+        assert deleted == 3
+        assert progress == [("relationships", 2), ("relationships", 3)]
+
+        cancel = asyncio.Event()
+
+        def on_progress(kind, total):
+            if kind == "nodes":
+                cancel.set()
+
+        deleted = await driver.delete_nodes(
+            [Label.BENCHMARK], batch_size=2, on_progress=on_progress, cancel=cancel
+        )
+        assert deleted == 2
+        assert len(await driver.get_nodes([Label.BENCHMARK])) == 3
+
+    asyncio.run(run())
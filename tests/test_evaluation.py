@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from recommender.evaluation import (
+    average_precision_at_k,
+    grid_search,
+    mean_average_precision_at_k,
+)
+from recommender.hybrid import top_k
+
+
+def _apk(actual, predicted, k=7):
+    # The notebook's (Kaggle) reference implementation.
+    predicted = predicted[:k]
+    score, hits = 0.0, 0
+    for i, p in enumerate(predicted):
+        if p in actual and p not in predicted[:i]:
+            hits += 1
+            score += hits / (i + 1)
+    return score / min(len(actual), k) if actual else 0.0
+
+
+def test_map_at_7_matches_the_reference():
+    rng = np.random.default_rng(0)
+    actual = rng.random((200, 24)) < 0.1
+    recommended = np.array([rng.permutation(24)[:7] for _ in range(200)])
+    recommended[::5, 4:] = -1
+
+    expected = [
+        _apk(set(np.flatnonzero(row).tolist()), [p for p in rec.tolist() if p >= 0])
+        for row, rec in zip(actual, recommended)
+    ]
+    assert average_precision_at_k(recommended, actual) == pytest.approx(expected)
+    assert mean_average_precision_at_k(recommended, actual) == pytest.approx(np.mean(expected))
+
+    changed = [e for e, row in zip(expected, actual) if row.any()]
+    assert mean_average_precision_at_k(recommended, actual, only_changed=True) == pytest.approx(
+        np.mean(changed)
+    )
+
+
+def test_grid_search_scores_every_weight():
+    rng = np.random.default_rng(1)
+    popularity = rng.random(10)
+    user_item, model_based = rng.random((2, 50, 10))
+    owned = rng.random((50, 10)) < 0.3
+    actual = ~owned & (rng.random((50, 10)) < 0.2)
+    weights = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.1, 0.55, 1.0]], dtype=np.float32)
+
+    results = grid_search(
+        popularity, user_item, model_based, owned, actual, weights, block_rows=16
+    )
+    for f1, f2, f3, score in results:
+        scores = f1 * popularity + f2 * user_item + f3 * model_based
+        scores[owned] = -np.inf
+        expected = mean_average_precision_at_k(top_k(scores, k=7), actual)
+        assert score == pytest.approx(expected)
+    assert list(results[:, 3]) == sorted(results[:, 3], reverse=True)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from analytics.graph_snapshot import GraphSnapshot
+
+
+def _snapshot(segment):
+    return GraphSnapshot(
+        labels=["Customer"],
+        label_offsets=np.array([0, 4]),
+        node_ids=np.array([10, 11, 12, 13]),
+        node_properties={
+            "Customer": {
+                "customer_code": np.array([7, 5, 9, 6]),
+                "segment": segment,
+            }
+        },
+        types=[],
+        edge_start=np.empty(0, dtype=np.int64),
+        edge_end=np.empty(0, dtype=np.int64),
+        edge_types=np.empty(0, dtype=np.int32),
+        edge_properties={},
+    )
+
+
+def test_index_by_text_with_missing_values():
+    for segment in (
+        np.array(["b", np.nan, "a", None], dtype=object),
+        pd.Categorical(["b", None, "a", None]),
+    ):
+        snapshot = _snapshot(segment)
+        found = snapshot.index_by("Customer", "segment", ["a", "b", "c", np.nan])
+        assert found.tolist() == [2, 0, -1, -1]
+        assert snapshot.index_by("Customer", "customer_code", [5, 8]).tolist() == [1, -1]
@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.fake_backend import FakeNeo4jDriver
+from database_driver.neo4j_driver import Neo4jDriver
+from utils.enums import Label, RelationshipType
+
+
+def _driver(logger):
+    driver = Neo4jDriver(logger)
+    driver.use_backend(FakeNeo4jDriver())
+    return driver
+
+
+def _uids(nodes):
+    return sorted(node.properties["uid"] for node in nodes)
+
+
+def test_batch_writes_apply_every_chunk(logger):
+    driver = _driver(logger)
+    created = driver.create_nodes_batch(
+        [Label.BENCHMARK], [{"uid": i} for i in range(5)], chunk_size=2
+    )
+    assert _uids(created) == [0, 1, 2, 3, 4]
+    assert driver.create_nodes_batch(
+        [Label.BENCHMARK], [{"uid": 5}, {"uid": 6}], chunk_size=1, return_nodes=False
+    ) == 2
+
+    updates = [
+        {"match_criteria": {"uid": uid}, "new_properties": {"name": f"n{uid}"}}
+        for uid in (0, 3, 99)
+    ]
+    assert _uids(driver.update_nodes_batch([Label.BENCHMARK], updates, chunk_size=2)) == [0, 3]
+    assert _uids(driver.merge_nodes_batch([Label.BENCHMARK], updates, chunk_size=2)) == [0, 3, 99]
+    names = {n.properties["uid"]: n.properties.get("name") for n in driver.get_nodes()}
+    assert names == {0: "n0", 1: None, 2: None, 3: "n3", 4: None, 5: None, 6: None, 99: "n99"}
+
+
+def test_merged_relationships_are_not_duplicated(logger):
+    driver = _driver(logger)
+    driver.create_nodes_batch([Label.BENCHMARK], [{"uid": i} for i in range(3)])
+    links = [
+        {"start_node_properties": {"uid": 0}, "end_node_properties": {"uid": end}}
+        for end in (1, 2)
+    ]
+    for _ in range(2):
+        driver.merge_relationships_batch(
+            [Label.BENCHMARK],
+            [Label.BENCHMARK],
+            RelationshipType.BENCHMARK_LINK,
+            links,
+            chunk_size=1,
+        )
+    assert len(driver.get_relationships()) == 2
+
+
+def test_batch_entries_must_share_keys(logger):
+    driver = _driver(logger)
+    with pytest.raises(ValueError):
+        driver.update_nodes_batch([Label.BENCHMARK], [])
+    with pytest.raises(ValueError):
+        driver.merge_nodes_batch(
+            [Label.BENCHMARK],
+            [
+                {"match_criteria": {"uid": 1}, "new_properties": {}},
+                {"match_criteria": {"name": "a"}, "new_properties": {}},
+            ],
+        )
@@ -0,0 +1,52 @@
+from benchmarks.fake_backend import FakeNeo4jDriver
+from database_driver.neo4j_driver import Neo4jDriver
+from database_driver.query_cache import QueryCache
+from utils.enums import Label
+
+
+def _driver(logger):
+    driver = Neo4jDriver(logger, cache=QueryCache())
+    driver.use_backend(FakeNeo4jDriver())
+    driver.create_node([Label.BENCHMARK], {"uid": 1, "name": "a", "tags": ["x"]})
+    return driver
+
+
+def test_modifying_a_cached_read_does_not_change_the_cache(logger):
+    driver = _driver(logger)
+    for _ in range(3):
+        [node] = driver.get_nodes([Label.BENCHMARK])
+        assert node.properties == {"uid": 1, "name": "a", "tags": ["x"]}
+        node.properties["name"] = "changed"
+        node.properties["tags"].append("y")
+    assert driver._cache.stats().hits == 2
+
+
+def test_transaction_invalidates_the_cache_after_commit(logger):
+    driver = _driver(logger)
+    assert len(driver.get_nodes([Label.BENCHMARK])) == 1
+
+    with driver.transaction() as tx:
+        tx.create_node([Label.BENCHMARK], {"uid": 2})
+        # Not committed yet: the cached read is still served.
+        assert len(driver.get_nodes([Label.BENCHMARK])) == 1
+    assert len(driver.get_nodes([Label.BENCHMARK])) == 2
+
+
+def test_rolled_back_transaction_keeps_the_cache(logger):
+    driver = _driver(logger)
+    driver.get_nodes([Label.BENCHMARK])
+    try:
+        with driver.transaction() as tx:
+            tx.create_node([Label.BENCHMARK], {"uid": 2})
+            raise ValueError("abort")
+    except ValueError:
+        pass
+    driver.get_nodes([Label.BENCHMARK])
+    assert driver._cache.stats().hits == 1
+
+
+def test_managed_write_invalidates_the_cache_after_commit(logger):
+    driver = _driver(logger)
+    driver.get_nodes([Label.BENCHMARK])
+    driver.execute_write(lambda tx: tx.create_node([Label.BENCHMARK], {"uid": 2}))
+    assert len(driver.get_nodes([Label.BENCHMARK])) == 2
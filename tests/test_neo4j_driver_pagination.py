@@ -0,0 +1,51 @@
+from benchmarks.fake_backend import FakeNeo4jDriver
+from database_driver.neo4j_driver import Neo4jDriver
+from utils.enums import Label, RelationshipType
+
+
+def _driver(logger, nodes):
+    driver = Neo4jDriver(logger)
+    driver.use_backend(FakeNeo4jDriver())
+    driver.create_nodes_batch([Label.BENCHMARK], [{"uid": i} for i in range(nodes)])
+    return driver
+
+
+def test_short_last_page_has_no_cursor(logger):
+    driver = _driver(logger, 5)
+    first = driver.get_nodes_page([Label.BENCHMARK], page_size=2)
+    second = driver.get_nodes_page([Label.BENCHMARK], page_size=2, cursor=first.next_cursor)
+    last = driver.get_nodes_page([Label.BENCHMARK], page_size=2, cursor=second.next_cursor)
+    assert [n.properties["uid"] for n in first.items + second.items + last.items] == [0, 1, 2, 3, 4]
+    assert first.next_cursor == first.items[-1].id
+    assert last.next_cursor is None
+
+
+def test_full_last_page_is_followed_by_an_empty_one(logger):
+    driver = _driver(logger, 4)
+    second = driver.get_nodes_page(
+        [Label.BENCHMARK], page_size=2, cursor=driver.get_nodes_page(page_size=2).next_cursor
+    )
+    assert second.next_cursor is not None
+    empty = driver.get_nodes_page([Label.BENCHMARK], page_size=2, cursor=second.next_cursor)
+    assert empty.items == [] and empty.next_cursor is None
+
+    pages = list(driver.iter_node_pages([Label.BENCHMARK], page_size=2))
+    assert [len(page.items) for page in pages] == [2, 2]
+
+
+def test_relationship_pages_resume_after_a_cursor(logger):
+    driver = _driver(logger, 4)
+    driver.create_relationships_batch(
+        [Label.BENCHMARK],
+        [Label.BENCHMARK],
+        RelationshipType.BENCHMARK_LINK,
+        [
+            {"start_node_properties": {"uid": 0}, "end_node_properties": {"uid": end}}
+            for end in (1, 2, 3)
+        ],
+    )
+    pages = list(driver.iter_relationship_pages(page_size=2))
+    assert [len(page.items) for page in pages] == [2, 1]
+
+    resumed = list(driver.iter_relationship_pages(page_size=2, cursor=pages[0].next_cursor))
+    assert [r.id for page in resumed for r in page.items] == [r.id for r in pages[1].items]
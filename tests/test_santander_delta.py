@@ -0,0 +1,171 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from database_driver import query_builder
+from ingestion.santander_delta import PROPERTY_COLUMNS, SantanderDeltaLoader
+from ingestion.santander_ingestion import SantanderIngestion
+from utils.constants import SANTANDER_PRODUCT_COLUMNS, SANTANDER_RENAME_MAP
+from utils.enums import Label, RelationshipType
+
+MONTH = datetime.date(2015, 2, 28)
+SAVINGS, PAYROLL = SANTANDER_PRODUCT_COLUMNS[:2]
+
+
+def _rows(holdings):
+    return pd.DataFrame(
+        [
+            {
+                "customer_code": code,
+                **{column: None for column in PROPERTY_COLUMNS},
+                **{product: int(product in held) for product in SANTANDER_PRODUCT_COLUMNS},
+            }
+            for code, held in holdings.items()
+        ]
+    )
+
+
+def _state(holdings):
+    return SantanderDeltaLoader._snapshot(_rows(holdings))
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute_query(self, query, parameters=None):
+        return self.rows
+
+
+def test_removal_deletes_every_holds_of_the_pair():
+    previous = _state({1: {SAVINGS, PAYROLL}})
+    _, added, removed = SantanderDeltaLoader.diff(previous, _rows({1: {PAYROLL}}), MONTH)
+
+    assert added == []
+    assert removed == [
+        {"start_node_properties": {"customer_code": 1}, "end_node_properties": {"code": SAVINGS}}
+    ]
+    # No date to match on: the HOLDS of earlier months go as well.
+    query = query_builder.delete_relationships_batch(
+        [Label.CUSTOMER], ["customer_code"], [Label.PRODUCT], ["code"], RelationshipType.HOLDS
+    )
+    assert "date" not in query
+
+
+def test_customers_missing_from_the_month_are_never_closed():
+    previous = _state({1: {SAVINGS}, 2: {SAVINGS, PAYROLL}})
+    updates, added, removed = SantanderDeltaLoader.diff(previous, _rows({1: {SAVINGS}}), MONTH)
+    assert (updates, added, removed) == ([], [], [])
+
+
+def test_refuses_graphs_loaded_month_by_month(logger, tmp_path):
+    SantanderDeltaLoader(_Rows([]), logger, str(tmp_path))._check_current_holdings()
+    loader = SantanderDeltaLoader(_Rows([{"customer_code": 1}]), logger, str(tmp_path))
+    with pytest.raises(RuntimeError):
+        loader._check_current_holdings()
+
+
+def _write_csv(path, months):
+    raw = {renamed: column for column, renamed in SANTANDER_RENAME_MAP.items()}
+    rows = []
+    for month, holdings in months:
+        for code, held in holdings.items():
+            row = {column: "" for column in SANTANDER_RENAME_MAP}
+            row.update(fecha_dato=month, ncodpers=code, age=" 35", antiguedad="   6")
+            row.update({raw[p]: int(p in held) for p in SANTANDER_PRODUCT_COLUMNS})
+            rows.append(row)
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+class _Graph:
+    """Keeps the customers and HOLDS pairs the loader writes."""
+
+    def __init__(self, fail_at=None):
+        self.customers = {}
+        self.holdings = set()
+        self.writes = 0
+        self.fail_at = fail_at
+
+    def execute_query(self, query, parameters=None):
+        return []
+
+    def execute_write(self, work, batch):
+        if self.writes == self.fail_at:
+            raise RuntimeError("Connection lost")
+        self.writes += 1
+        return work(self, batch)
+
+    def merge_nodes_batch(self, labels, batch, **kwargs):
+        for entry in batch:
+            self.customers.setdefault(entry["match_criteria"]["customer_code"], {}).update(
+                entry["new_properties"]
+            )
+        return len(batch)
+
+    @staticmethod
+    def _pairs(batch):
+        return {
+            (e["start_node_properties"]["customer_code"], e["end_node_properties"]["code"])
+            for e in batch
+        }
+
+    def merge_relationships_batch(self, start_labels, end_labels, type, batch, **kwargs):
+        self.holdings |= self._pairs(batch)
+        return len(batch)
+
+    def delete_relationships_batch(self, start_labels, end_labels, batch, type, **kwargs):
+        deleted = self._pairs(batch) & self.holdings
+        self.holdings -= deleted
+        return len(deleted)
+
+
+MONTHS = [
+    ("2015-01-28", {1: {SAVINGS}, 2: {PAYROLL}}),
+    ("2015-02-28", {1: {SAVINGS, PAYROLL}, 2: {PAYROLL, SAVINGS}}),
+    ("2015-03-28", {1: {PAYROLL}}),
+]
+FINAL = {(1, PAYROLL), (2, PAYROLL), (2, SAVINGS)}
+
+
+@pytest.fixture
+def csv_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(SantanderIngestion, "prepare", lambda self: None)
+    path = str(tmp_path / "santander.csv")
+    _write_csv(path, MONTHS)
+    return path
+
+
+def test_loader_writes_only_the_changes(logger, tmp_path, csv_path):
+    graph = _Graph()
+    loader = SantanderDeltaLoader(graph, logger, str(tmp_path / "state"), chunk_size=1)
+    stats = loader.run(csv_path)
+
+    assert [(s.month, s.customers, s.added_holdings, s.removed_holdings) for s in stats] == [
+        ("2015-01-28", 2, 2, 0),
+        ("2015-02-28", 0, 2, 0),
+        ("2015-03-28", 0, 0, 1),
+    ]
+    assert graph.holdings == FINAL
+    assert loader.load_checkpoint().last_month == "2015-03-28"
+    # Nothing is left to apply.
+    assert loader.run(csv_path) == [] and graph.writes == 7
+
+
+def test_interrupted_load_resumes_after_the_checkpoint(logger, tmp_path, csv_path):
+    graph = _Graph(fail_at=5)
+    state = str(tmp_path / "state")
+    with pytest.raises(RuntimeError):
+        SantanderDeltaLoader(graph, logger, state, chunk_size=1).run(csv_path)
+    checkpoint = SantanderDeltaLoader(graph, logger, state).load_checkpoint()
+    assert (checkpoint.last_month, checkpoint.month_offset, checkpoint.row_offset) == (
+        "2015-01-28",
+        2,
+        3,
+    )
+
+    graph.fail_at = None
+    stats = SantanderDeltaLoader(graph, logger, state, chunk_size=1).run(csv_path)
+    # Month 2 is re-read for its snapshot but only its last row is written.
+    assert [(s.month, s.rows, s.added_holdings) for s in stats][0] == ("2015-02-28", 1, 1)
+    assert graph.holdings == FINAL
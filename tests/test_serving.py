@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from recommender.serving import (
+    FileRecommendationStore,
+    RecommendationService,
+    RecommendationStore,
+    publish,
+)
+
+PRODUCTS = ["a", "b", "c"]
+
+
+def _publish(directory, scores):
+    codes = np.array([30, 10, 20])
+    return publish(FileRecommendationStore(directory), codes, np.array(scores), PRODUCTS, n=2)
+
+
+def test_republish_is_seen_by_running_reader(tmp_path, logger):
+    directory = str(tmp_path / "recommendations")
+    _publish(directory, [[0.1, 0.2, 0.3], [0.3, 0.2, 0.1], [0.2, 0.3, 0.1]])
+    service = RecommendationService(FileRecommendationStore(directory), logger)
+    assert [r.code for r in service.recommend(10)] == ["a", "b"]
+
+    assert service.invalidate([10]) == 1
+    assert service.recommend(10) == []
+
+    # Published by another store instance, as another process would.
+    _publish(directory, [[0.1, 0.2, 0.3], [0.1, 0.2, 0.3], [0.2, 0.3, 0.1]])
+    assert [r.code for r in service.recommend(10)] == ["c", "b"]
+
+    FileRecommendationStore(directory).invalidate([20])
+    assert service.recommend(20) == []
+
+
+def test_incomplete_store_fails_at_construction():
+    class ReadOnlyStore(RecommendationStore):
+        def get(self, customer_code):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnlyStore()
+
+
+def test_publish_replaces_the_previous_version(tmp_path):
+    directory = tmp_path / "recommendations"
+    store = FileRecommendationStore(str(directory))
+    assert store.get(10) is None
+
+    _publish(str(directory), [[0.1, 0.2, 0.3], [0.3, 0.2, 0.1], [0.2, 0.3, 0.1]])
+    first = (directory / "CURRENT").read_text()
+    assert [r.code for r in store.get(10)] == ["a", "b"]
+
+    _publish(str(directory), [[0.1, 0.2, 0.3], [0.1, 0.2, 0.3], [0.2, 0.3, 0.1]])
+    second = (directory / "CURRENT").read_text()
+    assert second != first
+    assert sorted(p.name for p in directory.iterdir()) == sorted(["CURRENT", second])
+    assert [r.code for r in store.get(10)] == ["c", "b"]
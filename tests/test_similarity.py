@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from recommender.similarity import KNNIndex, SimilarityEngine
+
+HOLDINGS = sparse.csr_matrix(
+    np.array(
+        [
+            [1, 1, 0],
+            [1, 1, 0],
+            [1, 0, 0],
+            [0, 1, 1],
+            [0, 0, 0],
+        ]
+    )
+)
+
+
+def _lookups(index, codes):
+    return {code: tuple(np.round(a, 6).tolist() for a in index.lookup(code)) for code in codes}
+
+
+def test_neighbours_are_the_most_similar_customers():
+    index = SimilarityEngine(k=2).fit(HOLDINGS, np.array([10, 20, 30, 40, 50]))
+    codes, scores = index.lookup(10)
+    assert codes.tolist() == [20, 30]
+    assert scores == pytest.approx([1.0, np.sqrt(0.5)])
+    assert set(index.lookup(30)[0].tolist()) == {10, 20}
+    assert index.lookup(50)[0].tolist() == []
+    with pytest.raises(KeyError):
+        index.lookup(60)
+
+
+@pytest.mark.parametrize("codes", [[10, 20, 30, 40, 50], [10**12, 7, 10**9, 3, 5]])
+def test_saved_index_loads_the_same_neighbours(tmp_path, codes):
+    index = SimilarityEngine(k=3).fit(HOLDINGS, np.array(codes))
+    index.save(str(tmp_path))
+    for mmap in (True, False):
+        loaded = KNNIndex.load(str(tmp_path), mmap=mmap)
+        assert loaded.k == 3 and len(loaded) == len(codes)
+        assert _lookups(loaded, codes) == _lookups(index, codes)